@@ -224,6 +224,13 @@ class AesRequest(BaseModel):
     swap_key_schedule: bool = False
     swap_data_round: bool = False
     data_type: Optional[str] = None # 'hex', 'base64', 'text'
+    parallel: bool = False  # 大数据量时使用多进程 (ECB/CTR, CBC/CFB解密)
+    aad: str = ''  # GCM附加认证数据
+    aad_type: str = 'utf-8'
+    rounds: Optional[int] = None  # 魔改AES: 轮数
+    mix_matrix: Optional[str] = None  # 魔改AES: MixColumns矩阵 (JSON 4x4 或首行)
+    shift_offsets: Optional[str] = None  # 魔改AES: ShiftRows偏移 (4个整数)
+    rcon: Optional[str] = None  # 魔改AES: RCON (JSON数组)
 
 @app.post("/api/aes/encrypt")
 def aes_encrypt(req: AesRequest):
@@ -235,7 +242,11 @@ def aes_encrypt(req: AesRequest):
                                        swap_data_round=req.swap_data_round,
                                        key_type=req.key_type,
                                        iv_type=req.iv_type,
-                                       data_type=req.data_type)
+                                       data_type=req.data_type,
+                                       parallel=req.parallel,
+                                       aad=req.aad, aad_type=req.aad_type,
+                                       rounds=req.rounds, mix_matrix=req.mix_matrix,
+                                       shift_offsets=req.shift_offsets, rcon=req.rcon)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -250,7 +261,51 @@ def aes_decrypt(req: AesRequest):
                                        swap_data_round=req.swap_data_round,
                                        key_type=req.key_type,
                                        iv_type=req.iv_type,
-                                       data_type=req.data_type)
+                                       data_type=req.data_type,
+                                       parallel=req.parallel,
+                                       aad=req.aad, aad_type=req.aad_type,
+                                       rounds=req.rounds, mix_matrix=req.mix_matrix,
+                                       shift_offsets=req.shift_offsets, rcon=req.rcon)
+        return {"result": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class AesInvertKeyRequest(BaseModel):
+    round_key: str  # Hex
+    round_index: int = 10
+    key_bits: int = 128
+    sbox_name: Optional[str] = "Standard AES"
+    swap_key_schedule: bool = False
+
+@app.post("/api/aes/invert_key")
+def aes_invert_key(req: AesInvertKeyRequest):
+    try:
+        sbox = sbox_manager.get_sbox(req.sbox_name)
+        result = AesPureEncoders.invert_key(req.round_key, req.round_index, req.key_bits,
+                                            sbox=sbox, swap_key_schedule=req.swap_key_schedule)
+        return {"result": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+from core.decoder.aes_keyscan import AesKeyScanner
+
+class AesKeyScanRequest(BaseModel):
+    path: str  # 服务端内存镜像文件路径
+    sbox_name: Optional[str] = "Standard AES"
+    swap_key_schedule: bool = False
+    max_bit_errors: int = 0
+    key_sizes: List[int] = [128, 192, 256]
+    max_results: int = 100
+
+@app.post("/api/aes/keyscan")
+def aes_keyscan(req: AesKeyScanRequest):
+    try:
+        sbox = sbox_manager.get_sbox(req.sbox_name)
+        result = AesKeyScanner.scan(req.path, sbox=sbox,
+                                    swap_key_schedule=req.swap_key_schedule,
+                                    max_bit_errors=req.max_bit_errors,
+                                    key_sizes=req.key_sizes,
+                                    max_results=req.max_results)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -269,6 +324,10 @@ class Sm4Request(BaseModel):
     swap_key_schedule: bool = False
     swap_data_round: bool = False
     data_type: Optional[str] = None # 'hex', 'base64', 'text'
+    parallel: bool = False  # 大数据量时使用多进程 (ECB/CTR, CBC/CFB解密)
+    fk: Optional[str] = None  # 魔改SM4: FK (4个Hex字)
+    ck: Optional[str] = None  # 魔改SM4: CK (Hex字列表)
+    rounds: Optional[int] = None  # 魔改SM4: 轮数
 
 @app.post("/api/sm4/encrypt")
 def sm4_encrypt(req: Sm4Request):
@@ -279,7 +338,9 @@ def sm4_encrypt(req: Sm4Request):
                                        swap_key_schedule=req.swap_key_schedule,
                                        swap_data_round=req.swap_data_round,
                                        swap_endian=req.swap_endian,
-                                       data_type=req.data_type)
+                                       data_type=req.data_type,
+                                       parallel=req.parallel,
+                                       fk=req.fk, ck=req.ck, rounds=req.rounds)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -293,7 +354,28 @@ def sm4_decrypt(req: Sm4Request):
                                        swap_key_schedule=req.swap_key_schedule,
                                        swap_data_round=req.swap_data_round,
                                        swap_endian=req.swap_endian,
-                                       data_type=req.data_type)
+                                       data_type=req.data_type,
+                                       parallel=req.parallel,
+                                       fk=req.fk, ck=req.ck, rounds=req.rounds)
+        return {"result": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class Sm4InvertKeyRequest(BaseModel):
+    round_keys: str  # Hex, 4个连续轮密钥 rk[i..i+3]
+    round_index: int = 0
+    sbox_name: Optional[str] = "Standard SM4"
+    swap_key_schedule: bool = False
+    fk: Optional[str] = None
+    ck: Optional[str] = None
+
+@app.post("/api/sm4/invert_key")
+def sm4_invert_key(req: Sm4InvertKeyRequest):
+    try:
+        sbox = sbox_manager.get_sbox(req.sbox_name)
+        result = SM4Encoders.sm4_invert_key(req.round_keys, req.round_index, sbox=sbox,
+                                            swap_key_schedule=req.swap_key_schedule,
+                                            fk=req.fk, ck=req.ck)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -311,13 +393,15 @@ class DesRequest(BaseModel):
     key_type: str = 'utf-8'
     iv_type: str = 'utf-8'
     data_type: Optional[str] = None
+    parallel: bool = False
 
 @app.post("/api/des/encrypt")
 def des_encrypt(req: DesRequest):
     try:
         result = DESEncoders.des_encrypt(req.data, req.key, req.mode, req.iv, req.padding,
                                          sboxes=req.sboxes, key_type=req.key_type,
-                                         iv_type=req.iv_type, data_type=req.data_type)
+                                         iv_type=req.iv_type, data_type=req.data_type,
+                                         parallel=req.parallel)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -327,7 +411,8 @@ def des_decrypt(req: DesRequest):
     try:
         result = DESEncoders.des_decrypt(req.data, req.key, req.mode, req.iv, req.padding,
                                          sboxes=req.sboxes, key_type=req.key_type,
-                                         iv_type=req.iv_type, data_type=req.data_type)
+                                         iv_type=req.iv_type, data_type=req.data_type,
+                                         parallel=req.parallel)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -343,13 +428,15 @@ class TripleDesRequest(BaseModel):
     key_type: str = 'utf-8'
     iv_type: str = 'utf-8'
     data_type: Optional[str] = None
+    parallel: bool = False
 
 @app.post("/api/3des/encrypt")
 def triple_des_encrypt(req: TripleDesRequest):
     try:
         result = DESEncoders.triple_des_encrypt(req.data, req.key, req.mode, req.iv, req.padding,
                                                 sboxes=req.sboxes, key_type=req.key_type,
-                                                iv_type=req.iv_type, data_type=req.data_type)
+                                                iv_type=req.iv_type, data_type=req.data_type,
+                                                parallel=req.parallel)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -359,13 +446,102 @@ def triple_des_decrypt(req: TripleDesRequest):
     try:
         result = DESEncoders.triple_des_decrypt(req.data, req.key, req.mode, req.iv, req.padding,
                                                 sboxes=req.sboxes, key_type=req.key_type,
-                                                iv_type=req.iv_type, data_type=req.data_type)
+                                                iv_type=req.iv_type, data_type=req.data_type,
+                                                parallel=req.parallel)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# --- DES/3DES 部分密钥爆破 (后台任务) ---
+import base64
+import hashlib
+import threading
+import time
+import uuid
+from core.decoder.des_bruteforce import DESKeySearch
+
+# 后台任务保留策略: 结束超过 JOB_RETENTION 秒的任务被清理，任务总数超过 MAX_JOBS 时先清理最早结束的
+JOB_RETENTION = 3600
+MAX_JOBS = 64
+
+def _prune_jobs(jobs):
+    """清理已结束的后台任务 (调用方持有对应的锁)"""
+    now = time.time()
+    finished = sorted((job.finished_at, job_id) for job_id, job in jobs.items()
+                      if job.finished_at is not None)
+    excess = len(jobs) - MAX_JOBS
+    for finished_at, job_id in finished:
+        if excess <= 0 and now - finished_at <= JOB_RETENTION:
+            continue
+        del jobs[job_id]
+        excess -= 1
+
+_DES_SEARCH_JOBS = {}
+_DES_SEARCH_LOCK = threading.Lock()
+
+class DesBruteforceRequest(BaseModel):
+    ciphertext: str
+    data_type: str = 'base64'  # 'hex' / 'base64'
+    known_plaintext: str
+    known_type: str = 'utf-8'  # 'utf-8' / 'hex'
+    offset: int = 0
+    key_mask: str = ''  # Hex，'??' 为未知字节
+    charset: Optional[str] = 'printable'  # 预置名称或自定义字符
+    algorithm: str = 'des'  # 'des' / '3des'
+    mode: str = 'ECB'
+    iv: str = ''  # 为空且非ECB时取密文前8字节
+    iv_type: str = 'hex'
+    sboxes: Optional[str] = None
+    workers: Optional[int] = None
+
+@app.post("/api/des/bruteforce")
+def des_bruteforce_start(req: DesBruteforceRequest):
+    try:
+        if req.data_type.lower() == 'hex':
+            ciphertext = bytes.fromhex(req.ciphertext.replace(' ', '').replace('\n', ''))
+        else:
+            ciphertext = base64.b64decode(req.ciphertext)
+        if req.known_type.lower() == 'hex':
+            known = bytes.fromhex(req.known_plaintext.replace(' ', ''))
+        else:
+            known = req.known_plaintext.encode('utf-8')
+        iv = None
+        if req.iv:
+            iv = (bytes.fromhex(req.iv.replace(' ', '')) if req.iv_type.lower() == 'hex'
+                  else hashlib.md5(req.iv.encode('utf-8')).digest()[:8])
+        search = DESKeySearch(ciphertext, known, req.key_mask, req.charset,
+                              algorithm=req.algorithm, mode=req.mode, iv=iv,
+                              offset=req.offset, sboxes=req.sboxes, workers=req.workers)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job_id = uuid.uuid4().hex
+    with _DES_SEARCH_LOCK:
+        _prune_jobs(_DES_SEARCH_JOBS)
+        _DES_SEARCH_JOBS[job_id] = search
+    search.start()
+    return {"job_id": job_id, "total": search.total}
+
+@app.get("/api/des/bruteforce/{job_id}")
+def des_bruteforce_status(job_id: str):
+    search = _DES_SEARCH_JOBS.get(job_id)
+    if search is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    result = search.progress()
+    if search.error:
+        result["error"] = search.error
+    return result
+
+@app.delete("/api/des/bruteforce/{job_id}")
+def des_bruteforce_cancel(job_id: str):
+    with _DES_SEARCH_LOCK:
+        search = _DES_SEARCH_JOBS.pop(job_id, None)
+    if search is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    search.cancel()
+    return {"success": True}
+
 # --- MD5 ---
-from core.decoder.md5 import MD5Encoders
+from core.decoder.md5 import MD5Encoders, MD5Hasher
 
 class Md5Request(BaseModel):
     data: str
@@ -374,17 +550,108 @@ class Md5Request(BaseModel):
     k_table: Optional[str] = None  # JSON array of 64 values
     shifts: Optional[str] = None  # JSON array of 64 values
     data_type: Optional[str] = None
+    state: Optional[str] = None  # 中间状态 "<ABCD hex>:<length>[:<buffer hex>]"
 
 @app.post("/api/md5/hash")
 def md5_hash(req: Md5Request):
     try:
         result = MD5Encoders.md5_hash(req.data, output_format=req.output_format,
                                       init_values=req.init_values, k_table=req.k_table,
-                                      shifts=req.shifts, data_type=req.data_type)
+                                      shifts=req.shifts, data_type=req.data_type,
+                                      state=req.state)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/md5/midstate")
+def md5_midstate(req: Md5Request):
+    try:
+        result = MD5Encoders.md5_midstate(req.data, init_values=req.init_values,
+                                          k_table=req.k_table, shifts=req.shifts,
+                                          data_type=req.data_type, state=req.state)
+        return {"result": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class Md5LengthExtensionRequest(BaseModel):
+    digest: str  # 原摘要 (Hex)
+    message: str = ''  # secret 之后的已知消息
+    append: str
+    secret_length: int = 0
+    max_secret_length: Optional[int] = None  # 设置时枚举 secret_length..max_secret_length
+    init_values: Optional[str] = None
+    k_table: Optional[str] = None
+    shifts: Optional[str] = None
+    data_type: Optional[str] = None  # message/append 的类型 (hex/utf-8)
+    output_format: str = 'hex'
+
+@app.post("/api/md5/length_extension")
+def md5_length_extension(req: Md5LengthExtensionRequest):
+    try:
+        result = MD5Encoders.md5_length_extension(req.digest, req.message, req.append,
+                                                  secret_length=req.secret_length,
+                                                  max_secret_length=req.max_secret_length,
+                                                  init_values=req.init_values,
+                                                  k_table=req.k_table, shifts=req.shifts,
+                                                  data_type=req.data_type,
+                                                  output_format=req.output_format)
+        return {"result": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- 魔改 MD5 原像爆破 (后台任务) ---
+from core.decoder.md5_crack import MD5Crack
+
+_MD5_CRACK_JOBS = {}
+_MD5_CRACK_LOCK = threading.Lock()
+
+class Md5CrackRequest(BaseModel):
+    target: str  # 目标摘要 (Hex)
+    wordlist: Optional[str] = None  # 换行分隔的候选 (与 mask 二选一)
+    mask: Optional[str] = None  # hashcat 风格掩码，如 "flag{?d?d?d?d}"
+    custom_charset: Optional[str] = None  # 掩码中 ?1 的字符集
+    prefix: str = ''
+    suffix: str = ''
+    init_values: Optional[str] = None
+    k_table: Optional[str] = None
+    shifts: Optional[str] = None
+    workers: Optional[int] = None
+
+@app.post("/api/md5/crack")
+def md5_crack_start(req: Md5CrackRequest):
+    try:
+        crack = MD5Crack(req.target, wordlist=req.wordlist, mask=req.mask,
+                         init_values=req.init_values, k_table=req.k_table, shifts=req.shifts,
+                         prefix=req.prefix, suffix=req.suffix,
+                         custom_charset=req.custom_charset, workers=req.workers)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job_id = uuid.uuid4().hex
+    with _MD5_CRACK_LOCK:
+        _prune_jobs(_MD5_CRACK_JOBS)
+        _MD5_CRACK_JOBS[job_id] = crack
+    crack.start()
+    return {"job_id": job_id, "total": crack.total}
+
+@app.get("/api/md5/crack/{job_id}")
+def md5_crack_status(job_id: str):
+    crack = _MD5_CRACK_JOBS.get(job_id)
+    if crack is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    result = crack.progress()
+    if crack.error:
+        result["error"] = crack.error
+    return result
+
+@app.delete("/api/md5/crack/{job_id}")
+def md5_crack_cancel(job_id: str):
+    with _MD5_CRACK_LOCK:
+        crack = _MD5_CRACK_JOBS.pop(job_id, None)
+    if crack is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    crack.cancel()
+    return {"success": True}
+
 # --- RC4 ---
 from core.decoder.rc4 import RC4Encoders
 
@@ -395,13 +662,16 @@ class Rc4Request(BaseModel):
     sbox: Optional[str] = None  # Custom initial S-box
     key_type: str = 'utf-8'
     data_type: Optional[str] = None
+    drop: int = 0  # RC4-drop[n]
+    offset: int = 0  # 数据在密钥流中的起始偏移
 
 @app.post("/api/rc4/encrypt")
 def rc4_encrypt(req: Rc4Request):
     try:
         result = RC4Encoders.rc4_encrypt(req.data, req.key, swap_bytes=req.swap_bytes,
                                          sbox=req.sbox, key_type=req.key_type,
-                                         data_type=req.data_type)
+                                         data_type=req.data_type,
+                                         drop=req.drop, offset=req.offset)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -411,11 +681,110 @@ def rc4_decrypt(req: Rc4Request):
     try:
         result = RC4Encoders.rc4_decrypt(req.data, req.key, swap_bytes=req.swap_bytes,
                                          sbox=req.sbox, key_type=req.key_type,
-                                         data_type=req.data_type)
+                                         data_type=req.data_type,
+                                         drop=req.drop, offset=req.offset)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+class Rc4DictionaryRequest(BaseModel):
+    data: str
+    data_type: str = 'base64'  # 'hex' / 'base64'
+    known_plaintext: str
+    known_type: str = 'utf-8'  # 'utf-8' / 'hex'
+    offset: int = 0
+    wordlist: str  # 换行分隔的候选密钥
+    key_type: str = 'utf-8'
+    swap_bytes: bool = False
+    sbox: Optional[str] = None
+    max_results: int = 1
+    drop: int = 0
+
+@app.post("/api/rc4/dictionary")
+def rc4_dictionary(req: Rc4DictionaryRequest):
+    try:
+        found = RC4Encoders.rc4_dictionary_attack(req.data, req.known_plaintext, req.wordlist,
+                                                  offset=req.offset, swap_bytes=req.swap_bytes,
+                                                  sbox=req.sbox, data_type=req.data_type,
+                                                  known_type=req.known_type, key_type=req.key_type,
+                                                  max_results=req.max_results, drop=req.drop)
+        return {"result": found}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- Streaming (AES / SM4 / DES / 3DES / RC4) ---
+# 请求体为原始二进制数据，参数通过查询字符串传递，响应以 application/octet-stream 分块返回
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from core.decoder.streaming import StreamingCiphers
+
+_DEFAULT_SBOX_NAMES = {'aes': "Standard AES", 'sm4': "Standard SM4"}
+
+@app.post("/api/stream/{algorithm}/{direction}")
+async def stream_cipher(algorithm: str, direction: str, request: Request, key: str,
+                        mode: str = 'ECB', iv: str = '', padding: str = 'pkcs7',
+                        key_type: str = 'utf-8', iv_type: str = 'utf-8',
+                        sbox_name: Optional[str] = None, sbox: Optional[str] = None,
+                        sboxes: Optional[str] = None,
+                        swap_key_schedule: bool = False, swap_data_round: bool = False,
+                        swap_bytes: bool = False, parallel: bool = False,
+                        drop: int = 0, offset: int = 0):
+    """分块加解密请求体
+
+    参数错误在开始响应前以 400 返回；加解密在线程池中执行，不阻塞事件循环。
+    结尾的错误 (如解密后填充无效) 只能在 finalize 时发现，此时响应头已发送，
+    响应会被中止 (分块传输没有正常结束)，客户端应将不完整的响应视为失败。
+    """
+    try:
+        algorithm = algorithm.lower()
+        if algorithm in _DEFAULT_SBOX_NAMES:
+            sbox = sbox_manager.get_sbox(sbox_name or _DEFAULT_SBOX_NAMES[algorithm])
+        cipher = StreamingCiphers.create(algorithm, direction, key, mode, iv, padding,
+                                         key_type=key_type, iv_type=iv_type,
+                                         sbox=sbox, sboxes=sboxes,
+                                         swap_key_schedule=swap_key_schedule,
+                                         swap_data_round=swap_data_round,
+                                         swap_bytes=swap_bytes, parallel=parallel,
+                                         drop=drop, offset=offset)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def body():
+        async for chunk in request.stream():
+            out = await run_in_threadpool(cipher.update, chunk)
+            if out:
+                yield out
+        tail = await run_in_threadpool(cipher.finalize)
+        if tail:
+            yield tail
+
+    return StreamingResponse(body(), media_type="application/octet-stream")
+
+@app.post("/api/stream/md5")
+async def stream_md5(request: Request, output_format: str = 'hex',
+                     init_values: Optional[str] = None, k_table: Optional[str] = None,
+                     shifts: Optional[str] = None, state: Optional[str] = None,
+                     export_state: bool = False):
+    """分块读取请求体计算 MD5；export_state 时额外返回末尾的中间状态"""
+    try:
+        md5 = MD5Encoders.from_params(init_values, k_table, shifts)
+        if state:
+            mid, buffer = MD5Hasher.parse_state(state)
+            hasher = MD5Hasher.from_state(mid, md5, buffer)
+        else:
+            hasher = md5.hasher(fast=not export_state)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 自定义参数时为纯 Python 压缩函数，放到线程池中执行以免阻塞事件循环
+    async for chunk in request.stream():
+        await run_in_threadpool(hasher.update, chunk)
+    digest = await run_in_threadpool(hasher.digest)
+    result = {"result": MD5Encoders._format_digest(digest, output_format)}
+    if export_state:
+        result["state"] = MD5Hasher.format_state(hasher.export_state(), hasher.buffer)
+    return result
+
 # --- HTML / URL / Unicode ---
 @app.post("/api/html/encode")
 def html_encode(req: EncodeRequest):
@@ -481,6 +850,20 @@ def endian_swap(req: ConvertRequest):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# ==========================================
+# Cipher Context Cache APIs
+# ==========================================
+from core.decoder.context_cache import CONTEXT_CACHE
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    return CONTEXT_CACHE.stats()
+
+@app.post("/api/cache/clear")
+def cache_clear():
+    CONTEXT_CACHE.clear()
+    return {"status": "success"}
+
 # ==========================================
 # S-Box Manager APIs
 # ==========================================
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AES 密钥扩展扫描 (内存镜像取证)
+在内存镜像的每个字节偏移处检查是否存在完整的 128/192/256 位扩展密钥
+支持自定义S盒、密钥调度交换 (swap_key_schedule) 与可配置的比特容错
+
+扩展密钥满足 w[i] = w[i-Nk] ^ g(w[i-1])，逐个关系式统计差异比特数：
+先对所有偏移向量化检查第一个关系 (i = Nk)，只保留误差不超过阈值的偏移，
+再逐个关系累加误差并继续剪枝，随机数据几乎在第一步就被全部排除
+"""
+
+import mmap
+import os
+
+from core.decoder.aes_pure import AesPure
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时回退到逐偏移检查
+    np = None
+
+
+# 8位整数的置位数
+_POPCOUNT = [bin(i).count('1') for i in range(256)]
+
+# 密钥字节数 -> (Nk, 扩展密钥总字数)
+_KEY_LAYOUTS = {16: (4, 44), 24: (6, 52), 32: (8, 60)}
+
+
+class AesKeyScanner:
+    """在内存镜像中查找 AES 扩展密钥"""
+
+    CHUNK_SIZE = 32 << 20     # 每次检查的偏移数
+    MAX_RESULTS = 1000
+
+    def __init__(self, sbox=None, swap_key_schedule=False, max_bit_errors=0,
+                 key_sizes=(128, 192, 256), chunk_size=None, max_results=None):
+        """
+        Args:
+            sbox: 自定义S盒 (256字节，可取自 SBoxManager)
+            swap_key_schedule: 密钥调度中 SubWord 结果是否反转字节
+            max_bit_errors: 所有关系式累计允许的差异比特数
+                (镜像中一个损坏比特最多影响3个关系式)
+            key_sizes: 需要查找的密钥长度 (比特)
+            chunk_size: 每块检查的偏移数
+            max_results: 结果数量上限
+        """
+        self.sbox = list(sbox) if sbox and len(sbox) == 256 else AesPure.STANDARD_SBOX
+        self.swap_key_schedule = bool(swap_key_schedule)
+        self.max_bit_errors = max(0, int(max_bit_errors))
+        self.key_sizes = []
+        for bits in key_sizes:
+            if bits // 8 not in _KEY_LAYOUTS:
+                raise ValueError(f"不支持的AES密钥长度: {bits}")
+            self.key_sizes.append(bits // 8)
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.max_results = max_results or self.MAX_RESULTS
+        if np is not None:
+            self._np_sbox = np.array(self.sbox, dtype=np.uint8)
+            self._np_popcount = np.array(_POPCOUNT, dtype=np.uint8)
+
+    # ----------------------------
+    # 关系式
+    # ----------------------------
+
+    def _relation_terms(self, i, nk):
+        """关系 i 的组成: 返回 (g 的类型, rcon)
+
+        类型: 'core' 为 RotWord+SubWord(+反转)+Rcon，'sub' 为 AES-256 的 SubWord，None 为恒等
+        """
+        if i % nk == 0:
+            return 'core', AesPure.RCON[i // nk]
+        if nk > 6 and i % nk == 4:
+            return 'sub', 0
+        return None, 0
+
+    def _expected_bytes(self, prev, kind, rcon):
+        """由 w[i-1] 的4个字节计算 g(w[i-1])"""
+        sbox = self.sbox
+        if kind == 'core':
+            t = [sbox[prev[1]], sbox[prev[2]], sbox[prev[3]], sbox[prev[0]]]
+            if self.swap_key_schedule:
+                t.reverse()
+            t[0] ^= rcon
+            return t
+        if kind == 'sub':
+            return [sbox[b] for b in prev]
+        return list(prev)
+
+    # ----------------------------
+    # 向量化检查
+    # ----------------------------
+
+    def _relation_errors_np(self, arr, offs, n, i, nk):
+        """计算关系 i 在各候选偏移上的错误比特数
+
+        offs 为 None 时检查 arr 中前 n 个连续偏移 (切片视图)，否则只检查 offs 中的偏移
+        """
+        def take(pos):
+            if offs is None:
+                return arr[pos:pos + n]
+            return arr[offs + pos]
+
+        kind, rcon = self._relation_terms(i, nk)
+        prev = [take(4 * (i - 1) + j) for j in range(4)]
+        if kind == 'core':
+            t = [self._np_sbox[prev[(j + 1) % 4]] for j in range(4)]
+            if self.swap_key_schedule:
+                t.reverse()
+            t[0] = t[0] ^ np.uint8(rcon)
+        elif kind == 'sub':
+            t = [self._np_sbox[p] for p in prev]
+        else:
+            t = prev
+
+        pop = self._np_popcount
+        errors = None
+        for j in range(4):
+            diff = take(4 * i + j) ^ take(4 * (i - nk) + j) ^ t[j]
+            e = pop[diff]
+            errors = e if errors is None else errors + e
+        return errors
+
+    def _scan_array(self, arr, n, key_size):
+        """检查 arr 中前 n 个偏移，返回 [(偏移, 错误比特数)]"""
+        nk, total = _KEY_LAYOUTS[key_size]
+        limit = self.max_bit_errors
+
+        # 第一个关系 (i = Nk) 对所有偏移向量化检查
+        errors = self._relation_errors_np(arr, None, n, nk, nk)
+        offs = np.flatnonzero(errors <= limit)
+        if offs.size == 0:
+            return []
+        acc = errors[offs].astype(np.int32)
+
+        # 剩余关系逐个累加误差并剪枝
+        for i in range(nk + 1, total):
+            acc += self._relation_errors_np(arr, offs, offs.size, i, nk)
+            keep = acc <= limit
+            if not keep.all():
+                offs, acc = offs[keep], acc[keep]
+                if offs.size == 0:
+                    return []
+        return list(zip(offs.tolist(), acc.tolist()))
+
+    # ----------------------------
+    # 纯Python回退
+    # ----------------------------
+
+    def _check_offset(self, buf, off, key_size):
+        nk, total = _KEY_LAYOUTS[key_size]
+        limit = self.max_bit_errors
+        errors = 0
+        for i in range(nk, total):
+            kind, rcon = self._relation_terms(i, nk)
+            p = off + 4 * (i - 1)
+            t = self._expected_bytes(buf[p:p + 4], kind, rcon)
+            a = off + 4 * i
+            b = off + 4 * (i - nk)
+            for j in range(4):
+                errors += _POPCOUNT[buf[a + j] ^ buf[b + j] ^ t[j]]
+            if errors > limit:
+                return None
+        return errors
+
+    def _scan_python(self, buf, n, key_size):
+        results = []
+        for off in range(n):
+            errors = self._check_offset(buf, off, key_size)
+            if errors is not None:
+                results.append((off, errors))
+        return results
+
+    # ----------------------------
+    # 入口
+    # ----------------------------
+
+    def scan_buffer(self, buf, base_offset=0):
+        """扫描字节缓冲区 (bytes/bytearray/mmap)
+
+        Returns:
+            [{"offset", "key_size", "key", "bit_errors"}]，按偏移排序
+        """
+        results = []
+        length = len(buf)
+        for key_size in self.key_sizes:
+            span = _KEY_LAYOUTS[key_size][1] * 4
+            start = 0
+            while start + span <= length and len(results) < self.max_results:
+                n = min(self.chunk_size, length - span + 1 - start)
+                if np is not None:
+                    # 相邻块重叠 span-1 字节，保证跨块的扩展密钥不会遗漏
+                    arr = np.frombuffer(buf, dtype=np.uint8, count=n + span - 1, offset=start)
+                    hits = self._scan_array(arr, n, key_size)
+                    del arr
+                else:
+                    view = bytes(buf[start:start + n + span - 1])
+                    hits = self._scan_python(view, n, key_size)
+                for off, errors in hits:
+                    pos = start + off
+                    results.append({
+                        "offset": base_offset + pos,
+                        "key_size": key_size * 8,
+                        "key": bytes(buf[pos:pos + key_size]).hex(),
+                        "bit_errors": int(errors),
+                    })
+                start += n
+        results.sort(key=lambda r: (r["offset"], r["key_size"]))
+        return results[:self.max_results]
+
+    def scan_file(self, path):
+        """内存映射方式扫描文件"""
+        if not os.path.isfile(path):
+            raise ValueError(f"文件不存在: {path}")
+        if os.path.getsize(path) == 0:
+            return []
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return self.scan_buffer(mm)
+            finally:
+                mm.close()
+
+    @staticmethod
+    def scan(path, sbox=None, swap_key_schedule=False, max_bit_errors=0,
+             key_sizes=(128, 192, 256), max_results=None):
+        """扫描内存镜像文件中的 AES 扩展密钥"""
+        scanner = AesKeyScanner(sbox, swap_key_schedule, max_bit_errors, key_sizes,
+                                max_results=max_results)
+        return scanner.scan_file(path)
@@ -10,6 +10,66 @@ import struct
 import base64
 import os
 import hashlib
+from functools import lru_cache
+
+from core.decoder.context_cache import CONTEXT_CACHE
+from core.decoder.modes import BlockCipherModes
+from core.decoder.gcm import GCMMode
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时回退到逐块实现
+    np = None
+
+
+def _gf_mul(a, b):
+    """GF(2^8) 乘法 (AES 不可约多项式 0x11B)"""
+    r = 0
+    while b:
+        if b & 1:
+            r ^= a
+        a = ((a << 1) ^ 0x1B) & 0xFF if a & 0x80 else a << 1
+        b >>= 1
+    return r
+
+
+@lru_cache(maxsize=32)
+def _build_t_tables(sbox):
+    """根据S盒生成 Te0..Te3 / Td0..Td3 32位轮表
+
+    sbox 为 256 元组 (用作缓存键)，逆S盒由其推导。
+    Te0[x] = (2s, s, s, 3s)，Td0[x] = (14s', 9s', 13s', 11s')，高字节对应第0行；
+    Te1..Te3 / Td1..Td3 为其循环右移 8/16/24 位。
+    """
+    rsbox = [0] * 256
+    for i in range(256):
+        rsbox[sbox[i]] = i
+
+    te0 = [0] * 256
+    td0 = [0] * 256
+    for x in range(256):
+        s = sbox[x]
+        te0[x] = (_gf_mul(s, 2) << 24) | (s << 16) | (s << 8) | _gf_mul(s, 3)
+        r = rsbox[x]
+        td0[x] = (_gf_mul(r, 14) << 24) | (_gf_mul(r, 9) << 16) | (_gf_mul(r, 13) << 8) | _gf_mul(r, 11)
+
+    def ror(table, n):
+        return tuple(((v >> n) | (v << (32 - n))) & 0xFFFFFFFF for v in table)
+
+    te = (tuple(te0), ror(te0, 8), ror(te0, 16), ror(te0, 24))
+    td = (tuple(td0), ror(td0, 8), ror(td0, 16), ror(td0, 24))
+    return te, td, tuple(rsbox)
+
+
+def _inv_mix_word(w):
+    """对单个列字做 InvMixColumns (用于等价解密轮密钥)"""
+    a0, a1, a2, a3 = (w >> 24) & 0xFF, (w >> 16) & 0xFF, (w >> 8) & 0xFF, w & 0xFF
+    m = _gf_mul
+    return ((m(a0, 14) ^ m(a1, 11) ^ m(a2, 13) ^ m(a3, 9)) << 24 |
+            (m(a0, 9) ^ m(a1, 14) ^ m(a2, 11) ^ m(a3, 13)) << 16 |
+            (m(a0, 13) ^ m(a1, 9) ^ m(a2, 14) ^ m(a3, 11)) << 8 |
+            (m(a0, 11) ^ m(a1, 13) ^ m(a2, 9) ^ m(a3, 14)))
+
 
 class AesPure:
     """AES (Advanced Encryption Standard) 纯Python实现"""
@@ -40,6 +100,7 @@ class AesPure:
     ]
 
     def __init__(self, key, sbox=None, swap_key_schedule=False, swap_data_round=False):
+        self.key = bytes(key)
         self.swap_key_schedule = swap_key_schedule
         self.swap_data_round = swap_data_round
         
@@ -48,12 +109,16 @@ class AesPure:
         else:
             self.sbox = self.STANDARD_SBOX
             
-        # 生成逆S盒
-        self.rsbox = [0] * 256
-        for i in range(256):
-            self.rsbox[self.sbox[i]] = i
+        # 生成轮表与逆S盒 (按S盒缓存)
+        self._te, self._td, rsbox = _build_t_tables(tuple(self.sbox))
+        self.rsbox = list(rsbox)
             
         self.key_expansion(key)
+        self._prepare_word_keys()
+
+    def worker_spec(self):
+        """可 pickle 的重建参数 (工作进程内重新完成密钥扩展)"""
+        return AesPure, (self.key, list(self.sbox), self.swap_key_schedule, self.swap_data_round), {}
 
     @staticmethod
     def _sub_word(word, sbox):
@@ -109,6 +174,105 @@ class AesPure:
             
         self.round_keys = [words[i:i+4] for i in range(0, len(words), 4)]
 
+    # --- 逆密钥扩展 ---
+
+    @staticmethod
+    def _inverse_schedule_layout(round_index, key_bits):
+        """校验参数，返回 (Nk, 起始字下标)"""
+        if key_bits not in (128, 192, 256):
+            raise ValueError(f"不支持的AES密钥长度: {key_bits}")
+        nk = key_bits // 32
+        total = 4 * ({4: 10, 6: 12, 8: 14}[nk] + 1)
+        start = 4 * int(round_index)
+        if start < 0 or start + nk > total:
+            raise ValueError(f"轮次 {round_index} 超出范围 (AES-{key_bits} 需要从该轮开始的 {nk * 4} 字节)")
+        return nk, start
+
+    @staticmethod
+    def invert_key_schedule(round_key, round_index, key_bits=128, sbox=None, swap_key_schedule=False):
+        """由第 round_index 轮的轮密钥反推主密钥
+
+        w[i-Nk] = w[i] ^ g(w[i-1])，从已知的 Nk 个连续字逐字向前回推，共 O(轮数) 步。
+        AES-128 只需一个轮密钥 (16字节)；AES-192/256 需要从该轮开始的 Nk 个字
+        (24/32 字节，即第 r 轮与第 r+1 轮轮密钥的前半部分)。
+
+        Args:
+            round_key: 第 round_index 轮起的 Nk*4 字节
+            round_index: 轮次 (0 为主密钥本身)
+            key_bits: 128/192/256
+            sbox: 自定义S盒
+            swap_key_schedule: 密钥调度交换
+        """
+        nk, start = AesPure._inverse_schedule_layout(round_index, key_bits)
+        round_key = bytes(round_key)
+        if len(round_key) < nk * 4:
+            raise ValueError(f"AES-{key_bits} 需要 {nk * 4} 字节的连续轮密钥 (当前: {len(round_key)})")
+        sbox = sbox if sbox and len(sbox) == 256 else AesPure.STANDARD_SBOX
+
+        # window 保存 w[s .. s+Nk-1]
+        window = [list(round_key[4 * j:4 * j + 4]) for j in range(nk)]
+        for s in range(start, 0, -1):
+            i = s + nk - 1
+            temp = window[-2]
+            if i % nk == 0:
+                temp = [sbox[b] for b in temp[1:] + temp[:1]]
+                if swap_key_schedule:
+                    temp.reverse()
+                temp[0] ^= AesPure.RCON[i // nk]
+            elif nk > 6 and i % nk == 4:
+                temp = [sbox[b] for b in temp]
+            window = [[window[-1][j] ^ temp[j] for j in range(4)]] + window[:-1]
+        return bytes(b for w in window for b in w)
+
+    @staticmethod
+    def invert_key_schedule_batch(round_keys, round_index, key_bits=128, sbox=None,
+                                  swap_key_schedule=False):
+        """批量反推主密钥
+
+        Args:
+            round_keys: (N, Nk*4) 的 uint8 数组，或 N*Nk*4 字节的连续数据
+        Returns:
+            NumPy 可用时为 (N, Nk*4) uint8 数组，否则为主密钥 bytes 列表
+        """
+        nk, start = AesPure._inverse_schedule_layout(round_index, key_bits)
+        width = nk * 4
+        if np is None:
+            data = bytes(round_keys)
+            return [AesPure.invert_key_schedule(data[o:o + width], round_index, key_bits,
+                                                sbox, swap_key_schedule)
+                    for o in range(0, len(data) - width + 1, width)]
+
+        arr = np.asarray(round_keys, dtype=np.uint8) if not isinstance(round_keys, (bytes, bytearray)) \
+            else np.frombuffer(round_keys, dtype=np.uint8)
+        arr = arr.reshape(-1, width)
+        table = np.array(sbox if sbox and len(sbox) == 256 else AesPure.STANDARD_SBOX, dtype=np.uint8)
+        # 各字为 (N, 4) 视图，窗口左移时只移动引用
+        window = [arr[:, 4 * j:4 * j + 4] for j in range(nk)]
+        for s in range(start, 0, -1):
+            i = s + nk - 1
+            temp = window[-2]
+            if i % nk == 0:
+                temp = table[temp[:, [1, 2, 3, 0]]]
+                if swap_key_schedule:
+                    temp = temp[:, ::-1].copy()
+                temp[:, 0] ^= AesPure.RCON[i // nk]
+            elif nk > 6 and i % nk == 4:
+                temp = table[temp]
+            window = [window[-1] ^ temp] + window[:-1]
+        return np.concatenate(window, axis=1)
+
+    def _prepare_word_keys(self):
+        """将轮密钥转换为32位列字，并生成等价解密轮密钥"""
+        ek = [(w[0] << 24) | (w[1] << 16) | (w[2] << 8) | w[3]
+              for rk in self.round_keys for w in rk]
+        Nr = self.rounds
+        dk = list(ek[4 * Nr:4 * Nr + 4])
+        for r in range(Nr - 1, 0, -1):
+            dk.extend(_inv_mix_word(w) for w in ek[4 * r:4 * r + 4])
+        dk.extend(ek[0:4])
+        self._ek = ek
+        self._dk = dk
+
     def _magic_swap_state(self, state):
         """
         Magic Swap for Data Round:
@@ -167,6 +331,145 @@ class AesPure:
                 state[i][j] ^= round_key[j][i]
 
     def encrypt_block(self, block):
+        """加密单个16字节块 (T表引擎，每轮处理4个列字)"""
+        te0, te1, te2, te3 = self._te
+        sbox = self.sbox
+        ek = self._ek
+
+        s0, s1, s2, s3 = struct.unpack('>4I', block)
+        s0 ^= ek[0]
+        s1 ^= ek[1]
+        s2 ^= ek[2]
+        s3 ^= ek[3]
+
+        k = 4
+        if self.swap_data_round:
+            # Magic Swap: 列内字节反转，等价于第 r 行从第 3-r 行取字节
+            for _ in range(self.rounds - 1):
+                t0 = (te0[s0 & 0xFF] ^ te1[(s1 >> 8) & 0xFF] ^
+                      te2[(s2 >> 16) & 0xFF] ^ te3[s3 >> 24] ^ ek[k])
+                t1 = (te0[s1 & 0xFF] ^ te1[(s2 >> 8) & 0xFF] ^
+                      te2[(s3 >> 16) & 0xFF] ^ te3[s0 >> 24] ^ ek[k + 1])
+                t2 = (te0[s2 & 0xFF] ^ te1[(s3 >> 8) & 0xFF] ^
+                      te2[(s0 >> 16) & 0xFF] ^ te3[s1 >> 24] ^ ek[k + 2])
+                t3 = (te0[s3 & 0xFF] ^ te1[(s0 >> 8) & 0xFF] ^
+                      te2[(s1 >> 16) & 0xFF] ^ te3[s2 >> 24] ^ ek[k + 3])
+                s0, s1, s2, s3 = t0, t1, t2, t3
+                k += 4
+            # 最后一轮无 MixColumns
+            t0 = ((sbox[s0 & 0xFF] << 24) | (sbox[(s1 >> 8) & 0xFF] << 16) |
+                  (sbox[(s2 >> 16) & 0xFF] << 8) | sbox[s3 >> 24]) ^ ek[k]
+            t1 = ((sbox[s1 & 0xFF] << 24) | (sbox[(s2 >> 8) & 0xFF] << 16) |
+                  (sbox[(s3 >> 16) & 0xFF] << 8) | sbox[s0 >> 24]) ^ ek[k + 1]
+            t2 = ((sbox[s2 & 0xFF] << 24) | (sbox[(s3 >> 8) & 0xFF] << 16) |
+                  (sbox[(s0 >> 16) & 0xFF] << 8) | sbox[s1 >> 24]) ^ ek[k + 2]
+            t3 = ((sbox[s3 & 0xFF] << 24) | (sbox[(s0 >> 8) & 0xFF] << 16) |
+                  (sbox[(s1 >> 16) & 0xFF] << 8) | sbox[s2 >> 24]) ^ ek[k + 3]
+        else:
+            for _ in range(self.rounds - 1):
+                t0 = (te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xFF] ^
+                      te2[(s2 >> 8) & 0xFF] ^ te3[s3 & 0xFF] ^ ek[k])
+                t1 = (te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xFF] ^
+                      te2[(s3 >> 8) & 0xFF] ^ te3[s0 & 0xFF] ^ ek[k + 1])
+                t2 = (te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xFF] ^
+                      te2[(s0 >> 8) & 0xFF] ^ te3[s1 & 0xFF] ^ ek[k + 2])
+                t3 = (te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xFF] ^
+                      te2[(s1 >> 8) & 0xFF] ^ te3[s2 & 0xFF] ^ ek[k + 3])
+                s0, s1, s2, s3 = t0, t1, t2, t3
+                k += 4
+            t0 = ((sbox[s0 >> 24] << 24) | (sbox[(s1 >> 16) & 0xFF] << 16) |
+                  (sbox[(s2 >> 8) & 0xFF] << 8) | sbox[s3 & 0xFF]) ^ ek[k]
+            t1 = ((sbox[s1 >> 24] << 24) | (sbox[(s2 >> 16) & 0xFF] << 16) |
+                  (sbox[(s3 >> 8) & 0xFF] << 8) | sbox[s0 & 0xFF]) ^ ek[k + 1]
+            t2 = ((sbox[s2 >> 24] << 24) | (sbox[(s3 >> 16) & 0xFF] << 16) |
+                  (sbox[(s0 >> 8) & 0xFF] << 8) | sbox[s1 & 0xFF]) ^ ek[k + 2]
+            t3 = ((sbox[s3 >> 24] << 24) | (sbox[(s0 >> 16) & 0xFF] << 16) |
+                  (sbox[(s1 >> 8) & 0xFF] << 8) | sbox[s2 & 0xFF]) ^ ek[k + 3]
+        return struct.pack('>4I', t0, t1, t2, t3)
+
+    def decrypt_block(self, block):
+        """解密单个16字节块 (T表引擎，等价解密结构)"""
+        td0, td1, td2, td3 = self._td
+        rsbox = self.rsbox
+        dk = self._dk
+
+        s0, s1, s2, s3 = struct.unpack('>4I', block)
+        s0 ^= dk[0]
+        s1 ^= dk[1]
+        s2 ^= dk[2]
+        s3 ^= dk[3]
+
+        k = 4
+        if self.swap_data_round:
+            # 逆(Swap+ShiftRows): 第 r 行取自第 c+r+1 列的第 3-r 行
+            for _ in range(self.rounds - 1):
+                t0 = (td0[s1 & 0xFF] ^ td1[(s2 >> 8) & 0xFF] ^
+                      td2[(s3 >> 16) & 0xFF] ^ td3[s0 >> 24] ^ dk[k])
+                t1 = (td0[s2 & 0xFF] ^ td1[(s3 >> 8) & 0xFF] ^
+                      td2[(s0 >> 16) & 0xFF] ^ td3[s1 >> 24] ^ dk[k + 1])
+                t2 = (td0[s3 & 0xFF] ^ td1[(s0 >> 8) & 0xFF] ^
+                      td2[(s1 >> 16) & 0xFF] ^ td3[s2 >> 24] ^ dk[k + 2])
+                t3 = (td0[s0 & 0xFF] ^ td1[(s1 >> 8) & 0xFF] ^
+                      td2[(s2 >> 16) & 0xFF] ^ td3[s3 >> 24] ^ dk[k + 3])
+                s0, s1, s2, s3 = t0, t1, t2, t3
+                k += 4
+            t0 = ((rsbox[s1 & 0xFF] << 24) | (rsbox[(s2 >> 8) & 0xFF] << 16) |
+                  (rsbox[(s3 >> 16) & 0xFF] << 8) | rsbox[s0 >> 24]) ^ dk[k]
+            t1 = ((rsbox[s2 & 0xFF] << 24) | (rsbox[(s3 >> 8) & 0xFF] << 16) |
+                  (rsbox[(s0 >> 16) & 0xFF] << 8) | rsbox[s1 >> 24]) ^ dk[k + 1]
+            t2 = ((rsbox[s3 & 0xFF] << 24) | (rsbox[(s0 >> 8) & 0xFF] << 16) |
+                  (rsbox[(s1 >> 16) & 0xFF] << 8) | rsbox[s2 >> 24]) ^ dk[k + 2]
+            t3 = ((rsbox[s0 & 0xFF] << 24) | (rsbox[(s1 >> 8) & 0xFF] << 16) |
+                  (rsbox[(s2 >> 16) & 0xFF] << 8) | rsbox[s3 >> 24]) ^ dk[k + 3]
+        else:
+            for _ in range(self.rounds - 1):
+                t0 = (td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xFF] ^
+                      td2[(s2 >> 8) & 0xFF] ^ td3[s1 & 0xFF] ^ dk[k])
+                t1 = (td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xFF] ^
+                      td2[(s3 >> 8) & 0xFF] ^ td3[s2 & 0xFF] ^ dk[k + 1])
+                t2 = (td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xFF] ^
+                      td2[(s0 >> 8) & 0xFF] ^ td3[s3 & 0xFF] ^ dk[k + 2])
+                t3 = (td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xFF] ^
+                      td2[(s1 >> 8) & 0xFF] ^ td3[s0 & 0xFF] ^ dk[k + 3])
+                s0, s1, s2, s3 = t0, t1, t2, t3
+                k += 4
+            t0 = ((rsbox[s0 >> 24] << 24) | (rsbox[(s3 >> 16) & 0xFF] << 16) |
+                  (rsbox[(s2 >> 8) & 0xFF] << 8) | rsbox[s1 & 0xFF]) ^ dk[k]
+            t1 = ((rsbox[s1 >> 24] << 24) | (rsbox[(s0 >> 16) & 0xFF] << 16) |
+                  (rsbox[(s3 >> 8) & 0xFF] << 8) | rsbox[s2 & 0xFF]) ^ dk[k + 1]
+            t2 = ((rsbox[s2 >> 24] << 24) | (rsbox[(s1 >> 16) & 0xFF] << 16) |
+                  (rsbox[(s0 >> 8) & 0xFF] << 8) | rsbox[s3 & 0xFF]) ^ dk[k + 2]
+            t3 = ((rsbox[s3 >> 24] << 24) | (rsbox[(s2 >> 16) & 0xFF] << 16) |
+                  (rsbox[(s1 >> 8) & 0xFF] << 8) | rsbox[s0 & 0xFF]) ^ dk[k + 3]
+        return struct.pack('>4I', t0, t1, t2, t3)
+
+    def encrypt_blocks(self, data):
+        """批量加密若干完整块 (块间无依赖，可用 NumPy 向量化)"""
+        if np is not None and len(data) >= AesBatch.MIN_BLOCKS * 16:
+            return self._get_batch().encrypt_blocks(data)
+        out = bytearray()
+        for i in range(0, len(data) - 15, 16):
+            out += self.encrypt_block(data[i:i+16])
+        return bytes(out)
+
+    def decrypt_blocks(self, data):
+        """批量解密若干完整块"""
+        if np is not None and len(data) >= AesBatch.MIN_BLOCKS * 16:
+            return self._get_batch().decrypt_blocks(data)
+        out = bytearray()
+        for i in range(0, len(data) - 15, 16):
+            out += self.decrypt_block(data[i:i+16])
+        return bytes(out)
+
+    def _get_batch(self):
+        batch = getattr(self, '_batch', None)
+        if batch is None:
+            batch = self._batch = AesBatch(self)
+        return batch
+
+    # --- 逐字节状态矩阵实现 (参考实现，用于校验T表引擎) ---
+
+    def _encrypt_block_state(self, block):
         # block -> state (4x4)
         state = [list(block[i:i+4]) for i in range(0, 16, 4)]
         # Transpose: state[row][col]
@@ -193,7 +496,7 @@ class AesPure:
                 output.append(state[i][j])
         return bytes(output)
 
-    def decrypt_block(self, block):
+    def _decrypt_block_state(self, block):
         state = [list(block[i:i+4]) for i in range(0, 16, 4)]
         state = [[state[j][i] for j in range(4)] for i in range(4)]
         
@@ -225,6 +528,100 @@ class AesPure:
                 output.append(state[i][j])
         return bytes(output)
 
+def _aes_gather_indices(swap_data_round):
+    """生成 (N,16) 状态上的 ShiftRows/MixColumns 取数索引
+
+    块内字节按列主序排列: index = col * 4 + row。
+    """
+    shift = [0] * 16
+    for c in range(4):
+        for r in range(4):
+            src_row = 3 - r if swap_data_round else r
+            shift[c * 4 + r] = ((c + r) % 4) * 4 + src_row
+    inv_shift = [0] * 16
+    for i, j in enumerate(shift):
+        inv_shift[j] = i
+    # rot[k]: 同列中第 (row + k) % 4 行
+    rot = [[c * 4 + (r + k) % 4 for c in range(4) for r in range(4)] for k in range(4)]
+    return shift, inv_shift, rot
+
+
+class AesBatch:
+    """AES 多块向量化实现 (NumPy)
+
+    将 N 个块保存为 (N,16) uint8 数组:
+    SubBytes 为S盒花式索引，ShiftRows (含 Magic Swap) 为一次取数重排，
+    MixColumns 使用预计算的 GF(2^8) 乘法表。
+    """
+
+    MIN_BLOCKS = 64          # 少于该块数时逐块处理更快
+    CHUNK_BLOCKS = 1 << 16   # 每次处理的块数，限制临时数组大小
+
+    def __init__(self, aes):
+        if np is None:
+            raise RuntimeError("AesBatch 需要 NumPy")
+        self.rounds = aes.rounds
+        self.sbox = np.array(aes.sbox, dtype=np.uint8)
+        self.rsbox = np.array(aes.rsbox, dtype=np.uint8)
+        # round_keys[r][col][row] -> 列主序16字节
+        self.round_keys = np.array([[b for w in rk for b in w] for rk in aes.round_keys],
+                                   dtype=np.uint8)
+        shift, inv_shift, rot = _aes_gather_indices(aes.swap_data_round)
+        self.shift = np.array(shift, dtype=np.intp)
+        self.inv_shift = np.array(inv_shift, dtype=np.intp)
+        self.rot1, self.rot2, self.rot3 = (np.array(r, dtype=np.intp) for r in rot[1:])
+        self.mul = {m: np.array([_gf_mul(x, m) for x in range(256)], dtype=np.uint8)
+                    for m in (2, 3, 9, 11, 13, 14)}
+
+    def _mix_columns(self, s):
+        m2, m3 = self.mul[2], self.mul[3]
+        return m2[s] ^ m3[s[:, self.rot1]] ^ s[:, self.rot2] ^ s[:, self.rot3]
+
+    def _inv_mix_columns(self, s):
+        m = self.mul
+        return m[14][s] ^ m[11][s[:, self.rot1]] ^ m[13][s[:, self.rot2]] ^ m[9][s[:, self.rot3]]
+
+    def _encrypt_array(self, s):
+        rk = self.round_keys
+        s = s ^ rk[0]
+        for i in range(1, self.rounds):
+            s = self.sbox[s[:, self.shift]]
+            s = self._mix_columns(s)
+            s ^= rk[i]
+        s = self.sbox[s[:, self.shift]]
+        s ^= rk[self.rounds]
+        return s
+
+    def _decrypt_array(self, s):
+        rk = self.round_keys
+        s = s ^ rk[self.rounds]
+        for i in range(self.rounds - 1, 0, -1):
+            s = self.rsbox[s[:, self.inv_shift]]
+            s ^= rk[i]
+            s = self._inv_mix_columns(s)
+        s = self.rsbox[s[:, self.inv_shift]]
+        s ^= rk[0]
+        return s
+
+    def _run(self, data, func):
+        arr = np.frombuffer(bytes(data), dtype=np.uint8)
+        n = len(arr) // 16
+        arr = arr[:n * 16].reshape(n, 16)
+        out = np.empty_like(arr)
+        step = self.CHUNK_BLOCKS
+        for i in range(0, n, step):
+            out[i:i + step] = func(arr[i:i + step])
+        return out.tobytes()
+
+    def encrypt_blocks(self, data):
+        """加密 16 字节整数倍的数据 (ECB 语义)"""
+        return self._run(data, self._encrypt_array)
+
+    def decrypt_blocks(self, data):
+        """解密 16 字节整数倍的数据 (ECB 语义)"""
+        return self._run(data, self._decrypt_array)
+
+
 class AesPureEncoders:
     """封装 AesPure 用于业务调用"""
     
@@ -281,17 +678,90 @@ class AesPureEncoders:
             pass
         return None
 
+    @staticmethod
+    def invert_key(round_key: str, round_index: int = 10, key_bits: int = 128, sbox=None,
+                   swap_key_schedule: bool = False) -> str:
+        """由轮密钥反推主密钥
+
+        Args:
+            round_key: 第 round_index 轮起的轮密钥 (Hex，AES-192/256 需 24/32 字节)
+            round_index: 轮次
+            key_bits: 主密钥长度 (128/192/256)
+            sbox: 自定义S盒
+            swap_key_schedule: 密钥调度交换
+        Returns:
+            主密钥 (Hex)
+        """
+        try:
+            rk = bytes.fromhex(round_key.replace(' ', '').replace('\n', ''))
+        except ValueError:
+            raise ValueError("轮密钥不是有效的Hex字符串")
+        return AesPure.invert_key_schedule(rk, int(round_index), int(key_bits),
+                                           AesPureEncoders._parse_sbox(sbox), swap_key_schedule).hex()
+
+    @staticmethod
+    def _parse_iv(iv, iv_type, mode):
+        """解析IV (未提供时为全零，GCM 则随机生成以免 nonce 复用；GCM 默认12字节且允许任意非空长度)"""
+        iv_len = GCMMode.DEFAULT_IV_SIZE if mode == 'GCM' else 16
+        if not iv:
+            return os.urandom(iv_len) if mode == 'GCM' else b'\x00' * iv_len
+        if iv_type.lower() == 'hex':
+            try:
+                iv_bytes = bytes.fromhex(iv.replace(' ', ''))
+            except ValueError:
+                raise ValueError("IV不是有效的Hex字符串")
+            if mode != 'GCM' and len(iv_bytes) != 16:
+                raise ValueError(f"IV Hex长度必须为16字节 (当前: {len(iv_bytes)})")
+            return iv_bytes
+        return hashlib.md5(iv.encode('utf-8')).digest()[:iv_len]
+
+    @staticmethod
+    def _parse_aad(aad, aad_type):
+        """解析GCM附加认证数据"""
+        if not aad:
+            return b''
+        if aad_type.lower() == 'hex':
+            try:
+                return bytes.fromhex(aad.replace(' ', ''))
+            except ValueError:
+                raise ValueError("AAD不是有效的Hex字符串")
+        return aad.encode('utf-8')
+
+    @staticmethod
+    def _get_context(key_bytes, sbox, swap_key_schedule, swap_data_round, direction,
+                     rounds=None, mix_matrix=None, shift_offsets=None, rcon=None):
+        """从共享缓存获取已完成密钥扩展的 AesPure 对象
+
+        指定了魔改轮数/MixColumns/ShiftRows/RCON 时返回编译后的 AesVariant
+        """
+        from core.decoder.aes_variant import AesVariant
+
+        flags = (bool(swap_key_schedule), bool(swap_data_round))
+        if AesVariant.is_standard(rounds, mix_matrix, shift_offsets, rcon, key_bytes):
+            cache_key = CONTEXT_CACHE.make_key('aes', key_bytes, sbox, flags, direction)
+            return CONTEXT_CACHE.get(cache_key, lambda: AesPure(
+                key_bytes, AesPureEncoders._parse_sbox(sbox), *flags))
+
+        variant = (int(rounds or 0), AesVariant.parse_matrix(mix_matrix),
+                   AesVariant.parse_offsets(shift_offsets), tuple(AesVariant.parse_rcon(rcon) or ()))
+        cache_key = CONTEXT_CACHE.make_key('aes_variant', key_bytes, sbox, flags + variant, direction)
+        return CONTEXT_CACHE.get(cache_key, lambda: AesVariant(
+            key_bytes, AesPureEncoders._parse_sbox(sbox), *flags,
+            rounds=rounds, mix_matrix=variant[1], shift_offsets=variant[2], rcon=list(variant[3])))
+
     @staticmethod
     def encrypt(data: str, key: str, mode: str = 'ECB', iv: str = '', padding: str = 'pkcs7', 
                 sbox=None, swap_key_schedule: bool = False, swap_data_round: bool = False,
-                key_type: str = 'utf-8', iv_type: str = 'utf-8', data_type: str = None) -> str:
+                key_type: str = 'utf-8', iv_type: str = 'utf-8', data_type: str = None,
+                parallel: bool = False, aad: str = '', aad_type: str = 'utf-8',
+                rounds: int = None, mix_matrix=None, shift_offsets=None, rcon=None) -> str:
         """AES加密
         
         Args:
             data: 输入明文
             key: 密钥
-            mode: 加密模式 (ECB/CBC/CFB/OFB/CTR)
-            iv: 初始化向量
+            mode: 加密模式 (ECB/CBC/CFB/OFB/CTR/GCM)
+            iv: 初始化向量 (GCM 未提供时随机生成并置于密文前)
             padding: 填充方式 (pkcs7/zeropadding/nopadding/iso10126/ansix923)
             sbox: 自定义S盒 (256字节)
             swap_key_schedule: 密钥调度交换
@@ -299,6 +769,10 @@ class AesPureEncoders:
             key_type: 密钥格式 (hex/utf-8)
             iv_type: IV格式 (hex/utf-8)
             data_type: 数据格式 (hex/utf-8)
+            parallel: 大数据量时使用多进程并行 (仅块间无依赖的模式)
+            aad: GCM附加认证数据
+            aad_type: 附加认证数据格式 (hex/utf-8)
+            rounds / mix_matrix / shift_offsets / rcon: 魔改 AES 参数 (见 AesVariant)
         """
         if not data:
             return ""
@@ -312,10 +786,9 @@ class AesPureEncoders:
         else:
             key_bytes = hashlib.sha256(key.encode('utf-8')).digest()
         
-        # 自定义S盒
-        custom_sbox = AesPureEncoders._parse_sbox(sbox)
-        
-        aes = AesPure(key_bytes, custom_sbox, swap_key_schedule, swap_data_round)
+        # 密码上下文 (按密钥/S盒/交换标志缓存)
+        aes = AesPureEncoders._get_context(key_bytes, sbox, swap_key_schedule, swap_data_round, 'encrypt',
+                                           rounds, mix_matrix, shift_offsets, rcon)
         
         # 数据处理
         if data_type and data_type.lower() == 'hex':
@@ -329,22 +802,19 @@ class AesPureEncoders:
         mode = mode.upper()
         
         # IV处理
-        if mode in ['CBC', 'CFB', 'OFB', 'CTR']:
-            if not iv:
-                iv_bytes = b'\x00' * 16
-            elif iv_type.lower() == 'hex':
-                try:
-                    iv_bytes = bytes.fromhex(iv.replace(' ', ''))
-                    if len(iv_bytes) != 16:
-                        raise ValueError(f"IV Hex长度必须为16字节 (当前: {len(iv_bytes)})")
-                except ValueError as e:
-                    if "IV Hex" in str(e): raise e
-                    raise ValueError("IV不是有效的Hex字符串")
-            else:
-                iv_bytes = hashlib.md5(iv.encode('utf-8')).digest()
+        if mode in ['CBC', 'CFB', 'OFB', 'CTR', 'GCM']:
+            iv_bytes = AesPureEncoders._parse_iv(iv, iv_type, mode)
         else:
             iv_bytes = None
         
+        if mode == 'GCM':
+            ciphertext, tag = GCMMode.encrypt(aes, data_bytes, iv_bytes,
+                                              AesPureEncoders._parse_aad(aad, aad_type))
+            res = ciphertext + tag
+            if not iv:
+                res = iv_bytes + res
+            return base64.b64encode(res).decode('utf-8')
+        
         # 流模式不需要填充
         is_stream = mode in ['CFB', 'OFB', 'CTR']
         if is_stream and padding.lower() == 'nopadding':
@@ -352,55 +822,7 @@ class AesPureEncoders:
         else:
             padded = AesPureEncoders._pad(data_bytes, padding)
         
-        res = b''
-        
-        if mode == 'ECB':
-            for i in range(0, len(padded), 16):
-                block = padded[i:i+16]
-                if len(block) < 16: break
-                res += aes.encrypt_block(block)
-                
-        elif mode == 'CBC':
-            prev = iv_bytes
-            for i in range(0, len(padded), 16):
-                block = bytes([a ^ b for a, b in zip(padded[i:i+16], prev)])
-                enc = aes.encrypt_block(block)
-                res += enc
-                prev = enc
-                
-        elif mode == 'CTR':
-            ctr = int.from_bytes(iv_bytes, byteorder='big')
-            for i in range(0, len(padded), 16):
-                block = padded[i:i+16]
-                ctr_block = ctr.to_bytes(16, byteorder='big')
-                keystream = aes.encrypt_block(ctr_block)
-                chunk_len = len(block)
-                cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                res += cipher_chunk
-                ctr += 1
-                
-        elif mode == 'OFB':
-            last_iv = iv_bytes
-            for i in range(0, len(padded), 16):
-                block = padded[i:i+16]
-                keystream = aes.encrypt_block(last_iv)
-                chunk_len = len(block)
-                cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                res += cipher_chunk
-                last_iv = keystream
-                
-        elif mode == 'CFB':
-            last_block = iv_bytes
-            for i in range(0, len(padded), 16):
-                block = padded[i:i+16]
-                keystream = aes.encrypt_block(last_block)
-                chunk_len = len(block)
-                cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                res += cipher_chunk
-                if chunk_len == 16:
-                    last_block = cipher_chunk
-        else:
-            raise ValueError(f"不支持的加密模式: {mode}")
+        res = BlockCipherModes.encrypt(aes, mode, padded, iv_bytes, 16, parallel=parallel)
         
         # 返回自动携带IV（当IV未提供且非ECB模式时）
         if not iv and iv_bytes and mode != 'ECB':
@@ -410,14 +832,16 @@ class AesPureEncoders:
     @staticmethod
     def decrypt(data: str, key: str, mode: str = 'ECB', iv: str = '', padding: str = 'pkcs7', 
                 sbox=None, swap_key_schedule: bool = False, swap_data_round: bool = False,
-                key_type: str = 'utf-8', iv_type: str = 'utf-8', data_type: str = None) -> str:
+                key_type: str = 'utf-8', iv_type: str = 'utf-8', data_type: str = None,
+                parallel: bool = False, aad: str = '', aad_type: str = 'utf-8',
+                rounds: int = None, mix_matrix=None, shift_offsets=None, rcon=None) -> str:
         """AES解密
         
         Args:
             data: 输入密文 (Base64或Hex)
             key: 密钥
-            mode: 加密模式 (ECB/CBC/CFB/OFB/CTR)
-            iv: 初始化向量
+            mode: 加密模式 (ECB/CBC/CFB/OFB/CTR/GCM)
+            iv: 初始化向量 (未提供时从密文头部提取)
             padding: 填充方式 (pkcs7/zeropadding/nopadding/iso10126/ansix923)
             sbox: 自定义S盒 (256字节)
             swap_key_schedule: 密钥调度交换
@@ -425,6 +849,10 @@ class AesPureEncoders:
             key_type: 密钥格式 (hex/utf-8)
             iv_type: IV格式 (hex/utf-8)
             data_type: 数据格式 (hex/base64)
+            parallel: 大数据量时使用多进程并行 (仅块间无依赖的模式)
+            aad: GCM附加认证数据
+            aad_type: 附加认证数据格式 (hex/utf-8)
+            rounds / mix_matrix / shift_offsets / rcon: 魔改 AES 参数 (见 AesVariant)
         """
         if not data:
             return ""
@@ -438,10 +866,9 @@ class AesPureEncoders:
         else:
             key_bytes = hashlib.sha256(key.encode('utf-8')).digest()
         
-        # 自定义S盒
-        custom_sbox = AesPureEncoders._parse_sbox(sbox)
-        
-        aes = AesPure(key_bytes, custom_sbox, swap_key_schedule, swap_data_round)
+        # 密码上下文 (按密钥/S盒/交换标志缓存)
+        aes = AesPureEncoders._get_context(key_bytes, sbox, swap_key_schedule, swap_data_round, 'decrypt',
+                                           rounds, mix_matrix, shift_offsets, rcon)
         
         # 数据处理
         try:
@@ -462,78 +889,29 @@ class AesPureEncoders:
         iv_bytes = None
         data_content = encrypted
         
-        if mode in ['CBC', 'CFB', 'OFB', 'CTR']:
+        if mode in ['CBC', 'CFB', 'OFB', 'CTR', 'GCM']:
             if iv:
-                if iv_type.lower() == 'hex':
-                    try:
-                        iv_bytes = bytes.fromhex(iv.replace(' ', ''))
-                        if len(iv_bytes) != 16:
-                            raise ValueError(f"IV Hex长度必须为16字节 (当前: {len(iv_bytes)})")
-                    except ValueError as e:
-                        if "IV Hex" in str(e): raise e
-                        raise ValueError("IV不是有效的Hex字符串")
-                else:
-                    iv_bytes = hashlib.md5(iv.encode('utf-8')).digest()
+                iv_bytes = AesPureEncoders._parse_iv(iv, iv_type, mode)
             else:
                 # 从密文中提取IV
-                if len(encrypted) < 16:
+                iv_len = GCMMode.DEFAULT_IV_SIZE if mode == 'GCM' else 16
+                if len(encrypted) < iv_len:
                     raise ValueError("加密数据太短，无法提取IV")
-                iv_bytes = encrypted[:16]
-                data_content = encrypted[16:]
+                iv_bytes = encrypted[:iv_len]
+                data_content = encrypted[iv_len:]
         
-        res = b''
-        
-        if mode == 'ECB':
-            for i in range(0, len(data_content), 16):
-                block = data_content[i:i+16]
-                if len(block) < 16: break
-                res += aes.decrypt_block(block)
-                
-        elif mode == 'CBC':
-            prev = iv_bytes
-            for i in range(0, len(data_content), 16):
-                block = data_content[i:i+16]
-                if len(block) < 16: break
-                dec = aes.decrypt_block(block)
-                res += bytes([a ^ b for a, b in zip(dec, prev)])
-                prev = block
-                
-        elif mode == 'CTR':
-            ctr = int.from_bytes(iv_bytes, byteorder='big')
-            for i in range(0, len(data_content), 16):
-                block = data_content[i:i+16]
-                ctr_block = ctr.to_bytes(16, byteorder='big')
-                keystream = aes.encrypt_block(ctr_block)
-                chunk_len = len(block)
-                plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                res += plain_chunk
-                ctr += 1
-                
-        elif mode == 'OFB':
-            last_iv = iv_bytes
-            for i in range(0, len(data_content), 16):
-                block = data_content[i:i+16]
-                keystream = aes.encrypt_block(last_iv)
-                chunk_len = len(block)
-                plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                res += plain_chunk
-                last_iv = keystream
-                
-        elif mode == 'CFB':
-            last_block = iv_bytes
-            for i in range(0, len(data_content), 16):
-                block = data_content[i:i+16]
-                keystream = aes.encrypt_block(last_block)
-                chunk_len = len(block)
-                plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                res += plain_chunk
-                if chunk_len == 16:
-                    last_block = block
+        if mode == 'GCM':
+            # 末尾16字节为认证标签，校验失败时抛出异常
+            if len(data_content) < GCMMode.TAG_SIZE:
+                raise ValueError("加密数据太短，缺少GCM认证标签")
+            tag = data_content[-GCMMode.TAG_SIZE:]
+            res = GCMMode.decrypt(aes, data_content[:-GCMMode.TAG_SIZE], iv_bytes, tag,
+                                  AesPureEncoders._parse_aad(aad, aad_type))
         else:
-            raise ValueError(f"不支持的加密模式: {mode}")
+            res = BlockCipherModes.decrypt(aes, mode, data_content, iv_bytes, 16, parallel=parallel)
         
         # 去填充
-        is_stream = mode in ['CFB', 'OFB', 'CTR']
+        is_stream = mode in ['CFB', 'OFB', 'CTR', 'GCM']
         if not is_stream:
             try:
                 res = AesPureEncoders._unpad(res, padding)
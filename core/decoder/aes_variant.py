@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可配置 AES 变体 (魔改轮数 / MixColumns 矩阵 / ShiftRows 偏移 / RCON)
+每组参数被编译为专用的轮函数: 生成展开所有轮次的 Python 源码并 exec，
+T表按 S盒与 MixColumns 矩阵预计算，编译结果按参数集合缓存
+
+加密轮: SubBytes -> (Magic Swap) -> ShiftRows -> MixColumns -> AddRoundKey
+解密使用等价逆密码结构，逆 MixColumns 矩阵通过 GF(2^8) 上的 Gauss-Jordan 消元求得
+"""
+
+import json
+import struct
+from functools import lru_cache
+
+from core.decoder.aes_pure import AesPure, _gf_mul
+
+
+# 标准参数
+STANDARD_MIX_MATRIX = ((2, 3, 1, 1), (1, 2, 3, 1), (1, 1, 2, 3), (3, 1, 1, 2))
+STANDARD_SHIFT_OFFSETS = (0, 1, 2, 3)
+
+
+def _gf_inv(a):
+    """GF(2^8) 乘法逆元 (a^254)"""
+    if a == 0:
+        raise ZeroDivisionError
+    result, base, e = 1, a, 254
+    while e:
+        if e & 1:
+            result = _gf_mul(result, base)
+        base = _gf_mul(base, base)
+        e >>= 1
+    return result
+
+
+def gf_matrix_inverse(matrix):
+    """GF(2^8) 上 4x4 矩阵求逆 (Gauss-Jordan 消元)"""
+    n = len(matrix)
+    aug = [list(row) + [1 if i == j else 0 for j in range(n)] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = next((r for r in range(col, n) if aug[r][col]), None)
+        if pivot is None:
+            raise ValueError("MixColumns矩阵在GF(2^8)上不可逆")
+        aug[col], aug[pivot] = aug[pivot], aug[col]
+        inv = _gf_inv(aug[col][col])
+        aug[col] = [_gf_mul(v, inv) for v in aug[col]]
+        for r in range(n):
+            if r != col and aug[r][col]:
+                f = aug[r][col]
+                aug[r] = [v ^ _gf_mul(f, p) for v, p in zip(aug[r], aug[col])]
+    return tuple(tuple(row[n:]) for row in aug)
+
+
+def default_rcon(count):
+    """生成 count 个 RCON (RCON[0] 占位，RCON[i] = x^(i-1))"""
+    rcon = [0x00, 0x01]
+    while len(rcon) < count:
+        rcon.append(_gf_mul(rcon[-1], 2))
+    return rcon[:count]
+
+
+def _mix_word(matrix, w):
+    """对单个列字做矩阵乘法"""
+    col = ((w >> 24) & 0xFF, (w >> 16) & 0xFF, (w >> 8) & 0xFF, w & 0xFF)
+    out = 0
+    for i in range(4):
+        v = 0
+        for j in range(4):
+            v ^= _gf_mul(matrix[i][j], col[j])
+        out = (out << 8) | v
+    return out
+
+
+def _byte_expr(var, row):
+    """列字 var 中第 row 行字节的表达式 (第0行为最高字节)"""
+    if row == 0:
+        return f"{var} >> 24"
+    if row == 3:
+        return f"{var} & 0xFF"
+    return f"({var} >> {24 - 8 * row}) & 0xFF"
+
+
+def _generate_source(rounds, offsets, swap_data_round):
+    """生成展开全部轮次的加解密函数源码"""
+    def src_row(j):
+        return 3 - j if swap_data_round else j
+
+    def enc_src(j, c):
+        # 经 Swap+ShiftRows 后第 j 行第 c 列的字节来自 (src_row(j), c + offset[j])
+        return f"s{(c + offsets[j]) % 4}", src_row(j)
+
+    def dec_src(j, c):
+        # 逆置换: 第 j 行第 c 列取自 (src_row(j), c - offset[src_row(j)])
+        r = src_row(j)
+        return f"s{(c - offsets[r]) % 4}", r
+
+    lines = ["def encrypt_block(block, ek):",
+             "    s0, s1, s2, s3 = _unpack(block)",
+             "    s0 ^= ek[0]; s1 ^= ek[1]; s2 ^= ek[2]; s3 ^= ek[3]"]
+    for r in range(1, rounds):
+        for c in range(4):
+            terms = [f"T{j}[{_byte_expr(*enc_src(j, c))}]" for j in range(4)]
+            lines.append(f"    t{c} = " + " ^ ".join(terms) + f" ^ ek[{4 * r + c}]")
+        lines.append("    s0, s1, s2, s3 = t0, t1, t2, t3")
+    for c in range(4):
+        parts = [f"(S[{_byte_expr(*enc_src(j, c))}] << {24 - 8 * j})" for j in range(4)]
+        lines.append(f"    t{c} = (" + " | ".join(parts) + f") ^ ek[{4 * rounds + c}]")
+    lines.append("    return _pack(t0, t1, t2, t3)")
+
+    lines += ["", "def decrypt_block(block, dk):",
+              "    s0, s1, s2, s3 = _unpack(block)",
+              "    s0 ^= dk[0]; s1 ^= dk[1]; s2 ^= dk[2]; s3 ^= dk[3]"]
+    for r in range(1, rounds):
+        for c in range(4):
+            terms = [f"D{j}[{_byte_expr(*dec_src(j, c))}]" for j in range(4)]
+            lines.append(f"    t{c} = " + " ^ ".join(terms) + f" ^ dk[{4 * r + c}]")
+        lines.append("    s0, s1, s2, s3 = t0, t1, t2, t3")
+    for c in range(4):
+        parts = [f"(RS[{_byte_expr(*dec_src(j, c))}] << {24 - 8 * j})" for j in range(4)]
+        lines.append(f"    t{c} = (" + " | ".join(parts) + f") ^ dk[{4 * rounds + c}]")
+    lines.append("    return _pack(t0, t1, t2, t3)")
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=32)
+def compile_variant(sbox, matrix, offsets, rounds, swap_data_round):
+    """编译一组变体参数，返回 (encrypt_block, decrypt_block, inv_matrix)
+
+    sbox/matrix/offsets 为元组 (用作缓存键)
+    """
+    inv_matrix = gf_matrix_inverse(matrix)
+    rsbox = [0] * 256
+    for i, v in enumerate(sbox):
+        rsbox[v] = i
+
+    # T_j[x]: 第 j 行输入字节 x 经 S盒后对输出列各行的贡献
+    te = [[0] * 256 for _ in range(4)]
+    td = [[0] * 256 for _ in range(4)]
+    for x in range(256):
+        s, rs = sbox[x], rsbox[x]
+        for j in range(4):
+            te[j][x] = ((_gf_mul(matrix[0][j], s) << 24) | (_gf_mul(matrix[1][j], s) << 16) |
+                        (_gf_mul(matrix[2][j], s) << 8) | _gf_mul(matrix[3][j], s))
+            td[j][x] = ((_gf_mul(inv_matrix[0][j], rs) << 24) | (_gf_mul(inv_matrix[1][j], rs) << 16) |
+                        (_gf_mul(inv_matrix[2][j], rs) << 8) | _gf_mul(inv_matrix[3][j], rs))
+
+    s = struct.Struct('>4I')
+    namespace = {
+        '_unpack': s.unpack, '_pack': s.pack,
+        'S': tuple(sbox), 'RS': tuple(rsbox),
+        'T0': tuple(te[0]), 'T1': tuple(te[1]), 'T2': tuple(te[2]), 'T3': tuple(te[3]),
+        'D0': tuple(td[0]), 'D1': tuple(td[1]), 'D2': tuple(td[2]), 'D3': tuple(td[3]),
+    }
+    source = _generate_source(rounds, offsets, swap_data_round)
+    exec(compile(source, f"<aes_variant r{rounds}>", 'exec'), namespace)
+    return namespace['encrypt_block'], namespace['decrypt_block'], inv_matrix
+
+
+class AesVariant:
+    """参数化 AES，接口与 AesPure 相同 (encrypt_block / decrypt_block)"""
+
+    def __init__(self, key, sbox=None, swap_key_schedule=False, swap_data_round=False,
+                 rounds=None, mix_matrix=None, shift_offsets=None, rcon=None):
+        """
+        Args:
+            key: 密钥 (16/24/32 字节，其他长度按 AesPure 规则填充或截取)
+            sbox: 自定义S盒 (256字节)
+            swap_key_schedule / swap_data_round: 同 AesPure
+            rounds: 轮数 (默认按密钥长度 10/12/14)
+            mix_matrix: 4x4 MixColumns 矩阵 (默认标准矩阵)
+            shift_offsets: 各行循环左移量 (默认 0,1,2,3)
+            rcon: 轮常量 (RCON[0] 为占位，默认按 x^(i-1) 生成)
+        """
+        self.sbox = list(sbox) if sbox and len(sbox) == 256 else AesPure.STANDARD_SBOX
+        self.swap_key_schedule = bool(swap_key_schedule)
+        self.swap_data_round = bool(swap_data_round)
+        self.mix_matrix = AesVariant.parse_matrix(mix_matrix)
+        self.shift_offsets = AesVariant.parse_offsets(shift_offsets)
+
+        key = AesVariant._normalize_key(bytes(key))
+        self.key = key
+        nk = len(key) // 4
+        self.rounds = int(rounds) if rounds else {4: 10, 6: 12, 8: 14}[nk]
+        if self.rounds < 1:
+            raise ValueError("轮数必须大于0")
+        total_words = 4 * (self.rounds + 1)
+        needed = (total_words - 1) // nk + 1
+        self.rcon = AesVariant.parse_rcon(rcon) or default_rcon(needed)
+        if len(self.rcon) < needed:
+            raise ValueError(f"RCON 长度不足: {self.rounds} 轮需要 {needed} 项 (含 RCON[0])")
+
+        self._encrypt, self._decrypt, inv_matrix = compile_variant(
+            tuple(self.sbox), self.mix_matrix, self.shift_offsets, self.rounds, self.swap_data_round)
+
+        ek = self._expand_key(key, nk, total_words)
+        self._ek = ek
+        Nr = self.rounds
+        dk = list(ek[4 * Nr:4 * Nr + 4])
+        for r in range(Nr - 1, 0, -1):
+            dk.extend(_mix_word(inv_matrix, w) for w in ek[4 * r:4 * r + 4])
+        dk.extend(ek[0:4])
+        self._dk = dk
+
+    @staticmethod
+    def _normalize_key(key):
+        if len(key) in (16, 24, 32):
+            return key
+        if len(key) < 16:
+            return key + b'\x00' * (16 - len(key))
+        if len(key) < 24:
+            return key[:16]
+        if len(key) < 32:
+            return key[:24]
+        return key[:32]
+
+    def _expand_key(self, key, nk, total_words):
+        """密钥扩展 (与 AesPure.key_expansion 相同，轮数与 RCON 可变)"""
+        sbox = self.sbox
+        words = [list(key[4 * i:4 * i + 4]) for i in range(nk)]
+        for i in range(nk, total_words):
+            temp = list(words[i - 1])
+            if i % nk == 0:
+                temp = [sbox[b] for b in temp[1:] + temp[:1]]
+                if self.swap_key_schedule:
+                    temp.reverse()
+                temp[0] ^= self.rcon[i // nk]
+            elif nk > 6 and i % nk == 4:
+                temp = [sbox[b] for b in temp]
+            words.append([words[i - nk][j] ^ temp[j] for j in range(4)])
+        return [(w[0] << 24) | (w[1] << 16) | (w[2] << 8) | w[3] for w in words]
+
+    def worker_spec(self):
+        """可 pickle 的重建参数 (exec 编译的轮函数不能跨进程传递)"""
+        return AesVariant, (self.key, list(self.sbox), self.swap_key_schedule, self.swap_data_round), {
+            'rounds': self.rounds, 'mix_matrix': self.mix_matrix,
+            'shift_offsets': self.shift_offsets, 'rcon': list(self.rcon)}
+
+    def encrypt_block(self, block):
+        return self._encrypt(block, self._ek)
+
+    def decrypt_block(self, block):
+        return self._decrypt(block, self._dk)
+
+    # ----------------------------
+    # 参数解析
+    # ----------------------------
+
+    @staticmethod
+    def _load(value):
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                return None
+            try:
+                return json.loads(value)
+            except ValueError:
+                return [int(v, 16) if v.lower().startswith('0x') else int(v)
+                        for v in value.replace(',', ' ').split()]
+        return value
+
+    @staticmethod
+    def parse_matrix(value):
+        """解析 MixColumns 矩阵: 4x4 列表，或 4 个元素 (首行，按循环矩阵展开)"""
+        value = AesVariant._load(value)
+        if not value:
+            return STANDARD_MIX_MATRIX
+        if len(value) == 4 and all(isinstance(v, int) for v in value):
+            row = list(value)
+            matrix = tuple(tuple(row[(j - i) % 4] for j in range(4)) for i in range(4))
+        elif len(value) == 16:
+            matrix = tuple(tuple(value[4 * i:4 * i + 4]) for i in range(4))
+        else:
+            matrix = tuple(tuple(r) for r in value)
+        if len(matrix) != 4 or any(len(r) != 4 for r in matrix):
+            raise ValueError("MixColumns矩阵必须为4x4")
+        matrix = tuple(tuple(int(v) & 0xFF for v in r) for r in matrix)
+        gf_matrix_inverse(matrix)  # 校验可逆
+        return matrix
+
+    @staticmethod
+    def parse_offsets(value):
+        """解析 ShiftRows 偏移 (4个整数)"""
+        value = AesVariant._load(value)
+        if not value:
+            return STANDARD_SHIFT_OFFSETS
+        if len(value) != 4:
+            raise ValueError("ShiftRows偏移必须为4个整数")
+        return tuple(int(v) % 4 for v in value)
+
+    @staticmethod
+    def parse_rcon(value):
+        """解析 RCON 列表"""
+        value = AesVariant._load(value)
+        if not value:
+            return None
+        return [int(v) & 0xFF for v in value]
+
+    @staticmethod
+    def is_standard(rounds=None, mix_matrix=None, shift_offsets=None, rcon=None, key=None):
+        """参数是否与该密钥长度下的标准 AES 一致 (可直接使用 AesPure)
+
+        显式给出的轮数/RCON 与标准值相同时也视为标准；未提供 key 时仅默认值视为标准。
+        """
+        if (AesVariant.parse_matrix(mix_matrix) != STANDARD_MIX_MATRIX
+                or AesVariant.parse_offsets(shift_offsets) != STANDARD_SHIFT_OFFSETS):
+            return False
+        rcon = AesVariant.parse_rcon(rcon)
+        if key is None:
+            return not rounds and not rcon
+        nk = len(AesVariant._normalize_key(bytes(key))) // 4
+        standard_rounds = {4: 10, 6: 12, 8: 14}[nk]
+        if rounds and int(rounds) != standard_rounds:
+            return False
+        if not rcon:
+            return True
+        # RCON[0] 为占位，只比较密钥扩展实际用到的项
+        needed = (4 * (standard_rounds + 1) - 1) // nk + 1
+        return len(rcon) >= needed and rcon[1:needed] == default_rcon(needed)[1:]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+密码上下文缓存
+缓存已解析S盒、已完成密钥扩展的密码对象，避免实时预览时重复初始化
+缓存键: (算法, 密钥字节, S盒摘要, 交换标志, 方向)；S盒摘要基于规整后的数值计算
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+class CipherContextCache:
+    """有界 LRU 密码上下文缓存 (线程安全)"""
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize_sbox(sbox):
+        """将S盒输入规整为 (嵌套) 整数列表: JSON 文本、Hex 文本 (忽略空白/大小写)、字节串与元组等写法一致"""
+        if isinstance(sbox, str):
+            text = sbox.strip()
+            try:
+                return CipherContextCache._normalize_sbox(json.loads(text))
+            except ValueError:
+                pass
+            try:
+                return list(bytes.fromhex(''.join(text.split())))
+            except ValueError:
+                return text  # 无法解析时按原文
+        if isinstance(sbox, (bytes, bytearray)):
+            return list(sbox)
+        if isinstance(sbox, (list, tuple)):
+            return [CipherContextCache._normalize_sbox(v) for v in sbox]
+        return sbox
+
+    @staticmethod
+    def sbox_digest(sbox):
+        """计算S盒摘要 (基于规整后的数值，同一S盒的不同写法共享缓存项)"""
+        if not sbox:
+            return ''
+        normalized = CipherContextCache._normalize_sbox(sbox)
+        raw = json.dumps(normalized, separators=(',', ':'), default=str).encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()
+
+    @classmethod
+    def make_key(cls, algorithm, key_bytes, sbox=None, flags=(), direction=''):
+        """构造缓存键"""
+        return (algorithm, bytes(key_bytes), cls.sbox_digest(sbox), tuple(flags), direction)
+
+    def get(self, key, factory):
+        """获取上下文，未命中时调用 factory() 创建并缓存"""
+        with self._lock:
+            ctx = self._items.get(key)
+            if ctx is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return ctx
+            self.misses += 1
+
+        # 在锁外构建，避免长时间的密钥扩展阻塞其他请求
+        ctx = factory()
+
+        with self._lock:
+            self._items[key] = ctx
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return ctx
+
+    def clear(self):
+        """清空缓存并重置计数"""
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """命中/未命中/淘汰计数"""
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# 所有解码器与操作链共享的全局缓存
+CONTEXT_CACHE = CipherContextCache()
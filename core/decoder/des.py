@@ -5,12 +5,71 @@ DES/3DES 算法纯Python实现
 支持模式: ECB, CBC, CFB, OFB, CTR
 支持自定义S盒 (Magic S-Box)
 支持3DES (EDE模式)
+
+分组运算使用 32/64 位整数: IP/FP、E、PC1/PC2 为按字节索引的置换表，
+S盒与 P置换合并为 SP 表 (由当前S盒生成并按内容缓存)，每轮 4 次 E 查表 + 8 次 SP 查表。
+比特列表实现保留为参考 (_des_block)。
+大批量完整块 (ECB、CTR、CBC解密) 在安装 NumPy 时交给位切片引擎 (des_bitslice)。
 """
 
 import struct
 import base64
 import os
 import hashlib
+from functools import lru_cache
+
+from core.decoder.context_cache import CONTEXT_CACHE
+from core.decoder.modes import BlockCipherModes
+
+
+@lru_cache(maxsize=None)
+def _byte_perm_tables(table, in_bits):
+    """将置换表 (1-based，按最高位编号) 展开为按字节索引的查找表
+
+    返回 tables[p][v]: 输入第 p 个字节 (p=0 为最高字节) 取值 v 时对输出的贡献，
+    置换结果为各字节贡献的按位或。
+    """
+    out_bits = len(table)
+    tables = []
+    for p in range(in_bits // 8):
+        row = []
+        for v in range(256):
+            acc = 0
+            for j, src in enumerate(table):
+                src -= 1
+                if src // 8 == p and (v >> (7 - src % 8)) & 1:
+                    acc |= 1 << (out_bits - 1 - j)
+            row.append(acc)
+        tables.append(tuple(row))
+    return tuple(tables)
+
+
+def _permute_int(x, tables):
+    """按字节查表完成整数置换"""
+    n = len(tables)
+    out = 0
+    for p, t in enumerate(tables):
+        out |= t[(x >> (8 * (n - 1 - p))) & 0xFF]
+    return out
+
+
+@lru_cache(maxsize=64)
+def _sp_tables(sboxes):
+    """S盒与 P置换合并: sp[i][v] = P(S_i(v) 放在第 i 个半字节)"""
+    p_tables = _byte_perm_tables(tuple(DESEncoders.P), 32)
+    sp = []
+    for i, box in enumerate(sboxes):
+        row = []
+        for v in range(64):
+            val = box[((v >> 4) & 2) | (v & 1)][(v >> 1) & 0xF]
+            row.append(_permute_int((val & 0xF) << (28 - 4 * i), p_tables))
+        sp.append(tuple(row))
+    return tuple(sp)
+
+
+def des_sp_tables(sboxes):
+    """当前S盒对应的 SP 表 (8 x 64，按S盒内容缓存)"""
+    return _sp_tables(tuple(tuple(tuple(r) for r in box) for box in sboxes))
 
 
 class DESEncoders:
@@ -154,6 +213,12 @@ class DESEncoders:
         else:
             self.sboxes = self.STANDARD_SBOXES
         self.subkeys = []
+        self._subkey_key = None
+        self._ks = ()
+        self._sp = des_sp_tables(self.sboxes)
+        self._ip = _byte_perm_tables(tuple(self.IP), 64)
+        self._fp = _byte_perm_tables(tuple(self.IP_INV), 64)
+        self._e = _byte_perm_tables(tuple(self.E), 32)
 
     @staticmethod
     def _permute(block, table):
@@ -201,6 +266,65 @@ class DESEncoders:
         # P置换
         return self._permute(substituted, self.P)
 
+    # ----------------------------
+    # 整数实现
+    # ----------------------------
+
+    @staticmethod
+    def _int_subkeys(key):
+        """由8字节密钥生成16个48位整数子密钥"""
+        pc1 = _byte_perm_tables(tuple(DESEncoders.PC1), 64)
+        pc2 = _byte_perm_tables(tuple(DESEncoders.PC2), 56)
+        cd = _permute_int(int.from_bytes(key, 'big'), pc1)
+        c, d = cd >> 28, cd & 0xFFFFFFF
+        subkeys = []
+        for shift in DESEncoders.SHIFTS:
+            c = ((c << shift) | (c >> (28 - shift))) & 0xFFFFFFF
+            d = ((d << shift) | (d >> (28 - shift))) & 0xFFFFFFF
+            subkeys.append(_permute_int((c << 28) | d, pc2))
+        return tuple(subkeys)
+
+    def _initial_perm(self, block):
+        """IP，返回 (L0, R0)"""
+        ip = self._ip
+        x = int.from_bytes(block, 'big')
+        x = (ip[0][x >> 56] | ip[1][(x >> 48) & 0xFF] | ip[2][(x >> 40) & 0xFF] |
+             ip[3][(x >> 32) & 0xFF] | ip[4][(x >> 24) & 0xFF] | ip[5][(x >> 16) & 0xFF] |
+             ip[6][(x >> 8) & 0xFF] | ip[7][x & 0xFF])
+        return x >> 32, x & 0xFFFFFFFF
+
+    def _final_perm(self, l, r):
+        """FP(L || R)"""
+        fp = self._fp
+        x = (l << 32) | r
+        x = (fp[0][x >> 56] | fp[1][(x >> 48) & 0xFF] | fp[2][(x >> 40) & 0xFF] |
+             fp[3][(x >> 32) & 0xFF] | fp[4][(x >> 24) & 0xFF] | fp[5][(x >> 16) & 0xFF] |
+             fp[6][(x >> 8) & 0xFF] | fp[7][x & 0xFF])
+        return x.to_bytes(8, 'big')
+
+    def _rounds(self, l, r, subkeys):
+        """16 轮 Feistel，返回 (R16, L16) (最后一轮不交换)
+
+        返回值恰为下一次 DES 运算经 IP 后的 (L0, R0)，3DES 可直接串联三次而省去中间的 FP/IP。
+        """
+        e0, e1, e2, e3 = self._e
+        s1, s2, s3, s4, s5, s6, s7, s8 = self._sp
+        for k in subkeys:
+            t = (e0[r >> 24] | e1[(r >> 16) & 0xFF] | e2[(r >> 8) & 0xFF] | e3[r & 0xFF]) ^ k
+            l, r = r, l ^ (s1[t >> 42] ^ s2[(t >> 36) & 0x3F] ^ s3[(t >> 30) & 0x3F] ^
+                           s4[(t >> 24) & 0x3F] ^ s5[(t >> 18) & 0x3F] ^ s6[(t >> 12) & 0x3F] ^
+                           s7[(t >> 6) & 0x3F] ^ s8[t & 0x3F])
+        return r, l
+
+    def _crypt_int(self, block, subkeys):
+        """整数 Feistel: 返回加/解密后的8字节块"""
+        l, r = self._initial_perm(block)
+        return self._final_perm(*self._rounds(l, r, subkeys))
+
+    # ----------------------------
+    # 比特列表实现 (参考实现，用于校验整数引擎)
+    # ----------------------------
+
     def _des_block(self, block_bits, encrypt=True):
         """加密/解密单个64位块"""
         # 初始置换IP
@@ -286,27 +410,42 @@ class DESEncoders:
             pass
         return None
 
+    def _set_key(self, key):
+        """生成子密钥 (密钥未变化时复用)"""
+        if key != self._subkey_key:
+            self._ks = self._int_subkeys(key)
+            self._ks_rev = self._ks[::-1]
+            self._subkey_key = key
+
+    @staticmethod
+    def _get_context(key_bytes, sboxes):
+        """从共享缓存获取 DESContext (同时持有加/解密子密钥)"""
+        cache_key = CONTEXT_CACHE.make_key('des', key_bytes, sboxes)
+        return CONTEXT_CACHE.get(cache_key, lambda: DESContext(
+            key_bytes, DESEncoders._parse_sboxes(sboxes)))
+
+    @staticmethod
+    def _get_triple_context(key_bytes, sboxes):
+        """从共享缓存获取 TripleDESContext"""
+        cache_key = CONTEXT_CACHE.make_key('3des', key_bytes, sboxes)
+        return CONTEXT_CACHE.get(cache_key, lambda: TripleDESContext(
+            key_bytes, DESEncoders._parse_sboxes(sboxes)))
+
     def encrypt_block(self, block, key):
         """加密单个8字节块"""
-        key_bits = self._bytes_to_bits(key)
-        self._generate_subkeys(key_bits)
-        block_bits = self._bytes_to_bits(block)
-        encrypted_bits = self._des_block(block_bits, encrypt=True)
-        return self._bits_to_bytes(encrypted_bits)
+        self._set_key(key)
+        return self._crypt_int(block, self._ks)
 
     def decrypt_block(self, block, key):
         """解密单个8字节块"""
-        key_bits = self._bytes_to_bits(key)
-        self._generate_subkeys(key_bits)
-        block_bits = self._bytes_to_bits(block)
-        decrypted_bits = self._des_block(block_bits, encrypt=False)
-        return self._bits_to_bytes(decrypted_bits)
+        self._set_key(key)
+        return self._crypt_int(block, self._ks_rev)
 
     @staticmethod
     def des_encrypt(data: str, key: str, mode: str = 'ECB', iv: str = '',
                     padding: str = 'pkcs7', sboxes=None,
                     key_type: str = 'utf-8', iv_type: str = 'utf-8',
-                    data_type: str = None) -> str:
+                    data_type: str = None, parallel: bool = False) -> str:
         """DES加密"""
         if not data:
             return ""
@@ -325,9 +464,6 @@ class DESEncoders:
         elif len(key_bytes) > 8:
             key_bytes = key_bytes[:8]
 
-        # 自定义S盒
-        custom_sboxes = DESEncoders._parse_sboxes(sboxes)
-
         # IV处理
         mode = mode.upper()
         if mode in ['CBC', 'CFB', 'OFB', 'CTR']:
@@ -346,7 +482,7 @@ class DESEncoders:
         else:
             iv_bytes = None
 
-        des = DESEncoders(custom_sboxes)
+        des = DESEncoders._get_context(key_bytes, sboxes)
 
         # 数据处理
         if data_type and data_type.lower() == 'hex':
@@ -364,58 +500,7 @@ class DESEncoders:
         else:
             padded = DESEncoders._pad_data(data_bytes, padding)
 
-        encrypted = b''
-
-        if mode == 'ECB':
-            for i in range(0, len(padded), 8):
-                block = padded[i:i + 8]
-                if len(block) < 8:
-                    break
-                encrypted += des.encrypt_block(block, key_bytes)
-
-        elif mode == 'CBC':
-            last_block = iv_bytes
-            for i in range(0, len(padded), 8):
-                block = padded[i:i + 8]
-                input_block = bytes([a ^ b for a, b in zip(block, last_block)])
-                output_block = des.encrypt_block(input_block, key_bytes)
-                encrypted += output_block
-                last_block = output_block
-
-        elif mode == 'CTR':
-            ctr = int.from_bytes(iv_bytes, byteorder='big')
-            for i in range(0, len(padded), 8):
-                block = padded[i:i + 8]
-                ctr_block = ctr.to_bytes(8, byteorder='big')
-                keystream = des.encrypt_block(ctr_block, key_bytes)
-                chunk_len = len(block)
-                cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                encrypted += cipher_chunk
-                ctr += 1
-
-        elif mode == 'OFB':
-            last_iv = iv_bytes
-            for i in range(0, len(padded), 8):
-                block = padded[i:i + 8]
-                keystream = des.encrypt_block(last_iv, key_bytes)
-                chunk_len = len(block)
-                cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                encrypted += cipher_chunk
-                last_iv = keystream
-
-        elif mode == 'CFB':
-            last_block = iv_bytes
-            for i in range(0, len(padded), 8):
-                block = padded[i:i + 8]
-                keystream = des.encrypt_block(last_block, key_bytes)
-                chunk_len = len(block)
-                cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                encrypted += cipher_chunk
-                if chunk_len == 8:
-                    last_block = cipher_chunk
-
-        else:
-            raise ValueError("Unsupported mode")
+        encrypted = BlockCipherModes.encrypt(des, mode, padded, iv_bytes, 8, parallel=parallel)
 
         if not iv and iv_bytes and mode != 'ECB':
             return base64.b64encode(iv_bytes + encrypted).decode('utf-8')
@@ -425,7 +510,7 @@ class DESEncoders:
     def des_decrypt(data: str, key: str, mode: str = 'ECB', iv: str = '',
                     padding: str = 'pkcs7', sboxes=None,
                     key_type: str = 'utf-8', iv_type: str = 'utf-8',
-                    data_type: str = None) -> str:
+                    data_type: str = None, parallel: bool = False) -> str:
         """DES解密"""
         if not data:
             return ""
@@ -444,8 +529,6 @@ class DESEncoders:
         elif len(key_bytes) > 8:
             key_bytes = key_bytes[:8]
 
-        custom_sboxes = DESEncoders._parse_sboxes(sboxes)
-
         # 数据解析
         try:
             if data_type and data_type.lower() == 'hex':
@@ -482,54 +565,8 @@ class DESEncoders:
                 iv_bytes = encrypted_data[:8]
                 data_content = encrypted_data[8:]
 
-        des = DESEncoders(custom_sboxes)
-        decrypted = b''
-
-        if mode == 'ECB':
-            for i in range(0, len(data_content), 8):
-                block = data_content[i:i + 8]
-                decrypted += des.decrypt_block(block, key_bytes)
-
-        elif mode == 'CBC':
-            last_block = iv_bytes
-            for i in range(0, len(data_content), 8):
-                block = data_content[i:i + 8]
-                output_block = des.decrypt_block(block, key_bytes)
-                plain_block = bytes([a ^ b for a, b in zip(output_block, last_block)])
-                decrypted += plain_block
-                last_block = block
-
-        elif mode == 'CTR':
-            ctr = int.from_bytes(iv_bytes, byteorder='big')
-            for i in range(0, len(data_content), 8):
-                block = data_content[i:i + 8]
-                ctr_block = ctr.to_bytes(8, byteorder='big')
-                keystream = des.encrypt_block(ctr_block, key_bytes)
-                chunk_len = len(block)
-                plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                decrypted += plain_chunk
-                ctr += 1
-
-        elif mode == 'OFB':
-            last_iv = iv_bytes
-            for i in range(0, len(data_content), 8):
-                block = data_content[i:i + 8]
-                keystream = des.encrypt_block(last_iv, key_bytes)
-                chunk_len = len(block)
-                plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                decrypted += plain_chunk
-                last_iv = keystream
-
-        elif mode == 'CFB':
-            last_block = iv_bytes
-            for i in range(0, len(data_content), 8):
-                block = data_content[i:i + 8]
-                keystream = des.encrypt_block(last_block, key_bytes)
-                chunk_len = len(block)
-                plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                decrypted += plain_chunk
-                if chunk_len == 8:
-                    last_block = block
+        des = DESEncoders._get_context(key_bytes, sboxes)
+        decrypted = BlockCipherModes.decrypt(des, mode, data_content, iv_bytes, 8, parallel=parallel)
 
         is_stream = mode in ['CFB', 'OFB', 'CTR']
         final_bytes = decrypted
@@ -553,7 +590,7 @@ class DESEncoders:
     def triple_des_encrypt(data: str, key: str, mode: str = 'ECB', iv: str = '',
                            padding: str = 'pkcs7', sboxes=None,
                            key_type: str = 'utf-8', iv_type: str = 'utf-8',
-                           data_type: str = None) -> str:
+                           data_type: str = None, parallel: bool = False) -> str:
         """3DES加密 (EDE模式)"""
         if not data:
             return ""
@@ -572,10 +609,6 @@ class DESEncoders:
         elif len(key_bytes) > 24:
             key_bytes = key_bytes[:24]
 
-        k1, k2, k3 = key_bytes[:8], key_bytes[8:16], key_bytes[16:24]
-
-        custom_sboxes = DESEncoders._parse_sboxes(sboxes)
-
         # IV处理
         mode = mode.upper()
         if mode in ['CBC', 'CFB', 'OFB', 'CTR']:
@@ -594,7 +627,7 @@ class DESEncoders:
         else:
             iv_bytes = None
 
-        des = DESEncoders(custom_sboxes)
+        des = DESEncoders._get_triple_context(key_bytes, sboxes)
 
         # 数据处理
         if data_type and data_type.lower() == 'hex':
@@ -606,35 +639,14 @@ class DESEncoders:
             data_bytes = data.encode('utf-8')
 
         # 填充
-        padded = DESEncoders._pad_data(data_bytes, padding)
-
-        def ede_encrypt(block):
-            """EDE: Encrypt-Decrypt-Encrypt"""
-            step1 = des.encrypt_block(block, k1)
-            step2 = des.decrypt_block(step1, k2)
-            step3 = des.encrypt_block(step2, k3)
-            return step3
-
-        encrypted = b''
-
-        if mode == 'ECB':
-            for i in range(0, len(padded), 8):
-                block = padded[i:i + 8]
-                if len(block) < 8:
-                    break
-                encrypted += ede_encrypt(block)
-
-        elif mode == 'CBC':
-            last_block = iv_bytes
-            for i in range(0, len(padded), 8):
-                block = padded[i:i + 8]
-                input_block = bytes([a ^ b for a, b in zip(block, last_block)])
-                output_block = ede_encrypt(input_block)
-                encrypted += output_block
-                last_block = output_block
-
+        is_stream = mode in ['CFB', 'OFB', 'CTR']
+        if is_stream and padding.lower() == 'nopadding':
+            padded = data_bytes
         else:
-            raise ValueError(f"3DES暂不支持 {mode} 模式")
+            padded = DESEncoders._pad_data(data_bytes, padding)
+
+        # CTR 的计数器块一次生成后走批量加密 (大数据量时为位切片引擎)，parallel 时分发到进程池
+        encrypted = BlockCipherModes.encrypt(des, mode, padded, iv_bytes, 8, parallel=parallel)
 
         if not iv and iv_bytes and mode != 'ECB':
             return base64.b64encode(iv_bytes + encrypted).decode('utf-8')
@@ -644,7 +656,7 @@ class DESEncoders:
     def triple_des_decrypt(data: str, key: str, mode: str = 'ECB', iv: str = '',
                            padding: str = 'pkcs7', sboxes=None,
                            key_type: str = 'utf-8', iv_type: str = 'utf-8',
-                           data_type: str = None) -> str:
+                           data_type: str = None, parallel: bool = False) -> str:
         """3DES解密 (EDE模式)"""
         if not data:
             return ""
@@ -663,10 +675,6 @@ class DESEncoders:
         elif len(key_bytes) > 24:
             key_bytes = key_bytes[:24]
 
-        k1, k2, k3 = key_bytes[:8], key_bytes[8:16], key_bytes[16:24]
-
-        custom_sboxes = DESEncoders._parse_sboxes(sboxes)
-
         # 数据解析
         try:
             if data_type and data_type.lower() == 'hex':
@@ -703,35 +711,13 @@ class DESEncoders:
                 iv_bytes = encrypted_data[:8]
                 data_content = encrypted_data[8:]
 
-        des = DESEncoders(custom_sboxes)
-
-        def ede_decrypt(block):
-            """EDE解密: Decrypt-Encrypt-Decrypt"""
-            step1 = des.decrypt_block(block, k3)
-            step2 = des.encrypt_block(step1, k2)
-            step3 = des.decrypt_block(step2, k1)
-            return step3
-
-        decrypted = b''
-
-        if mode == 'ECB':
-            for i in range(0, len(data_content), 8):
-                block = data_content[i:i + 8]
-                decrypted += ede_decrypt(block)
-
-        elif mode == 'CBC':
-            last_block = iv_bytes
-            for i in range(0, len(data_content), 8):
-                block = data_content[i:i + 8]
-                output_block = ede_decrypt(block)
-                plain_block = bytes([a ^ b for a, b in zip(output_block, last_block)])
-                decrypted += plain_block
-                last_block = block
+        des = DESEncoders._get_triple_context(key_bytes, sboxes)
+        decrypted = BlockCipherModes.decrypt(des, mode, data_content, iv_bytes, 8, parallel=parallel)
 
-        else:
-            raise ValueError(f"3DES暂不支持 {mode} 模式")
-
-        final_bytes = DESEncoders._unpad_data(decrypted, padding)
+        is_stream = mode in ['CFB', 'OFB', 'CTR']
+        final_bytes = decrypted
+        if not is_stream:
+            final_bytes = DESEncoders._unpad_data(decrypted, padding)
 
         try:
             text_res = final_bytes.decode('utf-8')
@@ -745,3 +731,104 @@ class DESEncoders:
             return final_bytes.hex()
         except:
             return final_bytes.hex()
+
+
+def _bitslice_engine(sboxes, size):
+    """数据量足够且 NumPy 可用时返回位切片引擎，否则返回 None"""
+    # 延迟导入: des_bitslice 依赖本模块
+    from core.decoder.des_bitslice import DESBitslice, np as _np
+    if _np is None or size < DESBitslice.MIN_BLOCKS * 8:
+        return None
+    return DESBitslice.shared(sboxes)
+
+
+class DESContext:
+    """绑定密钥的 DES 上下文: 16 个子密钥及其解密逆序只在构造时生成一次"""
+
+    def __init__(self, key, sboxes=None, engine=None):
+        """
+        Args:
+            key: 8字节密钥
+            sboxes: 自定义S盒 (8个4x16)
+            engine: 共享的 DESEncoders (复用其 SP/置换表)
+        """
+        key = bytes(key)
+        if len(key) != 8:
+            raise ValueError(f"DES密钥必须为8字节 (当前: {len(key)})")
+        self.key = key
+        self.engine = engine or DESEncoders(sboxes)
+        self.subkeys = DESEncoders._int_subkeys(key)
+        self.subkeys_rev = self.subkeys[::-1]
+
+    def worker_spec(self):
+        """可 pickle 的重建参数"""
+        return DESContext, (self.key, self.engine.sboxes), {}
+
+    def encrypt_block(self, block):
+        return self.engine._crypt_int(block, self.subkeys)
+
+    def decrypt_block(self, block):
+        return self.engine._crypt_int(block, self.subkeys_rev)
+
+    def encrypt_blocks(self, data):
+        """批量加密完整块 (大数据量时使用位切片引擎)"""
+        bitslice = _bitslice_engine(self.engine.sboxes, len(data))
+        if bitslice is not None:
+            return bitslice.encrypt_blocks(data, self.key)
+        return BlockCipherModes._each_block(self.encrypt_block, data, 8)
+
+    def decrypt_blocks(self, data):
+        """批量解密完整块"""
+        bitslice = _bitslice_engine(self.engine.sboxes, len(data))
+        if bitslice is not None:
+            return bitslice.decrypt_blocks(data, self.key)
+        return BlockCipherModes._each_block(self.decrypt_block, data, 8)
+
+
+class TripleDESContext:
+    """3DES EDE 上下文: 三组子密钥各生成一次，三次 DES 之间省去 FP/IP"""
+
+    def __init__(self, key, sboxes=None):
+        """key: 24字节 (K1 || K2 || K3)"""
+        key = bytes(key)
+        if len(key) != 24:
+            raise ValueError(f"3DES密钥必须为24字节 (当前: {len(key)})")
+        self.key = key
+        self.engine = engine = DESEncoders(sboxes)
+        self.k1, self.k2, self.k3 = (DESContext(key[i:i + 8], engine=engine) for i in (0, 8, 16))
+
+    def worker_spec(self):
+        """可 pickle 的重建参数"""
+        return TripleDESContext, (self.key, self.engine.sboxes), {}
+
+    def encrypt_block(self, block):
+        """EDE: Encrypt-Decrypt-Encrypt"""
+        engine = self.engine
+        l, r = engine._initial_perm(block)
+        l, r = engine._rounds(l, r, self.k1.subkeys)
+        l, r = engine._rounds(l, r, self.k2.subkeys_rev)
+        l, r = engine._rounds(l, r, self.k3.subkeys)
+        return engine._final_perm(l, r)
+
+    def decrypt_block(self, block):
+        """EDE解密: Decrypt-Encrypt-Decrypt"""
+        engine = self.engine
+        l, r = engine._initial_perm(block)
+        l, r = engine._rounds(l, r, self.k3.subkeys_rev)
+        l, r = engine._rounds(l, r, self.k2.subkeys)
+        l, r = engine._rounds(l, r, self.k1.subkeys_rev)
+        return engine._final_perm(l, r)
+
+    def encrypt_blocks(self, data):
+        """批量加密完整块 (大数据量时使用位切片引擎)"""
+        bitslice = _bitslice_engine(self.engine.sboxes, len(data))
+        if bitslice is not None:
+            return bitslice.triple_encrypt_blocks(data, self.key)
+        return BlockCipherModes._each_block(self.encrypt_block, data, 8)
+
+    def decrypt_blocks(self, data):
+        """批量解密完整块"""
+        bitslice = _bitslice_engine(self.engine.sboxes, len(data))
+        if bitslice is not None:
+            return bitslice.triple_decrypt_blocks(data, self.key)
+        return BlockCipherModes._each_block(self.decrypt_block, data, 8)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+位切片 DES (NumPy)
+64 个比特平面 (每个平面为 uint64 数组) 表示一批分组: 平面 b 的第 w 个字的第 t 位
+即第 w*64+t 个分组的第 b 位。一次按位运算同时作用于整批分组 (或整批密钥)。
+
+IP/FP、E、P 及子密钥选择均为平面的重新编号，不产生运算；
+S盒由当前S盒真值表按 Shannon 展开 (多路选择树) 生成逻辑电路，
+相同子函数按真值表去重，常量分支直接折叠。电路源码 exec 编译并按S盒内容缓存，
+首次编译时与标量引擎 (DESContext) 做一致性校验。
+
+密钥平面既可以是标量 (同一密钥: 全0/全1常量)，也可以是数组 (每个比特位一个候选密钥)，
+后者用于密钥搜索。
+"""
+
+import os
+from functools import lru_cache
+
+from core.decoder.des import DESEncoders, DESContext
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时不可用
+    np = None
+
+
+def _subkey_bit_map():
+    """各轮子密钥第 j 位对应的密钥比特序号 (0 为最高位)"""
+    key56 = [b - 1 for b in DESEncoders.PC1]
+    c, d = key56[:28], key56[28:]
+    rounds = []
+    for shift in DESEncoders.SHIFTS:
+        c = c[shift:] + c[:shift]
+        d = d[shift:] + d[:shift]
+        cd = c + d
+        rounds.append(tuple(cd[p - 1] for p in DESEncoders.PC2))
+    return tuple(rounds)
+
+
+_SUBKEY_BITS = _subkey_bit_map()
+
+
+class _Circuit:
+    """由真值表生成逻辑门序列 (多路选择树，子函数去重)"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.lines = []
+        self.memo = {}
+        self.negated = set()
+        self.count = 0
+
+    def _neg(self, v):
+        name = f"{self.prefix}n{v}"
+        if v not in self.negated:
+            self.negated.add(v)
+            self.lines.append(f"    {name} = ~{v}")
+        return name
+
+    def _emit(self, expr):
+        name = f"{self.prefix}g{self.count}"
+        self.count += 1
+        self.lines.append(f"    {name} = {expr}")
+        return name
+
+    def build(self, tt, variables):
+        """tt: 长度 2^k 的真值表 (下标最高位对应 variables[0])；返回表达式名或 'Z'/'O' 常量"""
+        if not any(tt):
+            return 'Z'
+        if all(tt):
+            return 'O'
+        key = (tt, variables)
+        if key in self.memo:
+            return self.memo[key]
+        v = variables[0]
+        half = len(tt) // 2
+        lo = self.build(tt[:half], variables[1:])   # v = 0
+        hi = self.build(tt[half:], variables[1:])   # v = 1
+        if lo == hi:
+            result = lo
+        elif lo == 'Z' and hi == 'O':
+            result = v
+        elif lo == 'O' and hi == 'Z':
+            result = self._neg(v)
+        elif lo == 'Z':
+            result = self._emit(f"{v} & {hi}")
+        elif hi == 'Z':
+            result = self._emit(f"{lo} & {self._neg(v)}")
+        elif lo == 'O':
+            result = self._emit(f"{self._neg(v)} | {hi}")
+        elif hi == 'O':
+            result = self._emit(f"{v} | {lo}")
+        else:
+            result = self._emit(f"{lo} ^ ({v} & ({lo} ^ {hi}))")
+        self.memo[key] = result
+        return result
+
+
+def _generate_source(sboxes):
+    """生成轮函数 f(R, K) 的源码: E 扩展 -> 异或子密钥 -> 8 个S盒电路 -> P 置换"""
+    lines = ["def feistel(R, K):"]
+    for j, e in enumerate(DESEncoders.E):
+        lines.append(f"    x{j} = R[{e - 1}] ^ K[{j}]")
+    outputs = []
+    const_needed = False
+    for i, box in enumerate(sboxes):
+        circuit = _Circuit(f"s{i}_")
+        variables = tuple(f"x{6 * i + k}" for k in range(6))
+        names = []
+        for bit in range(4):
+            tt = []
+            for v in range(64):
+                val = box[((v >> 4) & 2) | (v & 1)][(v >> 1) & 0xF]
+                tt.append((val >> (3 - bit)) & 1)
+            names.append(circuit.build(tuple(tt), variables))
+        lines.extend(circuit.lines)
+        const_needed = const_needed or 'Z' in names or 'O' in names
+        outputs.extend(names)
+    if const_needed:
+        lines.insert(1, "    Z = R[0] ^ R[0]")
+        lines.insert(2, "    O = ~Z")
+    lines.append("    return [" + ", ".join(outputs[p - 1] for p in DESEncoders.P) + "]")
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=16)
+def compile_feistel(sboxes):
+    """编译指定S盒 (嵌套元组) 的位切片轮函数"""
+    namespace = {}
+    exec(compile(_generate_source(sboxes), '<des-bitslice>', 'exec'), namespace)
+    return namespace['feistel']
+
+
+def _normalize_sboxes(sboxes):
+    sboxes = sboxes if sboxes and len(sboxes) == 8 else DESEncoders.STANDARD_SBOXES
+    return tuple(tuple(tuple(int(v) for v in row) for row in box) for box in sboxes)
+
+
+class DESBitslice:
+    """位切片 DES 引擎"""
+
+    MIN_BLOCKS = 1024         # 少于该块数时标量引擎更快 (每批固定开销约 10ms)
+    CHUNK_BLOCKS = 1 << 16    # 每批处理的分组数 (须为64的倍数)
+
+    _verified = set()
+
+    def __init__(self, sboxes=None, verify=True):
+        if np is None:
+            raise RuntimeError("DESBitslice 需要 NumPy")
+        self.sboxes = _normalize_sboxes(sboxes)
+        self.feistel = compile_feistel(self.sboxes)
+        self.ones = np.uint64(0xFFFFFFFFFFFFFFFF)
+        self.zero = np.uint64(0)
+        if verify and self.sboxes not in DESBitslice._verified:
+            self.check_conformance()
+            DESBitslice._verified.add(self.sboxes)
+
+    @staticmethod
+    def shared(sboxes=None):
+        """按S盒内容复用的引擎实例"""
+        return _shared_engine(_normalize_sboxes(sboxes))
+
+    # ----------------------------
+    # 平面转换
+    # ----------------------------
+
+    @staticmethod
+    def to_planes(data):
+        """8字节分组 -> (64, W) uint64 平面 (分组数补齐到64的倍数)"""
+        arr = np.frombuffer(bytes(data), dtype=np.uint8)
+        n = len(arr) // 8
+        words = (n + 63) // 64
+        blocks = np.zeros((words * 64, 8), dtype=np.uint8)
+        blocks[:n] = arr[:n * 8].reshape(n, 8)
+        bits = np.unpackbits(blocks, axis=1)                       # (W*64, 64) [分组, 比特]
+        bits = bits.reshape(words, 64, 64).transpose(2, 0, 1)      # [比特, 字, 分组内序号]
+        packed = np.packbits(np.ascontiguousarray(bits), axis=2, bitorder='little')
+        return packed.view('<u8').reshape(64, words).astype(np.uint64)
+
+    @staticmethod
+    def from_planes(planes, n):
+        """(64, W) 平面 -> 前 n 个分组的字节串"""
+        words = planes.shape[1]
+        raw = np.ascontiguousarray(planes.astype('<u8')).view(np.uint8).reshape(64, words, 8)
+        bits = np.unpackbits(raw, axis=2, bitorder='little')       # [比特, 字, 分组内序号]
+        bits = bits.transpose(1, 2, 0).reshape(words * 64, 64)     # [分组, 比特]
+        return np.packbits(bits, axis=1)[:n].tobytes()
+
+    def key_planes(self, key):
+        """单个密钥 -> 64 个常量平面"""
+        k = int.from_bytes(bytes(key), 'big')
+        return [self.ones if (k >> (63 - b)) & 1 else self.zero for b in range(64)]
+
+    # ----------------------------
+    # 核心
+    # ----------------------------
+
+    def rounds(self, left, right, key_planes, decrypt=False):
+        """16 轮 Feistel (平面列表)，返回 (R16, L16)，可直接作为下一次 DES 的 (L0, R0)"""
+        feistel = self.feistel
+        order = range(15, -1, -1) if decrypt else range(16)
+        for r in order:
+            sel = _SUBKEY_BITS[r]
+            k = [key_planes[b] for b in sel]
+            f = feistel(right, k)
+            left, right = right, [a ^ b for a, b in zip(left, f)]
+        return right, left
+
+    @staticmethod
+    def initial_perm(planes):
+        p = [planes[b - 1] for b in DESEncoders.IP]
+        return p[:32], p[32:]
+
+    @staticmethod
+    def final_perm(left, right):
+        lr = list(left) + list(right)
+        return [lr[b - 1] for b in DESEncoders.IP_INV]
+
+    def crypt_planes(self, planes, key_planes, decrypt=False):
+        """加/解密一批平面 (planes: 64 个平面；key_planes: 64 个常量或数组平面)"""
+        left, right = self.initial_perm(planes)
+        return self.final_perm(*self.rounds(left, right, key_planes, decrypt))
+
+    def _run(self, data, stages):
+        """stages: [(key_planes, decrypt)]，多级串联时省去中间的 FP/IP"""
+        n = len(data) // 8
+        out = bytearray()
+        step = self.CHUNK_BLOCKS * 8
+        mv = memoryview(data)
+        for off in range(0, n * 8, step):
+            chunk = mv[off:min(off + step, n * 8)]
+            planes = self.to_planes(chunk)
+            left, right = self.initial_perm(list(planes))
+            for key_planes, decrypt in stages:
+                left, right = self.rounds(left, right, key_planes, decrypt)
+            result = np.array(self.final_perm(left, right), dtype=np.uint64)
+            out += self.from_planes(result, len(chunk) // 8)
+        return bytes(out)
+
+    def encrypt_blocks(self, data, key):
+        """ECB 语义批量加密 (8字节整数倍)"""
+        return self._run(data, [(self.key_planes(key), False)])
+
+    def decrypt_blocks(self, data, key):
+        """ECB 语义批量解密"""
+        return self._run(data, [(self.key_planes(key), True)])
+
+    def triple_encrypt_blocks(self, data, key):
+        """3DES EDE 批量加密 (24字节密钥)"""
+        k1, k2, k3 = (self.key_planes(key[i:i + 8]) for i in (0, 8, 16))
+        return self._run(data, [(k1, False), (k2, True), (k3, False)])
+
+    def triple_decrypt_blocks(self, data, key):
+        """3DES EDE 批量解密"""
+        k1, k2, k3 = (self.key_planes(key[i:i + 8]) for i in (0, 8, 16))
+        return self._run(data, [(k3, True), (k2, False), (k1, True)])
+
+    # ----------------------------
+    # 一致性校验
+    # ----------------------------
+
+    def check_conformance(self, samples=128):
+        """随机密钥/分组与标量引擎对比，不一致时抛出 RuntimeError"""
+        scalar_sboxes = [[list(row) for row in box] for box in self.sboxes]
+        for _ in range(2):
+            key = os.urandom(8)
+            data = os.urandom(8 * samples)
+            ctx = DESContext(key, scalar_sboxes)
+            expected = b''.join(ctx.encrypt_block(data[i:i + 8]) for i in range(0, len(data), 8))
+            if self.encrypt_blocks(data, key) != expected:
+                raise RuntimeError("位切片DES与标量引擎结果不一致 (加密)")
+            if self.decrypt_blocks(expected, key) != data:
+                raise RuntimeError("位切片DES与标量引擎结果不一致 (解密)")
+        return True
+
+
+@lru_cache(maxsize=16)
+def _shared_engine(sboxes):
+    return DESBitslice(sboxes)
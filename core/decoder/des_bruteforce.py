@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DES/3DES 部分已知密钥爆破
+密钥掩码给出已知字节 (如已知前缀)，未知字节从字符集中枚举 (如仅可打印ASCII)；
+以已知明文 (如 "flag{" 或文件头) 或自定义判定函数验证候选密钥。
+
+- DES 忽略每个密钥字节的最低位 (奇偶校验位)，字符集按 v >> 1 去重，候选数减半
+- 已知明文被换算为单个分组测试: 对输入块 X 做一次 DES 运算，与期望值 Y 在已知字节上比较
+  (ECB/CBC 为解密，CFB/OFB/CTR 为加密得到密钥流)
+- NumPy 可用时每批候选密钥转为比特平面交给位切片引擎 (一次门运算检验 64 个密钥)，
+  否则使用整数标量引擎；初筛命中后用标量引擎在全部测试上复核
+- 密钥空间按索引区间切分到进程池，支持进度回调、取消，找到首个密钥即停止
+"""
+
+import os
+import string
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from core.decoder.des import DESContext, DESEncoders, TripleDESContext
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时逐个密钥检验
+    np = None
+
+
+# 预置字符集
+CHARSETS = {
+    'all': bytes(range(256)),
+    'printable': bytes(range(0x20, 0x7F)),
+    'alnum': (string.digits + string.ascii_letters).encode(),
+    'lower': string.ascii_lowercase.encode(),
+    'upper': string.ascii_uppercase.encode(),
+    'digits': string.digits.encode(),
+    'hex': b'0123456789abcdef',
+    'HEX': b'0123456789ABCDEF',
+}
+
+
+def _parse_charset(charset):
+    """字符集: 预置名称、字符串、字节串或整数列表"""
+    if charset is None or charset == '':
+        return CHARSETS['all']
+    if isinstance(charset, str):
+        if charset in CHARSETS:
+            return CHARSETS[charset]
+        return charset.encode('utf-8')
+    return bytes(charset)
+
+
+class DESKeySpace:
+    """由密钥掩码与字符集确定的候选密钥空间 (按索引随机访问)"""
+
+    def __init__(self, key_mask, charset=None, key_length=8):
+        """
+        Args:
+            key_mask: Hex 掩码，未知字节写作 '??' (如 "6b6579??????????")
+            charset: 未知字节的取值范围
+            key_length: 8 (DES)；3DES 为 16 (K3=K1) 或 24
+        """
+        mask = (key_mask or '??' * key_length).replace(' ', '')
+        if len(mask) % 2:
+            raise ValueError("密钥掩码长度必须为偶数个Hex字符")
+        tokens = [mask[i:i + 2] for i in range(0, len(mask), 2)]
+        if len(tokens) != key_length:
+            raise ValueError(f"密钥掩码必须为 {key_length} 字节 (当前: {len(tokens)})")
+
+        # 校验位不参与运算: 仅保留 v >> 1 不同的取值
+        choices, seen = [], set()
+        for v in _parse_charset(charset):
+            if v >> 1 not in seen:
+                seen.add(v >> 1)
+                choices.append(v)
+        if not choices:
+            raise ValueError("字符集不能为空")
+
+        self.key_length = key_length
+        self.fixed = bytearray(key_length)
+        self.positions = []
+        self.choices = bytes(choices)
+        for i, tok in enumerate(tokens):
+            if tok == '??':
+                self.positions.append(i)
+            else:
+                try:
+                    self.fixed[i] = int(tok, 16)
+                except ValueError:
+                    raise ValueError(f"密钥掩码中的无效字节: {tok}")
+        self.total = len(self.choices) ** len(self.positions)
+
+    def key_at(self, index):
+        """第 index 个候选密钥 (末尾的未知字节变化最快)"""
+        key = bytearray(self.fixed)
+        base = len(self.choices)
+        for pos in reversed(self.positions):
+            index, digit = divmod(index, base)
+            key[pos] = self.choices[digit]
+        return bytes(key)
+
+    def keys(self, start, count):
+        """[start, start+count) 的候选密钥，(count, key_length) uint8 数组"""
+        keys = np.empty((count, self.key_length), dtype=np.uint8)
+        keys[:] = np.frombuffer(bytes(self.fixed), dtype=np.uint8)
+        idx = np.arange(start, start + count, dtype=np.uint64)
+        base = np.uint64(len(self.choices))
+        table = np.frombuffer(self.choices, dtype=np.uint8)
+        for pos in reversed(self.positions):
+            keys[:, pos] = table[(idx % base).astype(np.intp)]
+            idx //= base
+        return keys
+
+
+class _BlockTest:
+    """单分组测试: DES^repeat(X) 在 mask 字节上等于 Y (或交给判定函数)"""
+
+    def __init__(self, decrypt, x, y, mask, repeat=1):
+        self.decrypt = decrypt
+        self.x = bytes(x)
+        self.y = bytes(y)
+        self.mask = bytes(mask)
+        self.repeat = repeat
+
+    def output(self, ctx):
+        out = self.x
+        for _ in range(self.repeat):
+            out = ctx.decrypt_block(out) if self.decrypt else ctx.encrypt_block(out)
+        return out
+
+    def plaintext(self, ctx):
+        """还原出的明文分组 (output ^ Y，此时 Y 保存链接值)"""
+        return bytes(a ^ b for a, b in zip(self.output(ctx), self.y))
+
+    def check(self, ctx):
+        return all((a ^ b) & m == 0 for a, b, m in zip(self.output(ctx), self.y, self.mask))
+
+
+def _xor(a, b):
+    return bytes(x ^ y for x, y in zip(a, b))
+
+
+def _block_test(mode, ciphertext, iv, b, expected=b'\x00' * 8, mask=b'\xff' * 8):
+    """将第 b 个分组的 (部分) 明文换算为单分组测试
+
+    expected/mask 为该分组已知的明文字节；判定函数模式下 expected 为全零，
+    Y 即为链接值，output ^ Y 为明文。
+    """
+    c = ciphertext[8 * b:8 * b + 8]
+    if len(c) < 8 and mode in ('ECB', 'CBC'):
+        raise ValueError("密文分组不完整")
+    if mode == 'ECB':
+        return _BlockTest(True, c, expected, mask)
+    prev = iv if b == 0 else ciphertext[8 * b - 8:8 * b]
+    if mode == 'CBC':
+        return _BlockTest(True, c, _xor(expected, prev), mask)
+    # 流模式: 密钥流 = 明文 ^ 密文 (密文不足8字节时只比较已有部分)
+    mask = bytes(m if i < len(c) else 0 for i, m in enumerate(mask))
+    stream = _xor(expected, c.ljust(8, b'\x00'))
+    if mode == 'CFB':
+        return _BlockTest(False, prev, stream, mask)
+    if mode == 'OFB':
+        return _BlockTest(False, iv, stream, mask, repeat=b + 1)
+    if mode == 'CTR':
+        ctr = (int.from_bytes(iv, 'big') + b) & 0xFFFFFFFFFFFFFFFF
+        return _BlockTest(False, ctr.to_bytes(8, 'big'), stream, mask)
+    raise ValueError(f"不支持的模式: {mode}")
+
+
+def build_tests(ciphertext, known_plaintext, offset=0, mode='ECB', iv=None, max_blocks=2):
+    """由已知明文 (位于明文 offset 处) 生成至多 max_blocks 个分组测试"""
+    mode = mode.upper()
+    tests = []
+    end = offset + len(known_plaintext)
+    for b in range(offset // 8, (end + 7) // 8):
+        expected, mask = bytearray(8), bytearray(8)
+        for i in range(8):
+            pos = 8 * b + i
+            if offset <= pos < end:
+                expected[i] = known_plaintext[pos - offset]
+                mask[i] = 0xFF
+        if b * 8 >= len(ciphertext):
+            break
+        tests.append(_block_test(mode, ciphertext, iv, b, expected, mask))
+        if len(tests) >= max_blocks:
+            break
+    if not tests:
+        raise ValueError("已知明文超出密文范围")
+    # 已知字节最多的测试放在最前，初筛误报最少
+    tests.sort(key=lambda t: -sum(1 for m in t.mask if m))
+    return tests
+
+
+# ----------------------------
+# 区间检验 (进程池工作函数)
+# ----------------------------
+
+_WORKER_SPEC = None
+
+
+def _init_worker(spec):
+    global _WORKER_SPEC
+    _WORKER_SPEC = spec
+
+
+def _make_context(algorithm, key, sboxes):
+    if algorithm == 'des':
+        return DESContext(key, sboxes)
+    if len(key) == 16:
+        key = key + key[:8]
+    return TripleDESContext(key, sboxes)
+
+
+def _verify(spec, key):
+    """标量引擎复核全部测试与判定函数"""
+    space, tests, probe, algorithm, sboxes, predicate = spec
+    ctx = _make_context(algorithm, key, sboxes)
+    if not all(t.check(ctx) for t in tests):
+        return False
+    if predicate is not None and not predicate(probe.plaintext(ctx)):
+        return False
+    return True
+
+
+def _stage_planes(engine, keys, algorithm):
+    """候选密钥 -> 各级 DES 的 (密钥平面, 是否解密)，顺序对应单次加密"""
+    if algorithm == 'des':
+        return [(list(engine.to_planes(keys.tobytes())), False)]
+    parts = [keys[:, 0:8], keys[:, 8:16], keys[:, 16:24] if keys.shape[1] == 24 else keys[:, 0:8]]
+    k1, k2, k3 = (list(engine.to_planes(np.ascontiguousarray(p).tobytes())) for p in parts)
+    return [(k1, False), (k2, True), (k3, False)]
+
+
+def _bitslice_output(engine, stages, test):
+    """对常量输入块 X 以全部候选密钥运算，返回输出的 64 个平面"""
+    left, right = engine.initial_perm(engine.key_planes(test.x))
+    if test.decrypt:
+        # 解密: 各级逆序且方向取反
+        stages = [(k, not d) for k, d in reversed(stages)]
+    for _ in range(test.repeat):
+        for key_planes, decrypt in stages:
+            left, right = engine.rounds(left, right, key_planes, decrypt)
+    return engine.final_perm(left, right)
+
+
+def _candidates_bitslice(spec, keys):
+    """位切片初筛，返回候选下标"""
+    from core.decoder.des_bitslice import DESBitslice
+    space, tests, probe, algorithm, sboxes, predicate = spec
+    engine = DESBitslice.shared(sboxes)
+    n = len(keys)
+    stages = _stage_planes(engine, keys, algorithm)
+    words = (n + 63) // 64
+
+    test = tests[0] if tests else probe
+    out = _bitslice_output(engine, stages, test)
+    if tests:
+        y = int.from_bytes(test.y, 'big')
+        m = int.from_bytes(test.mask, 'big')
+        diff = np.zeros(words, dtype=np.uint64)
+        for b in range(64):
+            if (m >> (63 - b)) & 1:
+                diff |= out[b] if not (y >> (63 - b)) & 1 else ~out[b]
+        bits = np.unpackbits((~diff).astype('<u8').view(np.uint8), bitorder='little')
+        idx = np.flatnonzero(bits[:n])
+        return idx.tolist()
+
+    # 仅判定函数: 批量还原首个分组明文后逐个调用
+    planes = np.array([np.broadcast_to(p, (words,)) for p in out], dtype=np.uint64)
+    blocks = engine.from_planes(planes, n)
+    chain = test.y
+    return [i for i in range(n)
+            if predicate(bytes(a ^ c for a, c in zip(blocks[8 * i:8 * i + 8], chain)))]
+
+
+def _search_range(spec, start, count):
+    """检验 [start, start+count)，返回首个命中的密钥或 None"""
+    space = spec[0]
+    if np is not None:
+        keys = space.keys(start, count)
+        for i in _candidates_bitslice(spec, keys):
+            key = keys[i].tobytes()
+            if _verify(spec, key):
+                return key
+        return None
+    for index in range(start, start + count):
+        key = space.key_at(index)
+        if _verify(spec, key):
+            return key
+    return None
+
+
+def _run_task(args):
+    start, count = args
+    return start, count, _search_range(_WORKER_SPEC, start, count)
+
+
+class DESKeySearch:
+    """DES/3DES 部分已知密钥搜索
+
+    用法 (脚本):
+        search = DESKeySearch(ct, b"flag{", key_mask="6b6579??????????", charset='printable')
+        result = search.run()
+
+    服务端可调用 start() 在后台线程运行，通过 progress() 轮询、cancel() 取消。
+    """
+
+    BATCH_KEYS = 1 << 16      # 每个任务检验的密钥数 (位切片时为64的倍数)
+    MAX_INFLIGHT = 4          # 每个工作进程同时排队的任务数
+
+    def __init__(self, ciphertext, known_plaintext=b'', key_mask='', charset=None,
+                 algorithm='des', mode='ECB', iv=None, offset=0, sboxes=None,
+                 predicate=None, workers=None, batch_size=None, progress_callback=None):
+        """
+        Args:
+            ciphertext: 密文 (bytes)；非 ECB 且未提供 iv 时前8字节视为 IV (与加密接口输出一致)
+            known_plaintext: 已知明文片段 (bytes)
+            key_mask: Hex 掩码，'??' 为未知字节；DES 8 字节，3DES 16 或 24 字节
+            charset: 未知字节字符集 (预置名称见 CHARSETS，或自定义字符串/字节)
+            algorithm: 'des' / '3des'
+            mode: ECB/CBC/CFB/OFB/CTR
+            offset: 已知明文在明文中的偏移
+            sboxes: 自定义 DES S盒
+            predicate: 判定函数 f(首个测试分组的明文 8 字节) -> bool，
+                可与已知明文同时使用；多进程时须可 pickle (模块级函数)
+            workers: 进程数 (默认 CPU 数)
+            progress_callback: f(progress_dict)，每完成一批调用
+        """
+        algorithm = algorithm.lower()
+        if algorithm not in ('des', '3des'):
+            raise ValueError(f"不支持的算法: {algorithm}")
+        mode = mode.upper()
+        ciphertext = bytes(ciphertext)
+        if mode != 'ECB' and not iv:
+            iv, ciphertext = ciphertext[:8], ciphertext[8:]
+        if mode != 'ECB' and len(iv) != 8:
+            raise ValueError("IV长度必须为8字节")
+        if not known_plaintext and predicate is None:
+            raise ValueError("需要提供已知明文或判定函数")
+
+        if key_mask:
+            key_length = len(key_mask.replace(' ', '')) // 2
+        else:
+            key_length = 8 if algorithm == 'des' else 24
+        if algorithm == 'des' and key_length != 8:
+            raise ValueError("DES密钥掩码必须为8字节")
+        if algorithm == '3des' and key_length not in (16, 24):
+            raise ValueError("3DES密钥掩码必须为16或24字节")
+
+        self.algorithm = algorithm
+        self.space = DESKeySpace(key_mask, charset, key_length)
+        tests = build_tests(ciphertext, bytes(known_plaintext), offset, mode, iv) if known_plaintext else []
+        probe = _block_test(mode, ciphertext, iv, offset // 8) if predicate is not None else None
+        parsed = DESEncoders._parse_sboxes(sboxes)
+        self._spec = (self.space, tests, probe, algorithm, parsed, predicate)
+
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = max(64, (batch_size or self.BATCH_KEYS) // 64 * 64)
+        self.progress_callback = progress_callback
+        self.tested = 0
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self._started = None
+        self._elapsed = 0.0
+        self.finished_at = None  # 结束时间戳 (运行中为 None)
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def total(self):
+        return self.space.total
+
+    def cancel(self):
+        """请求取消 (当前批次完成后生效)"""
+        self._cancel.set()
+
+    def progress(self):
+        elapsed = time.time() - self._started if self.status == 'running' else self._elapsed
+        return {
+            "status": self.status,
+            "tested": self.tested,
+            "total": self.total,
+            "percent": round(100.0 * self.tested / self.total, 2) if self.total else 100.0,
+            "elapsed": round(elapsed, 2),
+            "rate": int(self.tested / elapsed) if elapsed > 0 else 0,
+            "key": self.result,
+        }
+
+    def _advance(self, count):
+        self.tested += count
+        if self.progress_callback is not None:
+            self.progress_callback(self.progress())
+
+    def _ranges(self):
+        for start in range(0, self.total, self.batch_size):
+            yield start, min(self.batch_size, self.total - start)
+
+    def _run_sequential(self):
+        for start, count in self._ranges():
+            if self._cancel.is_set():
+                return None
+            key = _search_range(self._spec, start, count)
+            self._advance(count)
+            if key is not None:
+                return key
+        return None
+
+    def _run_pool(self):
+        ranges = self._ranges()
+        limit = self.workers * self.MAX_INFLIGHT
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self._spec,))
+        try:
+            pending = set()
+            for args in ranges:
+                pending.add(pool.submit(_run_task, args))
+                if len(pending) >= limit:
+                    break
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    _, count, key = fut.result()
+                    self._advance(count)
+                    if key is not None:
+                        return key
+                if self._cancel.is_set():
+                    return None
+                for args in ranges:
+                    pending.add(pool.submit(_run_task, args))
+                    if len(pending) >= limit:
+                        break
+            return None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self):
+        """执行搜索 (阻塞)，返回 progress() 结果，找到时 key 为 Hex 密钥"""
+        self.status = 'running'
+        self._started = time.time()
+        try:
+            if self.workers > 1 and self.total > self.batch_size:
+                key = self._run_pool()
+            else:
+                key = self._run_sequential()
+        except Exception:
+            self.status = 'error'
+            self._elapsed = time.time() - self._started
+            self.finished_at = time.time()
+            raise
+        self._elapsed = time.time() - self._started
+        self.finished_at = time.time()
+        if key is not None:
+            self.result = key.hex()
+            self.status = 'found'
+        elif self._cancel.is_set():
+            self.status = 'cancelled'
+        else:
+            self.status = 'exhausted'
+        return self.progress()
+
+    def start(self):
+        """在后台线程中运行"""
+        def target():
+            try:
+                self.run()
+            except Exception as e:
+                self.error = str(e)
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+        return self
+
+    @staticmethod
+    def search(ciphertext, known_plaintext=b'', key_mask='', charset=None, algorithm='des',
+               mode='ECB', iv=None, offset=0, sboxes=None, predicate=None, workers=None):
+        """便捷接口: 执行搜索，返回 Hex 密钥或 None"""
+        result = DESKeySearch(ciphertext, known_plaintext, key_mask, charset, algorithm, mode,
+                              iv, offset, sboxes, predicate, workers).run()
+        return result["key"]
@@ -3,11 +3,205 @@
 """
 MD5 哈希算法纯Python实现
 支持自定义初始值、K常量、位移量 (Magic MD5)
+
+参数均为标准值时直接使用 hashlib.md5；自定义 K 常量/位移量时生成 64 步完全展开、
+常量内联的压缩函数，exec 编译后按参数 LRU 缓存。
+
+MD5Hasher 为增量哈希对象 (update/copy/digest)，可导出/导入 (A, B, C, D, length) 中间状态，
+用于大文件分块哈希、候选消息共享前缀以及长度扩展。
+
+长度扩展: 由 H(secret || message) 的摘要恢复中间状态，在不知道 secret 的情况下
+计算 H(secret || message || padding || append)；可一次枚举一段 secret 长度。
 """
 
 import struct
 import base64
+import hashlib
 import math
+from functools import lru_cache
+
+_MASK = 0xffffffff
+
+# 各轮的布尔函数 (F/G 使用按位恒等的选择式写法，少一次运算)
+_ROUND_FUNCS = (
+    "d ^ (b & (c ^ d))",
+    "c ^ (d & (b ^ c))",
+    "b ^ c ^ d",
+    "c ^ (b | (~d))",
+)
+
+
+def _message_index(i):
+    if i < 16:
+        return i
+    if i < 32:
+        return (5 * i + 1) % 16
+    if i < 48:
+        return (3 * i + 5) % 16
+    return (7 * i) % 16
+
+
+def _generate_compress_source(k_table, shifts):
+    """生成展开的压缩函数源码: compress(state, data) 依次处理 data 中的每个64字节块"""
+    lines = [
+        "def compress(state, data):",
+        "    a0, b0, c0, d0 = state",
+        "    for off in range(0, len(data), 64):",
+        "        " + ", ".join(f"m{g}" for g in range(16)) + ", = unpack_from(data, off)",
+        "        a, b, c, d = a0, b0, c0, d0",
+    ]
+    names = ['a', 'b', 'c', 'd']
+    for i in range(64):
+        a, b, c, d = names
+        f = _ROUND_FUNCS[i // 16].replace('b', '#B').replace('c', '#C').replace('d', '#D')
+        f = f.replace('#B', b).replace('#C', c).replace('#D', d)
+        shift = int(shifts[i])
+        if not 0 <= shift <= 32:
+            raise ValueError(f"位移量超出范围 (0-32): {shift}")
+        lines.append(f"        t = ({a} + ({f}) + m{_message_index(i)} + {int(k_table[i]) & _MASK:#010x}) & 0xffffffff")
+        if shift in (0, 32):
+            lines.append(f"        {a} = ({b} + t) & 0xffffffff")
+        else:
+            # 循环左移结果的高位不影响相加后的低32位，省去中间掩码
+            lines.append(f"        {a} = ({b} + ((t << {shift}) | (t >> {32 - shift}))) & 0xffffffff")
+        # 寄存器轮换: 新的 B 写入原 A 的变量，其余依次后移
+        names = [d, a, b, c]
+    a, b, c, d = names
+    lines += [
+        f"        a0 = (a0 + {a}) & 0xffffffff",
+        f"        b0 = (b0 + {b}) & 0xffffffff",
+        f"        c0 = (c0 + {c}) & 0xffffffff",
+        f"        d0 = (d0 + {d}) & 0xffffffff",
+        "    return a0, b0, c0, d0",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def md5_compress_function(k_table, shifts):
+    """获取指定 K 常量/位移量的压缩函数 (按参数缓存)"""
+    return _compile_compress(tuple(int(v) & _MASK for v in k_table), tuple(int(v) for v in shifts))
+
+
+@lru_cache(maxsize=32)
+def _compile_compress(k_table, shifts):
+    """编译压缩函数 (参数为元组，用作缓存键)"""
+    namespace = {'unpack_from': struct.Struct('<16I').unpack_from}
+    exec(compile(_generate_compress_source(k_table, shifts), '<md5-compress>', 'exec'), namespace)
+    return namespace['compress']
+
+
+def md5_padding(length):
+    """消息总长 length 字节时的 MD5 填充 (0x80、补零至 56 mod 64、64位小端比特长度)"""
+    return b'\x80' + b'\x00' * ((55 - length) % 64) + struct.pack('<Q', (length * 8) & 0xffffffffffffffff)
+
+
+class MD5Hasher:
+    """增量 MD5 (支持魔改参数)
+
+    标准参数且 fast=True 时内部使用 hashlib (此时不能导出中间状态)；
+    其余情况使用展开的压缩函数，状态为已处理的整块 (A, B, C, D, length) 加未满一块的缓冲。
+    """
+
+    def __init__(self, md5=None, fast=True):
+        self.md5 = md5 or MD5Encoders()
+        self._hashlib = hashlib.md5() if fast and self.md5.is_standard else None
+        self._compress = None if self._hashlib else self.md5.compress
+        self._state = tuple(self.md5.init_values)
+        self._length = 0
+        self._buffer = b''
+
+    @classmethod
+    def from_state(cls, state, md5=None, buffer=b''):
+        """由导出的中间状态 (A, B, C, D, length) 继续哈希"""
+        hasher = cls(md5, fast=False)
+        hasher.import_state(state, buffer)
+        return hasher
+
+    def update(self, data):
+        if self._hashlib is not None:
+            self._hashlib.update(data)
+            return self
+        data = memoryview(bytes(data) if not isinstance(data, (bytes, bytearray)) else data)
+        pos = 0
+        if self._buffer:
+            pos = min(64 - len(self._buffer), len(data))
+            self._buffer += bytes(data[:pos])
+            if len(self._buffer) < 64:
+                return self
+            self._state = self._compress(self._state, self._buffer)
+            self._length += 64
+            self._buffer = b''
+        end = pos + (len(data) - pos) // 64 * 64
+        if end > pos:
+            self._state = self._compress(self._state, data[pos:end])
+            self._length += end - pos
+        self._buffer = bytes(data[end:])
+        return self
+
+    def copy(self):
+        other = MD5Hasher.__new__(MD5Hasher)
+        other.md5 = self.md5
+        other._hashlib = self._hashlib.copy() if self._hashlib is not None else None
+        other._compress = self._compress
+        other._state = self._state
+        other._length = self._length
+        other._buffer = self._buffer
+        return other
+
+    def digest(self):
+        if self._hashlib is not None:
+            return self._hashlib.digest()
+        total = self._length + len(self._buffer)
+        state = self._compress(self._state, self._buffer + md5_padding(total))
+        return struct.pack('<4I', *state)
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    @property
+    def buffer(self):
+        """尚未凑满一块的输入"""
+        return self._buffer
+
+    def export_state(self):
+        """中间状态 (A, B, C, D, length)，length 为已处理的整块字节数 (未满一块的部分见 buffer)"""
+        if self._hashlib is not None:
+            raise ValueError("hashlib 后端不支持导出中间状态，请使用 fast=False")
+        return self._state + (self._length,)
+
+    def import_state(self, state, buffer=b''):
+        """导入中间状态；length 须为64的整数倍"""
+        a, b, c, d, length = state
+        if length < 0 or length % 64:
+            raise ValueError("中间状态的长度必须为64的整数倍")
+        if len(buffer) >= 64:
+            raise ValueError("缓冲数据不能超过一个分组")
+        self._hashlib = None
+        self._compress = self.md5.compress
+        self._state = (a & _MASK, b & _MASK, c & _MASK, d & _MASK)
+        self._length = length
+        self._buffer = bytes(buffer)
+        return self
+
+    @staticmethod
+    def format_state(state, buffer=b''):
+        """中间状态的文本形式: A/B/C/D 小端 hex:length[:缓冲 hex]"""
+        text = struct.pack('<4I', *state[:4]).hex() + f":{state[4]}"
+        if buffer:
+            text += ":" + bytes(buffer).hex()
+        return text
+
+    @staticmethod
+    def parse_state(text):
+        """解析 format_state 的输出，返回 (state, buffer)"""
+        parts = text.strip().split(':')
+        if len(parts) not in (2, 3):
+            raise ValueError("中间状态格式应为 <32位hex>:<长度>[:<缓冲hex>]")
+        raw = bytes.fromhex(parts[0])
+        if len(raw) != 16:
+            raise ValueError("中间状态须为16字节 (32个hex字符)")
+        buffer = bytes.fromhex(parts[2]) if len(parts) == 3 else b''
+        return struct.unpack('<4I', raw) + (int(parts[1]),), buffer
 
 
 class MD5Encoders:
@@ -49,6 +243,17 @@ class MD5Encoders:
         self.init_values = init_values if init_values and len(init_values) == 4 else self.STANDARD_INIT
         self.k_table = k_table if k_table and len(k_table) == 64 else self.STANDARD_K
         self.shifts = shifts if shifts and len(shifts) == 64 else self.STANDARD_SHIFTS
+        self.is_standard = (list(self.init_values) == self.STANDARD_INIT and
+                            list(self.k_table) == self.STANDARD_K and
+                            list(self.shifts) == self.STANDARD_SHIFTS)
+        self._compress = None
+
+    @property
+    def compress(self):
+        """展开的压缩函数 compress((A, B, C, D), data) (首次使用时生成)"""
+        if self._compress is None:
+            self._compress = md5_compress_function(self.k_table, self.shifts)
+        return self._compress
     
     @staticmethod
     def _left_rotate(x, amount):
@@ -56,8 +261,50 @@ class MD5Encoders:
         x = x & 0xffffffff
         return ((x << amount) | (x >> (32 - amount))) & 0xffffffff
     
+    def hasher(self, fast=True):
+        """增量哈希对象"""
+        return MD5Hasher(self, fast)
+
+    def length_extend(self, digest, original_lengths, append):
+        """长度扩展攻击
+
+        Args:
+            digest: 原消息的摘要 (16 字节)
+            original_lengths: 原消息 (含未知 secret) 的总字节数，可为单个整数或可迭代对象
+            append: 追加的数据
+
+        Returns:
+            [(original_length, padding, new_digest)]；伪造消息为 原消息 + padding + append
+        """
+        if len(digest) != 16:
+            raise ValueError("摘要必须为16字节")
+        if isinstance(original_lengths, int):
+            original_lengths = [original_lengths]
+        # 恢复的状态与 append 的整块部分和原消息长度无关 (填充后总是按块对齐)，只计算一次
+        restored = MD5Hasher.from_state(struct.unpack('<4I', digest) + (0,), self)
+        restored.update(append)
+        a, b, c, d, done = restored.export_state()
+        tail = restored.buffer
+        results = []
+        for length in original_lengths:
+            if length < 0:
+                raise ValueError("原消息长度不能为负数")
+            padding = md5_padding(length)
+            prefix = length + len(padding)
+            hasher = MD5Hasher.from_state((a, b, c, d, prefix + done), self, tail)
+            results.append((length, padding, hasher.digest()))
+        return results
+
     def _md5_hash(self, message):
-        """计算MD5哈希"""
+        """计算MD5哈希 (标准参数走 hashlib，自定义参数走展开的压缩函数)"""
+        if self.is_standard:
+            return hashlib.md5(message).digest()
+        message = bytes(message)
+        data = message + md5_padding(len(message))
+        return struct.pack('<4I', *self.compress(tuple(self.init_values), data))
+
+    def _md5_hash_reference(self, message):
+        """计算MD5哈希 (逐步解释执行的参考实现)"""
         # 初始化
         a0, b0, c0, d0 = self.init_values
         
@@ -167,10 +414,95 @@ class MD5Encoders:
             pass
         return None
     
+    @staticmethod
+    def from_params(init_values=None, k_table=None, shifts=None):
+        """由接口参数 (JSON/逗号分隔文本或列表) 构造实例"""
+        return MD5Encoders(MD5Encoders._parse_init_values(init_values),
+                           MD5Encoders._parse_k_table(k_table),
+                           MD5Encoders._parse_shifts(shifts))
+
+    @staticmethod
+    def _format_digest(hash_bytes, output_format):
+        if output_format.lower() == 'base64':
+            return base64.b64encode(hash_bytes).decode('utf-8')
+        return hash_bytes.hex()
+
+    @staticmethod
+    def _data_bytes(data, data_type):
+        if data_type and data_type.lower() == 'hex':
+            try:
+                return bytes.fromhex(data.replace(' ', '').replace('\n', ''))
+            except:
+                raise ValueError("输入数据不是有效的Hex字符串")
+        return data.encode('utf-8')
+
+    @staticmethod
+    def md5_midstate(data: str, init_values=None, k_table=None, shifts=None,
+                     data_type: str = None, state: str = None) -> str:
+        """计算输入数据之后的中间状态 (format_state 文本形式)
+
+        Args:
+            data, init_values, k_table, shifts, data_type: 同 md5_hash
+            state: 可选，在已有中间状态之后继续
+        """
+        md5 = MD5Encoders.from_params(init_values, k_table, shifts)
+        if state:
+            mid, buffer = MD5Hasher.parse_state(state)
+            hasher = MD5Hasher.from_state(mid, md5, buffer)
+        else:
+            hasher = md5.hasher(fast=False)
+        hasher.update(MD5Encoders._data_bytes(data or '', data_type))
+        return MD5Hasher.format_state(hasher.export_state(), hasher.buffer)
+
+    @staticmethod
+    def md5_length_extension(digest: str, message: str, append: str,
+                             secret_length: int = 0, max_secret_length: int = None,
+                             init_values=None, k_table=None, shifts=None,
+                             data_type: str = None, output_format: str = 'hex') -> list:
+        """MD5 长度扩展: 已知 H(secret || message)，伪造 H(secret || message || padding || append)
+
+        Args:
+            digest: 原摘要 (Hex)
+            message: secret 之后的已知消息 (可为空，此时 secret_length 即原消息长度)
+            append: 追加的数据
+            secret_length: secret 长度 (枚举时为下限)
+            max_secret_length: 可选，枚举 secret_length..max_secret_length
+            init_values / k_table / shifts: 魔改参数 (init_values 不影响结果，状态由摘要恢复)
+            data_type: message/append 的类型 (hex/utf-8)
+            output_format: 新摘要的输出格式 (hex/base64)
+
+        Returns:
+            [{"secret_length", "padding", "message", "digest"}]，padding/message 为 Hex，
+            message 为 secret 之后需要提交的完整数据
+        """
+        try:
+            digest_bytes = bytes.fromhex(digest.strip().replace(' ', ''))
+        except ValueError:
+            raise ValueError("摘要不是有效的Hex字符串")
+        if len(digest_bytes) != 16:
+            raise ValueError("摘要必须为16字节 (32个Hex字符)")
+        message_bytes = MD5Encoders._data_bytes(message or '', data_type)
+        append_bytes = MD5Encoders._data_bytes(append or '', data_type)
+        high = secret_length if max_secret_length is None else max_secret_length
+        if secret_length < 0 or high < secret_length:
+            raise ValueError("secret 长度范围无效")
+
+        md5 = MD5Encoders.from_params(init_values, k_table, shifts)
+        lengths = [n + len(message_bytes) for n in range(secret_length, high + 1)]
+        results = []
+        for length, padding, new_digest in md5.length_extend(digest_bytes, lengths, append_bytes):
+            results.append({
+                "secret_length": length - len(message_bytes),
+                "padding": padding.hex(),
+                "message": (message_bytes + padding + append_bytes).hex(),
+                "digest": MD5Encoders._format_digest(new_digest, output_format),
+            })
+        return results
+
     @staticmethod
     def md5_hash(data: str, output_format: str = 'hex',
                  init_values=None, k_table=None, shifts=None,
-                 data_type: str = None) -> str:
+                 data_type: str = None, state: str = None) -> str:
         """计算MD5哈希
         
         Args:
@@ -180,32 +512,19 @@ class MD5Encoders:
             k_table: 自定义K常量表 (64个)
             shifts: 自定义位移量 (64个)
             data_type: 输入数据类型 (hex/utf-8)
+            state: 可选，从导出的中间状态继续哈希 (见 md5_midstate)
         """
-        if not data:
+        if not data and not state:
             return ""
         
-        # 解析自定义参数
-        custom_init = MD5Encoders._parse_init_values(init_values)
-        custom_k = MD5Encoders._parse_k_table(k_table)
-        custom_shifts = MD5Encoders._parse_shifts(shifts)
-        
-        md5 = MD5Encoders(custom_init, custom_k, custom_shifts)
-        
-        # 数据处理
-        if data_type and data_type.lower() == 'hex':
-            try:
-                data_bytes = bytes.fromhex(data.replace(' ', '').replace('\n', ''))
-            except:
-                raise ValueError("输入数据不是有效的Hex字符串")
-        else:
-            data_bytes = data.encode('utf-8')
+        md5 = MD5Encoders.from_params(init_values, k_table, shifts)
+        data_bytes = MD5Encoders._data_bytes(data or '', data_type)
         
         # 计算哈希
-        hash_bytes = md5._md5_hash(data_bytes)
-        
-        # 输出格式
-        output_format = output_format.lower()
-        if output_format == 'base64':
-            return base64.b64encode(hash_bytes).decode('utf-8')
+        if state:
+            mid, buffer = MD5Hasher.parse_state(state)
+            hash_bytes = MD5Hasher.from_state(mid, md5, buffer).update(data_bytes).digest()
         else:
-            return hash_bytes.hex()
+            hash_bytes = md5._md5_hash(data_bytes)
+        
+        return MD5Encoders._format_digest(hash_bytes, output_format)
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+魔改 MD5 批量哈希与原像爆破
+MD5Batch 以 NumPy uint32 数组同步计算一批等长单块消息 (每列一个消息字)，
+K 常量/位移量/初始值均可自定义；MD5Crack 在其上按字典或掩码枚举候选，
+与目标摘要比较，分发到进程池并在命中后立即停止。
+
+- 候选消息为 prefix + 候选 + suffix；prefix 的整块部分只用 MD5Hasher 计算一次中间状态，
+  剩余部分须能放入最后一个分组 (不超过 55 字节)
+- 掩码语法同 hashcat: ?l ?u ?d ?s ?a ?h ?H ?b 以及自定义字符集 ?1，'??' 表示字面量 '?'
+- 超出单块的候选 (如字典中的个别长行) 逐个复制前缀状态后哈希，其余候选照常批量
+- 无 NumPy 时退化为逐个候选计算
+- 传给工作进程的只有可 pickle 的参数 (init_values/k_table/shifts 等)，
+  魔改 MD5 对象与批量引擎在各进程内重建
+"""
+
+import os
+import string
+import struct
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from core.decoder.md5 import MD5Encoders, MD5Hasher, _message_index
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时逐个候选计算
+    np = None
+
+
+# 掩码占位符
+MASK_CHARSETS = {
+    'l': string.ascii_lowercase.encode(),
+    'u': string.ascii_uppercase.encode(),
+    'd': string.digits.encode(),
+    's': bytes(c for c in range(0x20, 0x7F) if not chr(c).isalnum()),
+    'a': bytes(range(0x20, 0x7F)),
+    'h': b'0123456789abcdef',
+    'H': b'0123456789ABCDEF',
+    'b': bytes(range(256)),
+}
+
+# 最后一个分组可容纳的消息字节数 (需留出 0x80 与 8 字节长度)
+MAX_TAIL = 55
+
+
+class MD5Batch:
+    """NumPy 批量魔改 MD5 (一批等长的单块消息)"""
+
+    def __init__(self, md5=None):
+        if np is None:
+            raise RuntimeError("MD5Batch 需要 NumPy")
+        self.md5 = md5 or MD5Encoders()
+        self.k = [np.uint32(int(v) & 0xffffffff) for v in self.md5.k_table]
+        self.shifts = [int(v) for v in self.md5.shifts]
+        for s in self.shifts:
+            if not 0 <= s <= 32:
+                raise ValueError(f"位移量超出范围 (0-32): {s}")
+
+    def compress(self, words, state=None):
+        """words: (N, 16) uint32 消息字；返回 (A, B, C, D) 四个 uint32 数组
+
+        state 为起始中间状态 (默认初始值)。
+        """
+        state = state or self.md5.init_values
+        a0, b0, c0, d0 = (np.uint32(int(v) & 0xffffffff) for v in state)
+        m = [np.ascontiguousarray(words[:, g]) for g in range(16)]
+        n = words.shape[0]
+        a = np.full(n, a0, dtype=np.uint32)
+        b = np.full(n, b0, dtype=np.uint32)
+        c = np.full(n, c0, dtype=np.uint32)
+        d = np.full(n, d0, dtype=np.uint32)
+        for i in range(64):
+            r = i // 16
+            if r == 0:
+                f = d ^ (b & (c ^ d))
+            elif r == 1:
+                f = c ^ (d & (b ^ c))
+            elif r == 2:
+                f = b ^ c ^ d
+            else:
+                f = c ^ (b | ~d)
+            t = a + f
+            t += m[_message_index(i)]
+            t += self.k[i]
+            s = self.shifts[i]
+            if s not in (0, 32):
+                t = (t << np.uint32(s)) | (t >> np.uint32(32 - s))
+            t += b
+            a, b, c, d = d, t, b, c
+        return a + a0, b + b0, c + c0, d + d0
+
+    @staticmethod
+    def pad_blocks(messages, total_length):
+        """等长消息 (N, L) uint8 -> 单块 (N, 16) uint32，total_length 为含前缀的总字节数"""
+        n, length = messages.shape
+        if length > MAX_TAIL:
+            raise ValueError(f"最后一个分组最多容纳 {MAX_TAIL} 字节")
+        blocks = np.zeros((n, 64), dtype=np.uint8)
+        blocks[:, :length] = messages
+        blocks[:, length] = 0x80
+        blocks[:, 56:] = np.frombuffer(struct.pack('<Q', total_length * 8), dtype=np.uint8)
+        return blocks.view('<u4').astype(np.uint32)
+
+    def digests(self, messages, state=None, length=0):
+        """messages: (N, L) uint8 等长尾部消息；state/length 为前缀整块的中间状态与字节数
+
+        返回 (N, 16) uint8 摘要。
+        """
+        words = self.pad_blocks(messages, length + messages.shape[1])
+        out = np.stack(self.compress(words, state), axis=1).astype('<u4')
+        return out.view(np.uint8).reshape(len(messages), 16)
+
+
+class MaskSpace:
+    """hashcat 风格掩码的候选空间 (按索引随机访问)"""
+
+    def __init__(self, mask, custom_charset=None):
+        self.charsets = []
+        i = 0
+        while i < len(mask):
+            ch = mask[i]
+            if ch == '?' and i + 1 < len(mask):
+                token = mask[i + 1]
+                if token == '?':
+                    self.charsets.append(b'?')
+                elif token == '1':
+                    if not custom_charset:
+                        raise ValueError("掩码使用了 ?1 但未提供自定义字符集")
+                    self.charsets.append(custom_charset.encode('utf-8')
+                                         if isinstance(custom_charset, str) else bytes(custom_charset))
+                elif token in MASK_CHARSETS:
+                    self.charsets.append(MASK_CHARSETS[token])
+                else:
+                    raise ValueError(f"未知的掩码占位符: ?{token}")
+                i += 2
+            else:
+                # 字面量字符 (多字节字符按 UTF-8 字节展开)
+                self.charsets.extend(bytes([b]) for b in ch.encode('utf-8'))
+                i += 1
+        self.length = len(self.charsets)
+        self.total = 1
+        for cs in self.charsets:
+            self.total *= len(cs)
+        if self.total >= 1 << 64:
+            # 批量枚举以 uint64 计算下标
+            raise ValueError("掩码空间过大 (候选数须小于 2^64)")
+
+    def candidate_at(self, index):
+        """第 index 个候选 (末尾位置变化最快)"""
+        out = bytearray(self.length)
+        for pos in range(self.length - 1, -1, -1):
+            cs = self.charsets[pos]
+            index, digit = divmod(index, len(cs))
+            out[pos] = cs[digit]
+        return bytes(out)
+
+    def candidates(self, start, count):
+        """[start, start+count) 的候选，(count, length) uint8 数组"""
+        out = np.empty((count, self.length), dtype=np.uint8)
+        idx = np.arange(start, start + count, dtype=np.uint64)
+        for pos in range(self.length - 1, -1, -1):
+            cs = self.charsets[pos]
+            table = np.frombuffer(cs, dtype=np.uint8)
+            base = np.uint64(len(cs))
+            out[:, pos] = table[(idx % base).astype(np.intp)]
+            idx //= base
+        return out
+
+
+# ----------------------------
+# 批量检验 (进程池工作函数)
+# ----------------------------
+
+class _CrackContext:
+    """由可 pickle 的参数重建的检验上下文 (魔改 MD5 对象与批量引擎)"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.md5 = MD5Encoders(*spec['params'])
+        self.batch = MD5Batch(self.md5) if np is not None else None
+        self.fixed = len(spec['head']) + len(spec['suffix'])
+
+    def fits(self, length):
+        """候选长度为 length 时能否放入最后一个分组 (批量计算)"""
+        return self.batch is not None and self.fixed + length <= MAX_TAIL
+
+
+_WORKER_CONTEXT = None
+
+
+def _init_worker(spec):
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = _CrackContext(spec)
+
+
+def _check_scalar(ctx, candidate):
+    spec = ctx.spec
+    hasher = MD5Hasher.from_state(spec['state'], ctx.md5)
+    hasher.update(spec['head'] + candidate + spec['suffix'])
+    return hasher.digest() == spec['target']
+
+
+def _check_array(ctx, cands):
+    """cands: (N, L) uint8 候选，返回首个命中的下标或 None"""
+    spec = ctx.spec
+    head, suffix = spec['head'], spec['suffix']
+    n = len(cands)
+    if head or suffix:
+        msgs = np.empty((n, len(head) + cands.shape[1] + len(suffix)), dtype=np.uint8)
+        msgs[:, :len(head)] = np.frombuffer(head, dtype=np.uint8)
+        msgs[:, len(head):len(head) + cands.shape[1]] = cands
+        msgs[:, len(head) + cands.shape[1]:] = np.frombuffer(suffix, dtype=np.uint8)
+    else:
+        msgs = cands
+    digests = ctx.batch.digests(msgs, spec['state'][:4], spec['state'][4])
+    hits = np.flatnonzero((digests == np.frombuffer(spec['target'], dtype=np.uint8)).all(axis=1))
+    return int(hits[0]) if len(hits) else None
+
+
+def _search_words(ctx, words):
+    """检验一批字典候选，返回命中的候选或 None"""
+    groups = {}
+    for word in words:
+        groups.setdefault(len(word), []).append(word)
+    for length, group in groups.items():
+        if length == 0 or not ctx.fits(length):
+            # 空串或超出单块的候选逐个计算
+            for word in group:
+                if _check_scalar(ctx, word):
+                    return word
+            continue
+        cands = np.frombuffer(b''.join(group), dtype=np.uint8).reshape(len(group), length)
+        hit = _check_array(ctx, cands)
+        if hit is not None:
+            return group[hit]
+    return None
+
+
+def _search_range(ctx, start, count):
+    """检验掩码空间 [start, start+count)，返回命中的候选或 None"""
+    space = ctx.spec['space']
+    if not ctx.fits(space.length):
+        for index in range(start, start + count):
+            cand = space.candidate_at(index)
+            if _check_scalar(ctx, cand):
+                return cand
+        return None
+    cands = space.candidates(start, count)
+    hit = _check_array(ctx, cands)
+    return cands[hit].tobytes() if hit is not None else None
+
+
+def _search(ctx, task):
+    """执行一个任务，返回 (检验数, 命中的候选或 None)"""
+    kind, payload = task
+    if kind == 'words':
+        return len(payload), _search_words(ctx, payload)
+    start, count = payload
+    return count, _search_range(ctx, start, count)
+
+
+def _run_task(task):
+    return _search(_WORKER_CONTEXT, task)
+
+
+class MD5Crack:
+    """魔改 MD5 原像爆破 (字典或掩码)
+
+    用法 (脚本):
+        crack = MD5Crack(target_hex, mask='flag{?d?d?d?d}', k_table=custom_k)
+        result = crack.run()
+
+    服务端可调用 start() 在后台线程运行，通过 progress() 轮询、cancel() 取消。
+    """
+
+    BATCH_SIZE = 1 << 16      # 每个任务检验的候选数
+    MAX_INFLIGHT = 4          # 每个工作进程同时排队的任务数
+
+    def __init__(self, target, wordlist=None, mask=None, init_values=None, k_table=None,
+                 shifts=None, prefix=b'', suffix=b'', custom_charset=None, workers=None,
+                 batch_size=None, progress_callback=None):
+        """
+        Args:
+            target: 目标摘要 (Hex 或 16 字节)
+            wordlist: 字典 (字符串/字节串的可迭代对象，或换行分隔的文本)
+            mask: hashcat 风格掩码 (与 wordlist 二选一)
+            init_values / k_table / shifts: 魔改参数 (同 MD5Encoders.md5_hash)
+            prefix / suffix: 固定前缀/后缀 (如盐)
+            custom_charset: 掩码 ?1 对应的字符集
+            workers: 进程数 (默认 CPU 数)
+            progress_callback: f(progress_dict)，每完成一批调用
+        """
+        if isinstance(target, str):
+            target = bytes.fromhex(target.strip().replace(' ', ''))
+        if len(target) != 16:
+            raise ValueError("目标摘要必须为16字节 (32个Hex字符)")
+        if (wordlist is None) == (mask is None):
+            raise ValueError("需要提供字典或掩码 (二选一)")
+        if isinstance(prefix, str):
+            prefix = prefix.encode('utf-8')
+        if isinstance(suffix, str):
+            suffix = suffix.encode('utf-8')
+
+        md5 = MD5Encoders.from_params(init_values, k_table, shifts)
+        # 前缀的整块部分只计算一次
+        hasher = md5.hasher(fast=False).update(prefix)
+        spec = {
+            'params': (list(md5.init_values), list(md5.k_table), list(md5.shifts)),
+            'state': hasher.export_state(),
+            'head': hasher.buffer,
+            'suffix': bytes(suffix),
+            'target': bytes(target),
+            'space': None,
+        }
+
+        self.words = None
+        if mask is not None:
+            spec['space'] = MaskSpace(mask, custom_charset)
+            self.total = spec['space'].total
+        else:
+            if isinstance(wordlist, str):
+                wordlist = wordlist.splitlines()
+            self.words = [w.encode('utf-8') if isinstance(w, str) else bytes(w) for w in wordlist]
+            self.total = len(self.words)
+        self._spec = spec
+        # 本实例 (顺序执行时) 专用的上下文，不与其他任务共享
+        self._context = _CrackContext(spec)
+
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size or self.BATCH_SIZE)
+        self.progress_callback = progress_callback
+        self.tested = 0
+        self.status = 'pending'
+        self.result = None
+        self.error = None
+        self._started = None
+        self._elapsed = 0.0
+        self.finished_at = None  # 结束时间戳 (运行中为 None)
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def cancel(self):
+        """请求取消 (当前批次完成后生效)"""
+        self._cancel.set()
+
+    def progress(self):
+        elapsed = time.time() - self._started if self.status == 'running' else self._elapsed
+        return {
+            "status": self.status,
+            "tested": self.tested,
+            "total": self.total,
+            "percent": round(100.0 * self.tested / self.total, 2) if self.total else 100.0,
+            "elapsed": round(elapsed, 2),
+            "rate": int(self.tested / elapsed) if elapsed > 0 else 0,
+            "plaintext": self.result.decode('utf-8', errors='replace') if self.result is not None else None,
+            "plaintext_hex": self.result.hex() if self.result is not None else None,
+        }
+
+    def _advance(self, count):
+        self.tested += count
+        if self.progress_callback is not None:
+            self.progress_callback(self.progress())
+
+    def _tasks(self):
+        if self.words is not None:
+            for start in range(0, self.total, self.batch_size):
+                yield 'words', self.words[start:start + self.batch_size]
+        else:
+            for start in range(0, self.total, self.batch_size):
+                yield 'range', (start, min(self.batch_size, self.total - start))
+
+    def _run_sequential(self):
+        for task in self._tasks():
+            if self._cancel.is_set():
+                return None
+            count, found = _search(self._context, task)
+            self._advance(count)
+            if found is not None:
+                return found
+        return None
+
+    def _run_pool(self):
+        tasks = self._tasks()
+        limit = self.workers * self.MAX_INFLIGHT
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self._spec,))
+        try:
+            pending = set()
+            for task in tasks:
+                pending.add(pool.submit(_run_task, task))
+                if len(pending) >= limit:
+                    break
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    count, found = fut.result()
+                    self._advance(count)
+                    if found is not None:
+                        return found
+                if self._cancel.is_set():
+                    return None
+                for task in tasks:
+                    pending.add(pool.submit(_run_task, task))
+                    if len(pending) >= limit:
+                        break
+            return None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self):
+        """执行爆破 (阻塞)，返回 progress() 结果"""
+        self.status = 'running'
+        self._started = time.time()
+        try:
+            if self.workers > 1 and self.total > self.batch_size:
+                found = self._run_pool()
+            else:
+                found = self._run_sequential()
+        except Exception:
+            self.status = 'error'
+            self._elapsed = time.time() - self._started
+            self.finished_at = time.time()
+            raise
+        self._elapsed = time.time() - self._started
+        self.finished_at = time.time()
+        if found is not None:
+            self.result = bytes(found)
+            self.status = 'found'
+        elif self._cancel.is_set():
+            self.status = 'cancelled'
+        else:
+            self.status = 'exhausted'
+        return self.progress()
+
+    def start(self):
+        """在后台线程中运行"""
+        def target():
+            try:
+                self.run()
+            except Exception as e:
+                self.error = str(e)
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+        return self
+
+    @staticmethod
+    def crack(target, wordlist=None, mask=None, init_values=None, k_table=None, shifts=None,
+              prefix=b'', suffix=b'', custom_charset=None, workers=None):
+        """便捷接口: 执行爆破，返回命中的明文字节串或 None"""
+        crack = MD5Crack(target, wordlist, mask, init_values, k_table, shifts,
+                         prefix, suffix, custom_charset, workers)
+        crack.run()
+        return crack.result
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分组密码工作模式 (ECB, CBC, CFB, OFB, CTR)
+AES / SM4 / DES / 3DES 共用，驱动任何提供 encrypt_block / decrypt_block 的对象
+若对象提供 encrypt_blocks / decrypt_blocks (批量、块间无依赖)，ECB、CTR、CBC解密、CFB解密会优先使用
+输出写入预分配的 bytearray，输入通过 memoryview 切片，异或使用大整数或 NumPy 批量完成
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+# 超过该长度时使用 NumPy 异或
+_NUMPY_XOR_THRESHOLD = 1 << 16
+
+
+def xor_bytes(a, b):
+    """等长字节串异或"""
+    n = len(a)
+    if np is not None and n >= _NUMPY_XOR_THRESHOLD:
+        return np.bitwise_xor(np.frombuffer(a, dtype=np.uint8),
+                              np.frombuffer(b, dtype=np.uint8)).tobytes()
+    return (int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')).to_bytes(n, 'little')
+
+
+def ctr_blocks(ctr, count, block_size=16):
+    """生成从 ctr 开始的 count 个大端计数器块 (按块长回绕)"""
+    bits = block_size * 8
+    ctr &= (1 << bits) - 1
+    if np is not None and count >= 64 and block_size in (8, 16):
+        lo0 = ctr & 0xFFFFFFFFFFFFFFFF
+        lo = np.arange(count, dtype=np.uint64) + np.uint64(lo0)
+        if block_size == 8:
+            return lo.astype('>u8').tobytes()
+        carry = (lo < np.uint64(lo0)).astype(np.uint64)  # 低64位回绕时进位
+        blocks = np.empty((count, 2), dtype='>u8')
+        blocks[:, 0] = carry + np.uint64(ctr >> 64)
+        blocks[:, 1] = lo
+        return blocks.tobytes()
+    mask = (1 << bits) - 1
+    return b''.join(((ctr + i) & mask).to_bytes(block_size, 'big') for i in range(count))
+
+
+class BlockCipherModes:
+    """分组密码工作模式"""
+
+    SUPPORTED_MODES = ('ECB', 'CBC', 'CFB', 'OFB', 'CTR')
+    # 块间无依赖、可批量/并行处理的模式
+    PARALLEL_ENCRYPT = ('ECB', 'CTR')
+    PARALLEL_DECRYPT = ('ECB', 'CBC', 'CFB', 'CTR')
+
+    @staticmethod
+    def encrypt_blocks(cipher, data, block_size):
+        """批量加密完整块 (ECB 语义)"""
+        batch = getattr(cipher, 'encrypt_blocks', None)
+        if batch is not None:
+            return batch(data)
+        return BlockCipherModes._each_block(cipher.encrypt_block, data, block_size)
+
+    @staticmethod
+    def decrypt_blocks(cipher, data, block_size):
+        """批量解密完整块 (ECB 语义)"""
+        batch = getattr(cipher, 'decrypt_blocks', None)
+        if batch is not None:
+            return batch(data)
+        return BlockCipherModes._each_block(cipher.decrypt_block, data, block_size)
+
+    @staticmethod
+    def _each_block(func, data, bs):
+        n = len(data) // bs * bs
+        mv = memoryview(data)
+        out = bytearray(n)
+        for off in range(0, n, bs):
+            out[off:off + bs] = func(mv[off:off + bs])
+        return bytes(out)
+
+    @staticmethod
+    def _keystream_ofb(cipher, iv, length, bs):
+        nblocks = (length + bs - 1) // bs
+        out = bytearray(nblocks * bs)
+        enc = cipher.encrypt_block
+        block = iv
+        for off in range(0, len(out), bs):
+            block = enc(block)
+            out[off:off + bs] = block
+        return bytes(out[:length])
+
+    @staticmethod
+    def encrypt(cipher, mode, data, iv=None, block_size=16, parallel=False):
+        """按模式加密
+
+        ECB 忽略末尾不足一块的数据；CBC 要求数据为块长整数倍；
+        CFB/OFB/CTR 为流模式，支持任意长度。
+        parallel=True 时，可并行模式的大输入交给多进程执行。
+        """
+        mode = mode.upper()
+        bs = block_size
+        n = len(data)
+
+        if parallel:
+            result = BlockCipherModes._run_parallel(cipher, mode, 'encrypt', data, iv, bs)
+            if result is not None:
+                return result
+
+        if mode == 'ECB':
+            return BlockCipherModes.encrypt_blocks(cipher, data[:n // bs * bs], bs)
+
+        if mode == 'CBC':
+            if n % bs:
+                raise ValueError(f"CBC模式数据长度必须为{bs}字节的整数倍")
+            mv = memoryview(data)
+            out = bytearray(n)
+            enc = cipher.encrypt_block
+            prev = int.from_bytes(iv, 'big')
+            for off in range(0, n, bs):
+                block = enc((int.from_bytes(mv[off:off + bs], 'big') ^ prev).to_bytes(bs, 'big'))
+                out[off:off + bs] = block
+                prev = int.from_bytes(block, 'big')
+            return bytes(out)
+
+        if mode == 'CTR':
+            return BlockCipherModes._ctr(cipher, data, iv, bs)
+
+        if mode == 'OFB':
+            return xor_bytes(data, BlockCipherModes._keystream_ofb(cipher, iv, n, bs))
+
+        if mode == 'CFB':
+            mv = memoryview(data)
+            out = bytearray(n)
+            enc = cipher.encrypt_block
+            prev = iv
+            for off in range(0, n, bs):
+                chunk = mv[off:off + bs]
+                ks = enc(prev)[:len(chunk)]
+                block = xor_bytes(chunk, ks)
+                out[off:off + len(chunk)] = block
+                prev = block
+            return bytes(out)
+
+        raise ValueError(f"不支持的加密模式: {mode}")
+
+    @staticmethod
+    def decrypt(cipher, mode, data, iv=None, block_size=16, parallel=False):
+        """按模式解密 (ECB/CBC 忽略末尾不足一块的数据)"""
+        mode = mode.upper()
+        bs = block_size
+        n = len(data)
+
+        if parallel:
+            result = BlockCipherModes._run_parallel(cipher, mode, 'decrypt', data, iv, bs)
+            if result is not None:
+                return result
+
+        if mode == 'ECB':
+            return BlockCipherModes.decrypt_blocks(cipher, data[:n // bs * bs], bs)
+
+        if mode == 'CBC':
+            # P_i = D(C_i) ^ C_{i-1}，块间无依赖
+            full = n // bs * bs
+            body = data[:full]
+            return xor_bytes(BlockCipherModes.decrypt_blocks(cipher, body, bs),
+                             (bytes(iv) + bytes(body[:full - bs]))[:full])
+
+        if mode == 'CTR':
+            return BlockCipherModes._ctr(cipher, data, iv, bs)
+
+        if mode == 'OFB':
+            return xor_bytes(data, BlockCipherModes._keystream_ofb(cipher, iv, n, bs))
+
+        if mode == 'CFB':
+            # 密钥流 E(C_{i-1}) 只依赖密文，可批量计算
+            nblocks = (n + bs - 1) // bs
+            prevs = bytes(iv) + bytes(data[:(nblocks - 1) * bs]) if nblocks else b''
+            keystream = BlockCipherModes.encrypt_blocks(cipher, prevs, bs)
+            return xor_bytes(data, keystream[:n])
+
+        raise ValueError(f"不支持的加密模式: {mode}")
+
+    @staticmethod
+    def _run_parallel(cipher, mode, direction, data, iv, bs):
+        """满足条件时多进程执行，否则返回 None 走单进程路径"""
+        from core.decoder.parallel import ParallelBlockExecutor
+        executor = ParallelBlockExecutor()
+        if not executor.should_run(mode, direction, len(data)):
+            return None
+        return executor.run(cipher, mode, direction, data, iv, bs)
+
+    @staticmethod
+    def _ctr(cipher, data, iv, bs):
+        n = len(data)
+        ctr = int.from_bytes(iv, 'big')
+        counters = ctr_blocks(ctr, (n + bs - 1) // bs, bs)
+        keystream = BlockCipherModes.encrypt_blocks(cipher, counters, bs)
+        return xor_bytes(data, keystream[:n])
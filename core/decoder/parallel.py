@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分组密码多进程并行执行
+ECB 加解密、CTR、CBC/CFB 解密的块之间没有依赖，可按块区间切分后分发到进程池
+
+密码对象本身可能含 exec 编译的函数 (如 AesVariant)，不能在 spawn/forkserver 下 pickle；
+因此只传递 worker_spec() 给出的重建参数 (密钥、S盒、轮数等)，工作进程按参数重建并缓存。
+进程池在多次调用间复用。
+"""
+
+import atexit
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from core.decoder.modes import BlockCipherModes
+
+# 工作进程内按重建参数缓存的密码对象
+_WORKER_CIPHERS = OrderedDict()
+_WORKER_CACHE_SIZE = 8
+
+# 父进程内复用的进程池
+_POOL = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def cipher_spec(cipher):
+    """密码对象 -> 序列化后的重建参数 (没有 worker_spec 的对象直接 pickle)"""
+    build = getattr(cipher, 'worker_spec', None)
+    return pickle.dumps(build() if build is not None else (None, cipher, None))
+
+
+def _worker_cipher(spec):
+    cipher = _WORKER_CIPHERS.get(spec)
+    if cipher is not None:
+        _WORKER_CIPHERS.move_to_end(spec)
+        return cipher
+    factory, args, kwargs = pickle.loads(spec)
+    cipher = args if factory is None else factory(*args, **kwargs)
+    _WORKER_CIPHERS[spec] = cipher
+    if len(_WORKER_CIPHERS) > _WORKER_CACHE_SIZE:
+        _WORKER_CIPHERS.popitem(last=False)
+    return cipher
+
+
+def _run_chunk(args):
+    spec, mode, direction, chunk, iv, block_size = args
+    cipher = _worker_cipher(spec)
+    if direction == 'encrypt':
+        return BlockCipherModes.encrypt(cipher, mode, chunk, iv, block_size)
+    return BlockCipherModes.decrypt(cipher, mode, chunk, iv, block_size)
+
+
+def _shared_pool(workers):
+    """获取 (必要时创建) 指定进程数的共享进程池"""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(max_workers=workers)
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def _discard_pool(pool):
+    """进程池损坏 (工作进程异常退出) 时丢弃，下次调用重建"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False)
+
+
+@atexit.register
+def _shutdown_pool():
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+
+
+class ParallelBlockExecutor:
+    """将可并行模式的大输入切块后交给 ProcessPoolExecutor 处理"""
+
+    MIN_PARALLEL_SIZE = 1 << 20   # 小于 1MB 时进程开销大于收益
+    CHUNK_SIZE = 4 << 20          # 每个任务处理的字节数
+
+    def __init__(self, workers=None, chunk_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+
+    @staticmethod
+    def can_parallelize(mode, direction):
+        """该模式/方向的块之间是否相互独立"""
+        mode = mode.upper()
+        if direction == 'encrypt':
+            return mode in BlockCipherModes.PARALLEL_ENCRYPT
+        return mode in BlockCipherModes.PARALLEL_DECRYPT
+
+    def should_run(self, mode, direction, length):
+        return (self.workers > 1 and length >= self.MIN_PARALLEL_SIZE
+                and self.can_parallelize(mode, direction))
+
+    def _chunk_iv(self, mode, data, iv, offset, block_size):
+        """计算从 offset 开始的子区间所需的 IV"""
+        if offset == 0 or mode == 'ECB':
+            return iv
+        if mode == 'CTR':
+            bits = block_size * 8
+            ctr = (int.from_bytes(iv, 'big') + offset // block_size) & ((1 << bits) - 1)
+            return ctr.to_bytes(block_size, 'big')
+        # CBC/CFB 解密: 前一个密文块
+        return bytes(data[offset - block_size:offset])
+
+    def run(self, cipher, mode, direction, data, iv=None, block_size=16):
+        """并行执行并按原顺序拼接结果"""
+        mode = mode.upper()
+        if not self.can_parallelize(mode, direction):
+            raise ValueError(f"{mode} 模式{'加密' if direction == 'encrypt' else '解密'}无法并行")
+
+        n = len(data)
+        if mode in ('ECB', 'CBC'):
+            n = n // block_size * block_size
+        step = max(block_size, self.chunk_size // block_size * block_size)
+        mv = memoryview(data)
+        spec = cipher_spec(cipher)
+        tasks = [(spec, mode, direction, bytes(mv[off:min(off + step, n)]),
+                  self._chunk_iv(mode, mv, iv, off, block_size), block_size)
+                 for off in range(0, n, step)]
+
+        out = bytearray(n)
+        pool = _shared_pool(self.workers)
+        try:
+            off = 0
+            for part in pool.map(_run_chunk, tasks):
+                out[off:off + len(part)] = part
+                off += len(part)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+        return bytes(out)
@@ -128,7 +128,11 @@ def aes_encrypt(data, params):
 
     return AesPureEncoders.encrypt(data, key, mode, iv, padding, sbox=sbox, 
                                    swap_key_schedule=val_swap_key, swap_data_round=val_swap_data,
-                                   key_type=val_key_type, iv_type=val_iv_type, data_type=val_data_type)
+                                   key_type=val_key_type, iv_type=val_iv_type, data_type=val_data_type,
+                                   parallel=params.get('parallel', False),
+                                   aad=params.get('aad', ''), aad_type=params.get('aad_type', 'utf-8'),
+                                   rounds=params.get('rounds'), mix_matrix=params.get('mix_matrix'),
+                                   shift_offsets=params.get('shift_offsets'), rcon=params.get('rcon'))
 
 @register_operation('aes_decrypt')
 def aes_decrypt(data, params):
@@ -145,9 +149,20 @@ def aes_decrypt(data, params):
     
     return AesPureEncoders.decrypt(data, key, mode, iv, padding, sbox=sbox,
                                    swap_key_schedule=val_swap_key, swap_data_round=val_swap_data,
-                                   key_type=val_key_type, iv_type=val_iv_type, data_type=val_data_type)
+                                   key_type=val_key_type, iv_type=val_iv_type, data_type=val_data_type,
+                                   parallel=params.get('parallel', False),
+                                   aad=params.get('aad', ''), aad_type=params.get('aad_type', 'utf-8'),
+                                   rounds=params.get('rounds'), mix_matrix=params.get('mix_matrix'),
+                                   shift_offsets=params.get('shift_offsets'), rcon=params.get('rcon'))
 
 
+@register_operation('aes_invert_key')
+def aes_invert_key(data, params):
+    return AesPureEncoders.invert_key(data, round_index=params.get('round_index', 10),
+                                      key_bits=params.get('key_bits', 128),
+                                      sbox=params.get('sbox'),
+                                      swap_key_schedule=params.get('swap_key_schedule', False))
+
 # SM4加解密
 from core.decoder.sm4 import SM4Encoders
 
@@ -170,7 +185,10 @@ def sm4_encrypt(data, params):
                                  swap_endian=val_swap_endian, 
                                  swap_key_schedule=val_swap_key,
                                  swap_data_round=val_swap_data,
-                                 data_type=val_data_type)
+                                 data_type=val_data_type,
+                                 parallel=params.get('parallel', False),
+                                 fk=params.get('fk'), ck=params.get('ck'),
+                                 rounds=params.get('rounds'))
 
 @register_operation('sm4_decrypt')
 def sm4_decrypt(data, params):
@@ -191,7 +209,17 @@ def sm4_decrypt(data, params):
                                  swap_endian=val_swap_endian, 
                                  swap_key_schedule=val_swap_key,
                                  swap_data_round=val_swap_data,
-                                 data_type=val_data_type)
+                                 data_type=val_data_type,
+                                 parallel=params.get('parallel', False),
+                                 fk=params.get('fk'), ck=params.get('ck'),
+                                 rounds=params.get('rounds'))
+
+@register_operation('sm4_invert_key')
+def sm4_invert_key(data, params):
+    return SM4Encoders.sm4_invert_key(data, round_index=params.get('round_index', 0),
+                                      sbox=params.get('sbox'),
+                                      swap_key_schedule=params.get('swap_key_schedule', False),
+                                      fk=params.get('fk'), ck=params.get('ck'))
 
 # GUI 可通过 OPERATION_REGISTRY.keys() 获取所有操作名
 # 并通过 Pipeline 组合操作链
@@ -212,7 +240,8 @@ def des_encrypt(data, params):
     
     return DESEncoders.des_encrypt(data, key, mode, iv, padding, sboxes=sboxes,
                                    key_type=val_key_type, iv_type=val_iv_type,
-                                   data_type=val_data_type)
+                                   data_type=val_data_type,
+                                   parallel=params.get('parallel', False))
 
 @register_operation('des_decrypt')
 def des_decrypt(data, params):
@@ -227,7 +256,8 @@ def des_decrypt(data, params):
     
     return DESEncoders.des_decrypt(data, key, mode, iv, padding, sboxes=sboxes,
                                    key_type=val_key_type, iv_type=val_iv_type,
-                                   data_type=val_data_type)
+                                   data_type=val_data_type,
+                                   parallel=params.get('parallel', False))
 
 @register_operation('triple_des_encrypt')
 def triple_des_encrypt(data, params):
@@ -242,7 +272,8 @@ def triple_des_encrypt(data, params):
     
     return DESEncoders.triple_des_encrypt(data, key, mode, iv, padding, sboxes=sboxes,
                                           key_type=val_key_type, iv_type=val_iv_type,
-                                          data_type=val_data_type)
+                                          data_type=val_data_type,
+                                          parallel=params.get('parallel', False))
 
 @register_operation('triple_des_decrypt')
 def triple_des_decrypt(data, params):
@@ -257,9 +288,11 @@ def triple_des_decrypt(data, params):
     
     return DESEncoders.triple_des_decrypt(data, key, mode, iv, padding, sboxes=sboxes,
                                           key_type=val_key_type, iv_type=val_iv_type,
-                                          data_type=val_data_type)
+                                          data_type=val_data_type,
+                                          parallel=params.get('parallel', False))
 
 # MD5哈希
+import json
 from core.decoder.md5 import MD5Encoders
 
 @register_operation('md5_hash')
@@ -269,10 +302,30 @@ def md5_hash(data, params):
     k_table = params.get('k_table')
     shifts = params.get('shifts')
     val_data_type = params.get('data_type')
+    state = params.get('state')
     
     return MD5Encoders.md5_hash(data, output_format=output_format,
                                 init_values=init_values, k_table=k_table,
-                                shifts=shifts, data_type=val_data_type)
+                                shifts=shifts, data_type=val_data_type, state=state)
+
+# 输入为原摘要 (Hex)，输出各 secret 长度的伪造结果 (JSON)
+@register_operation('md5_length_extension')
+def md5_length_extension(data, params):
+    max_len = params.get('max_secret_length')
+    result = MD5Encoders.md5_length_extension(
+        data, params.get('message', ''), params.get('append', ''),
+        secret_length=int(params.get('secret_length', 0) or 0),
+        max_secret_length=int(max_len) if max_len not in (None, '') else None,
+        init_values=params.get('init_values'), k_table=params.get('k_table'),
+        shifts=params.get('shifts'), data_type=params.get('data_type'),
+        output_format=params.get('output_format', 'hex'))
+    return json.dumps(result, ensure_ascii=False)
+
+@register_operation('md5_midstate')
+def md5_midstate(data, params):
+    return MD5Encoders.md5_midstate(data, init_values=params.get('init_values'),
+                                    k_table=params.get('k_table'), shifts=params.get('shifts'),
+                                    data_type=params.get('data_type'), state=params.get('state'))
 
 # RC4流密码
 from core.decoder.rc4 import RC4Encoders
@@ -285,8 +338,12 @@ def rc4_encrypt(data, params):
     val_key_type = params.get('key_type', 'utf-8')
     val_data_type = params.get('data_type')
     
+    drop = int(params.get('drop', 0) or 0)
+    offset = int(params.get('offset', 0) or 0)
+    
     return RC4Encoders.rc4_encrypt(data, key, swap_bytes=swap_bytes, sbox=sbox,
-                                   key_type=val_key_type, data_type=val_data_type)
+                                   key_type=val_key_type, data_type=val_data_type,
+                                   drop=drop, offset=offset)
 
 @register_operation('rc4_decrypt')
 def rc4_decrypt(data, params):
@@ -296,5 +353,9 @@ def rc4_decrypt(data, params):
     val_key_type = params.get('key_type', 'utf-8')
     val_data_type = params.get('data_type')
     
+    drop = int(params.get('drop', 0) or 0)
+    offset = int(params.get('offset', 0) or 0)
+    
     return RC4Encoders.rc4_decrypt(data, key, swap_bytes=swap_bytes, sbox=sbox,
-                                   key_type=val_key_type, data_type=val_data_type)
+                                   key_type=val_key_type, data_type=val_data_type,
+                                   drop=drop, offset=offset)
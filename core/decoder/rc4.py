@@ -3,23 +3,206 @@
 """
 RC4 流密码算法纯Python实现
 支持自定义S盒初始化和KSA/PRGA修改 (Magic RC4)
+
+状态为 bytearray，PRGA 以局部变量绑定写入预分配的密钥流缓冲区，异或批量完成。
+已生成的密钥流与 PRGA 状态保存在按 (密钥, 自定义S盒, swap_bytes, drop) 索引的共享 LRU 中
+(单项与总字节数均有上限)，同一密钥再次处理更长的输入时只需续算新增部分。
+
+RC4Stream 为可分块输入的有状态流对象，每隔 N 字节在紧凑数组中记录 S/i/j 检查点，
+seek 到任意偏移时从最近的检查点续算。支持 RC4-drop[n] (丢弃密钥流前 n 字节)。
+
+RC4Batch 以 (M, 256) uint8 的 NumPy 状态同时对 M 个候选密钥执行 KSA/PRGA，
+只输出每个密钥的前 K 字节密钥流，配合已知明文前缀做字典攻击。
 """
 
 import base64
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时批量引擎退化为逐密钥计算
+    np = None
+
+from core.decoder.context_cache import CONTEXT_CACHE
+from core.decoder.modes import xor_bytes
+
+
+def rc4_prga(S, i, j, out, start=0, length=None):
+    """从状态 (S, i, j) 生成 length 字节密钥流写入 out[start:]，返回新的 (i, j)
+
+    S 为 bytearray，原地更新。
+    """
+    end = len(out) if length is None else start + length
+    for k in range(start, end):
+        i = (i + 1) & 0xFF
+        si = S[i]
+        j = (j + si) & 0xFF
+        sj = S[j]
+        S[i] = sj
+        S[j] = si
+        out[k] = S[(si + sj) & 0xFF]
+    return i, j
+
+
+class RC4Stream:
+    """可定位的 RC4 流 (偏移以丢弃 drop 字节之后为 0)
+
+    检查点按位置 k*interval 依次记录在一个 bytearray 中，每项 258 字节 (S + i + j)。
+    """
+
+    ENTRY = 258
+    DEFAULT_INTERVAL = 1 << 16
+
+    def __init__(self, rc4, key, checkpoint_interval=None):
+        self.interval = int(checkpoint_interval or self.DEFAULT_INTERVAL)
+        if self.interval <= 0:
+            raise ValueError("检查点间隔必须为正数")
+        self._S, self._i, self._j = rc4._start_state(key)
+        self._pos = 0
+        self._checkpoints = bytearray()
+        self._record()
+
+    def _record(self):
+        """位于下一个待记录检查点时保存状态"""
+        if self._pos == (len(self._checkpoints) // self.ENTRY) * self.interval:
+            self._checkpoints += self._S
+            self._checkpoints.append(self._i)
+            self._checkpoints.append(self._j)
+
+    def _generate(self, out, start=0, length=None):
+        """生成密钥流写入 out[start:start+length]，跨越检查点边界时记录状态"""
+        end = len(out) if length is None else start + length
+        interval = self.interval
+        while start < end:
+            step = min(end - start, interval - self._pos % interval)
+            self._i, self._j = rc4_prga(self._S, self._i, self._j, out, start, step)
+            self._pos += step
+            start += step
+            if self._pos % interval == 0:
+                self._record()
+
+    @property
+    def checkpoints(self):
+        """已记录的检查点数量"""
+        return len(self._checkpoints) // self.ENTRY
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset):
+        """定位到密钥流偏移 offset"""
+        if offset < 0:
+            raise ValueError("偏移不能为负数")
+        k = min(offset // self.interval, self.checkpoints - 1)
+        if offset < self._pos or k * self.interval > self._pos:
+            # 回到 offset 之前最近的已记录检查点 (比当前位置更近时)
+            entry = self._checkpoints[k * self.ENTRY:(k + 1) * self.ENTRY]
+            self._S = bytearray(entry[:256])
+            self._i, self._j = entry[256], entry[257]
+            self._pos = k * self.interval
+        skip = offset - self._pos
+        if skip:
+            scratch = bytearray(min(skip, self.interval))
+            while skip:
+                step = min(skip, len(scratch))
+                self._generate(scratch, 0, step)
+                skip -= step
+        return self._pos
+
+    def keystream(self, length):
+        """从当前位置取 length 字节密钥流"""
+        out = bytearray(length)
+        self._generate(out)
+        return bytes(out)
+
+    def update(self, data):
+        """加/解密下一段数据"""
+        return xor_bytes(bytes(data), self.keystream(len(data)))
+
+    def crypt_at(self, offset, data):
+        """加/解密位于流偏移 offset 处的数据"""
+        self.seek(offset)
+        return self.update(data)
+
+
+class _KeystreamEntry:
+    """一个密钥的已生成密钥流及其之后的 PRGA 状态"""
+
+    def __init__(self, state):
+        self.ks = bytearray()
+        self.state = state
+        self.lock = threading.Lock()
+
+
+class _KeystreamCache:
+    """各 RC4 上下文共享的密钥流缓存 (LRU，按总字节数限额)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def entry(self, ident, make_state):
+        with self._lock:
+            entry = self._entries.get(ident)
+            if entry is not None:
+                self._entries.move_to_end(ident)
+                return entry
+        entry = _KeystreamEntry(make_state())
+        with self._lock:
+            # 并发创建时以先插入者为准
+            entry = self._entries.setdefault(ident, entry)
+            self._entries.move_to_end(ident)
+        return entry
+
+    def grew(self, ident, entry, delta):
+        """记录 entry 新增的字节数，超出总额时淘汰最久未用的项"""
+        with self._lock:
+            if self._entries.get(ident) is not entry:
+                return  # 已被淘汰，不再计入
+            self._size += delta
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._size -= len(old.ks)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+KEYSTREAM_CACHE = _KeystreamCache(64 << 20)
 
 
 class RC4Encoders:
     """RC4流密码实现 - 支持魔改参数"""
+
+    # 每个密钥缓存的密钥流上限 (超出部分按需续算，不再保存)；总量由 KEYSTREAM_CACHE 限制
+    MAX_CACHED_KEYSTREAM = 4 << 20
     
-    def __init__(self, swap_bytes=False, custom_sbox=None):
+    def __init__(self, swap_bytes=False, custom_sbox=None, drop=0):
         """初始化RC4
         
         Args:
             swap_bytes: KSA交换时是否交换字节顺序
             custom_sbox: 自定义初始S盒 (256字节)
+            drop: RC4-drop[n]，丢弃密钥流前 n 字节
         """
         self.swap_bytes = swap_bytes
         self.custom_sbox = custom_sbox
+        self.drop = int(drop or 0)
+        if self.drop < 0:
+            raise ValueError("drop 不能为负数")
+        self._ksa_key = None
+        self._ksa_state = None
+        # 密钥流缓存的索引 (不含密钥)
+        sbox = bytes(v & 0xFF for v in custom_sbox) if custom_sbox and len(custom_sbox) == 256 else b''
+        self._ks_ident = (sbox, bool(swap_bytes), self.drop)
+        self._ks_lock = threading.Lock()
+        # 超出缓存上限的随机访问使用带检查点的流对象
+        self._seek_stream = None
     
     def _ksa(self, key):
         """密钥调度算法 (Key Scheduling Algorithm)"""
@@ -27,15 +210,16 @@ class RC4Encoders:
         
         # 初始化S盒
         if self.custom_sbox and len(self.custom_sbox) == 256:
-            S = list(self.custom_sbox)
+            S = bytearray(v & 0xFF for v in self.custom_sbox)
         else:
-            S = list(range(256))
+            S = bytearray(range(256))
         
         j = 0
+        swap_bytes = self.swap_bytes
         for i in range(256):
-            j = (j + S[i] + key[i % key_len]) % 256
+            j = (j + S[i] + key[i % key_len]) & 0xFF
             
-            if self.swap_bytes:
+            if swap_bytes:
                 # Magic: 交换时使用不同的逻辑
                 S[i], S[j] = S[j] ^ i, S[i] ^ j
             else:
@@ -46,25 +230,73 @@ class RC4Encoders:
     
     def _prga(self, S, length):
         """伪随机生成算法 (Pseudo-Random Generation Algorithm)"""
-        i = 0
-        j = 0
-        keystream = []
-        
-        for _ in range(length):
-            i = (i + 1) % 256
-            j = (j + S[i]) % 256
-            S[i], S[j] = S[j], S[i]
-            
-            K = S[(S[i] + S[j]) % 256]
-            keystream.append(K)
-        
+        keystream = bytearray(length)
+        rc4_prga(S, 0, 0, keystream)
         return keystream
     
+    def _initial_state(self, key):
+        """KSA 结果 (同一密钥只计算一次)"""
+        if self._ksa_key != key:
+            self._ksa_state = bytes(self._ksa(key))
+            self._ksa_key = key
+        return self._ksa_state
+
+    def _start_state(self, key):
+        """丢弃 drop 字节后的 PRGA 状态 (S, i, j)"""
+        S = bytearray(self._initial_state(key))
+        i = j = 0
+        if self.drop:
+            i, j = rc4_prga(S, i, j, bytearray(self.drop))
+        return S, i, j
+
+    def stream(self, key, checkpoint_interval=None):
+        """创建可分块输入、可定位的流对象"""
+        return RC4Stream(self, key, checkpoint_interval)
+
+    def keystream(self, key, length):
+        """前 length 字节密钥流 (复用并按需扩展缓存)"""
+        ident = (bytes(key),) + self._ks_ident
+        entry = KEYSTREAM_CACHE.entry(ident, lambda: self._start_state(key))
+        grow = 0
+        with entry.lock:
+            ks = entry.ks
+            cached = len(ks)
+            if length <= cached:
+                return bytes(ks[:length])
+
+            S, i, j = entry.state
+            limit = self.MAX_CACHED_KEYSTREAM
+            if cached < limit:
+                grow = min(length, limit) - cached
+                ks.extend(bytes(grow))
+                i, j = rc4_prga(S, i, j, ks, cached, grow)
+                entry.state = (S, i, j)
+                cached += grow
+            if length <= cached:
+                result = bytes(ks[:length])
+            else:
+                # 超出单项上限: 以缓存状态的副本续算剩余部分
+                out = bytearray(length)
+                out[:cached] = ks
+                rc4_prga(bytearray(S), i, j, out, cached)
+                result = bytes(out)
+        if grow:
+            KEYSTREAM_CACHE.grew(ident, entry, grow)
+        return result
+
     def encrypt(self, plaintext, key):
         """RC4加密"""
-        S = self._ksa(key)
-        keystream = self._prga(S, len(plaintext))
-        return bytes([p ^ k for p, k in zip(plaintext, keystream)])
+        return xor_bytes(bytes(plaintext), self.keystream(key, len(plaintext)))
+
+    def crypt_at(self, data, key, offset):
+        """加/解密位于密钥流偏移 offset 处的数据片段"""
+        end = offset + len(data)
+        if end <= self.MAX_CACHED_KEYSTREAM:
+            return xor_bytes(bytes(data), self.keystream(key, end)[offset:])
+        with self._ks_lock:
+            if self._seek_stream is None or self._seek_stream[0] != key:
+                self._seek_stream = (key, self.stream(key))
+            return self._seek_stream[1].crypt_at(offset, data)
     
     def decrypt(self, ciphertext, key):
         """RC4解密 (与加密相同)"""
@@ -94,12 +326,80 @@ class RC4Encoders:
         except:
             pass
         return None
+
+    @staticmethod
+    def rc4_dictionary_attack(data: str, known_plaintext: str, wordlist,
+                              offset: int = 0, swap_bytes: bool = False, sbox=None,
+                              data_type: str = 'base64', known_type: str = 'utf-8',
+                              key_type: str = 'utf-8', max_results: int = 1,
+                              drop: int = 0) -> list:
+        """字典攻击: 返回能使密文在 offset 处解出已知明文的候选密钥
+
+        Args:
+            data: 密文 (hex/base64)
+            known_plaintext: 已知明文片段
+            wordlist: 候选密钥 (可迭代对象或换行分隔的字符串)
+            offset: 已知明文在明文中的偏移
+            key_type: 候选密钥的解释方式 (hex/utf-8)
+            max_results: 命中数量上限 (0 表示不限)
+            drop: RC4-drop[n]
+        """
+        if data_type and data_type.lower() == 'hex':
+            ciphertext = bytes.fromhex(data.replace(' ', '').replace('\n', ''))
+        else:
+            ciphertext = base64.b64decode(data)
+        if known_type and known_type.lower() == 'hex':
+            known = bytes.fromhex(known_plaintext.replace(' ', ''))
+        else:
+            known = known_plaintext.encode('utf-8')
+        if not known:
+            raise ValueError("已知明文不能为空")
+        if offset < 0 or offset + len(known) > len(ciphertext):
+            raise ValueError("已知明文超出密文范围")
+        if isinstance(wordlist, str):
+            wordlist = wordlist.splitlines()
+
+        def candidates():
+            for word in wordlist:
+                if isinstance(word, str):
+                    word = word.strip('\r\n')
+                    if not word:
+                        continue
+                    word = bytes.fromhex(word.replace(' ', '')) if key_type.lower() == 'hex' else word.encode('utf-8')
+                if word:
+                    yield bytes(word)
+
+        batch = RC4Batch(swap_bytes=bool(swap_bytes), custom_sbox=RC4Encoders._parse_sbox(sbox), drop=drop)
+        expected = xor_bytes(ciphertext[offset:offset + len(known)], known)
+        found = []
+        for key in batch.search(candidates(), expected, offset):
+            found.append({
+                "key": key.decode('utf-8', errors='replace'),
+                "key_hex": key.hex(),
+                "plaintext": base64.b64encode(batch.scalar.encrypt(ciphertext, key)).decode('utf-8'),
+            })
+            if max_results and len(found) >= max_results:
+                break
+        return found
+
+    @staticmethod
+    def _get_context(key_bytes, sbox, swap_bytes, drop=0):
+        """从共享缓存获取已完成KSA的 RC4 对象"""
+        cache_key = CONTEXT_CACHE.make_key('rc4', key_bytes, sbox, (bool(swap_bytes), int(drop or 0)))
+
+        def factory():
+            rc4 = RC4Encoders(swap_bytes=bool(swap_bytes), custom_sbox=RC4Encoders._parse_sbox(sbox),
+                              drop=drop)
+            rc4._initial_state(key_bytes)
+            return rc4
+        return CONTEXT_CACHE.get(cache_key, factory)
     
     @staticmethod
     def rc4_encrypt(data: str, key: str, 
                     swap_bytes: bool = False, sbox=None,
                     key_type: str = 'utf-8',
-                    data_type: str = None) -> str:
+                    data_type: str = None,
+                    drop: int = 0, offset: int = 0) -> str:
         """RC4加密
         
         Args:
@@ -109,6 +409,8 @@ class RC4Encoders:
             sbox: 自定义初始S盒
             key_type: 密钥类型 (hex/utf-8)
             data_type: 输入数据类型 (hex/utf-8)
+            drop: RC4-drop[n]，丢弃密钥流前 n 字节
+            offset: 输入数据在密钥流中的起始偏移
         """
         if not data:
             return ""
@@ -125,10 +427,9 @@ class RC4Encoders:
         if not key_bytes:
             raise ValueError("密钥不能为空")
         
-        # 自定义S盒
-        custom_sbox = RC4Encoders._parse_sbox(sbox)
-        
-        rc4 = RC4Encoders(swap_bytes=swap_bytes, custom_sbox=custom_sbox)
+        if offset < 0:
+            raise ValueError("偏移不能为负数")
+        rc4 = RC4Encoders._get_context(key_bytes, sbox, swap_bytes, drop)
         
         # 数据处理
         if data_type and data_type.lower() == 'hex':
@@ -140,7 +441,7 @@ class RC4Encoders:
             data_bytes = data.encode('utf-8')
         
         # 加密
-        encrypted = rc4.encrypt(data_bytes, key_bytes)
+        encrypted = rc4.crypt_at(data_bytes, key_bytes, offset)
         
         return base64.b64encode(encrypted).decode('utf-8')
     
@@ -148,7 +449,8 @@ class RC4Encoders:
     def rc4_decrypt(data: str, key: str,
                     swap_bytes: bool = False, sbox=None,
                     key_type: str = 'utf-8',
-                    data_type: str = None) -> str:
+                    data_type: str = None,
+                    drop: int = 0, offset: int = 0) -> str:
         """RC4解密
         
         Args:
@@ -158,6 +460,8 @@ class RC4Encoders:
             sbox: 自定义初始S盒
             key_type: 密钥类型 (hex/utf-8)
             data_type: 输入数据类型 (hex/base64)
+            drop: RC4-drop[n]，丢弃密钥流前 n 字节
+            offset: 密文在密钥流中的起始偏移
         """
         if not data:
             return ""
@@ -187,13 +491,12 @@ class RC4Encoders:
                 raise ValueError(f"输入数据解析失败 ({data_type}): {str(e)}")
             return ""
         
-        # 自定义S盒
-        custom_sbox = RC4Encoders._parse_sbox(sbox)
-        
-        rc4 = RC4Encoders(swap_bytes=swap_bytes, custom_sbox=custom_sbox)
+        if offset < 0:
+            raise ValueError("偏移不能为负数")
+        rc4 = RC4Encoders._get_context(key_bytes, sbox, swap_bytes, drop)
         
         # 解密
-        decrypted = rc4.decrypt(encrypted_data, key_bytes)
+        decrypted = rc4.crypt_at(encrypted_data, key_bytes, offset)
         
         # 输出
         try:
@@ -208,3 +511,109 @@ class RC4Encoders:
             return decrypted.hex()
         except:
             return decrypted.hex()
+
+
+class RC4Batch:
+    """多密钥并行 RC4 (每行一个密钥的 (M, 256) 状态)"""
+
+    CHUNK_KEYS = 1 << 15    # 每批候选密钥数
+
+    def __init__(self, swap_bytes=False, custom_sbox=None, drop=0):
+        self.swap_bytes = bool(swap_bytes)
+        self.custom_sbox = custom_sbox if custom_sbox and len(custom_sbox) == 256 else None
+        # 同参数的单密钥引擎 (无 NumPy 时的回退，以及命中后的完整解密)
+        self.scalar = RC4Encoders(swap_bytes=self.swap_bytes, custom_sbox=self.custom_sbox, drop=drop)
+        self.drop = self.scalar.drop
+
+    def _ksa(self, keys):
+        """keys: 等长密钥 (m, L) uint8 数组 -> (m, 256) 状态"""
+        m, key_len = keys.shape
+        if self.custom_sbox:
+            base = np.array([v & 0xFF for v in self.custom_sbox], dtype=np.uint8)
+        else:
+            base = np.arange(256, dtype=np.uint8)
+        S = np.tile(base, (m, 1))
+        rows = np.arange(m)
+        j = np.zeros(m, dtype=np.uint8)
+        swap_bytes = self.swap_bytes
+        for i in range(256):
+            si = S[:, i].copy()
+            j += si
+            j += keys[:, i % key_len]
+            sj = S[rows, j]
+            if swap_bytes:
+                # 与标量实现一致: i == j 时后一次赋值生效
+                S[:, i] = sj ^ i
+                S[rows, j] = si ^ j
+            else:
+                S[:, i] = sj
+                S[rows, j] = si
+        return S
+
+    @staticmethod
+    def _prga(S, length):
+        """(m, 256) 状态 -> (m, length) 密钥流 (S 原地更新)"""
+        m = S.shape[0]
+        rows = np.arange(m)
+        j = np.zeros(m, dtype=np.uint8)
+        out = np.empty((m, length), dtype=np.uint8)
+        for k in range(length):
+            i = (k + 1) & 0xFF
+            si = S[:, i].copy()
+            j += si
+            sj = S[rows, j]
+            S[:, i] = sj
+            S[rows, j] = si
+            out[:, k] = S[rows, si + sj]
+        return out
+
+    def keystreams(self, keys, length):
+        """各密钥前 length 字节密钥流 (丢弃 drop 字节之后)
+
+        keys 为字节串序列 (长度可不同)，返回 (M, length) uint8 数组；
+        无 NumPy 时返回字节串列表。
+        """
+        keys = [bytes(k) for k in keys]
+        if np is None:
+            out = []
+            for key in keys:
+                buf = bytearray(length)
+                S, i, j = self.scalar._start_state(key)
+                rc4_prga(S, i, j, buf)
+                out.append(bytes(buf))
+            return out
+        result = np.empty((len(keys), length), dtype=np.uint8)
+        groups = {}
+        for idx, key in enumerate(keys):
+            if not key:
+                raise ValueError("密钥不能为空")
+            groups.setdefault(len(key), []).append(idx)
+        for key_len, idxs in groups.items():
+            arr = np.frombuffer(b''.join(keys[i] for i in idxs), dtype=np.uint8).reshape(len(idxs), key_len)
+            result[idxs] = self._prga(self._ksa(arr), self.drop + length)[:, self.drop:]
+        return result
+
+    def search(self, keys, expected, offset=0):
+        """逐批检验候选密钥，产出第 offset 字节起的密钥流等于 expected 的密钥"""
+        expected = bytes(expected)
+        length = offset + len(expected)
+        chunk = []
+        for key in keys:
+            chunk.append(key)
+            if len(chunk) >= self.CHUNK_KEYS:
+                yield from self._check(chunk, expected, offset, length)
+                chunk = []
+        if chunk:
+            yield from self._check(chunk, expected, offset, length)
+
+    def _check(self, chunk, expected, offset, length):
+        streams = self.keystreams(chunk, length)
+        if np is None:
+            for key, ks in zip(chunk, streams):
+                if ks[offset:] == expected:
+                    yield key
+            return
+        target = np.frombuffer(expected, dtype=np.uint8)
+        hits = np.nonzero((streams[:, offset:] == target).all(axis=1))[0]
+        for idx in hits:
+            yield chunk[idx]
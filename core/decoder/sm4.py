@@ -5,12 +5,122 @@ SM4/SMS4 算法纯Python实现
 标准: GB/T 32907-2016
 支持模式: ECB, CBC, CFB, OFB, CTR
 支持自定义S盒 (Magic S-Box)
+多块无依赖场景 (ECB、CTR、CBC/CFB解密) 在安装 NumPy 时走 Sm4Batch 向量化路径
 """
 
 import struct
 import base64
 import os
 import hashlib
+import json
+from functools import lru_cache
+
+from core.decoder.context_cache import CONTEXT_CACHE
+from core.decoder.modes import BlockCipherModes
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时逐块处理
+    np = None
+
+
+_PACK = struct.Struct('>4I')
+
+def _rotl32(x, n):
+    return ((x << n) | (x >> (32 - n))) & 0xFFFFFFFF
+
+
+def sm4_tables(sbox, swap=False, key_schedule=False):
+    """合并 tau 与线性变换的 4 张 256 项 T表 (按 S盒/交换标志/线性变换 缓存)
+
+    T_k[x] 为输入字第 k 个字节 (k=0 为最高字节) 取值 x 时 L(tau(.)) 的贡献，
+    由 L 的线性可得 L(tau(a)) = T0[a>>24] ^ T1[(a>>16)&0xFF] ^ T2[(a>>8)&0xFF] ^ T3[a&0xFF]。
+    swap 时S盒输出按字节逆序放置 (对应 _tau_swapped)；key_schedule 时使用 L'。
+    """
+    return _build_sm4_tables(tuple(sbox), bool(swap), bool(key_schedule))
+
+
+@lru_cache(maxsize=32)
+def _build_sm4_tables(sbox, swap, key_schedule):
+    """生成 T表 (sbox 为 256 元组，用作缓存键)"""
+    if key_schedule:
+        linear = lambda b: b ^ _rotl32(b, 13) ^ _rotl32(b, 23)
+    else:
+        linear = lambda b: b ^ _rotl32(b, 2) ^ _rotl32(b, 10) ^ _rotl32(b, 18) ^ _rotl32(b, 24)
+    tables = []
+    for k in range(4):
+        shift = 8 * k if swap else 24 - 8 * k
+        tables.append(tuple(linear(sbox[x] << shift) for x in range(256)))
+    return tuple(tables)
+
+
+def sm4_ck(count=32):
+    """按标准规则生成 CK: ck[i] 第 j 字节为 (4i+j)*7 mod 256 (轮数超过32时延续该规则)"""
+    return tuple(int.from_bytes(bytes(((4 * i + j) * 7) & 0xFF for j in range(4)), 'big')
+                 for i in range(count))
+
+
+@lru_cache(maxsize=256)
+def _sm4_key_schedule(key, sbox, fk, ck, swap_key_schedule):
+    """扩展并缓存轮密钥 (按 主密钥 / S盒 / FK / CK / 交换设置)，轮数为 len(ck)"""
+    k0, k1, k2, k3 = sm4_tables(sbox, swap_key_schedule, key_schedule=True)
+    K = [m ^ f for m, f in zip(_PACK.unpack(key), fk)]
+    for i, c in enumerate(ck):
+        a = K[i+1] ^ K[i+2] ^ K[i+3] ^ c
+        # tau + L' 查表
+        K.append(K[i] ^ k0[a >> 24] ^ k1[(a >> 16) & 0xFF] ^ k2[(a >> 8) & 0xFF] ^ k3[a & 0xFF])
+    return tuple(K[4:])
+
+
+class Sm4Batch:
+    """SM4 多块向量化实现 (NumPy)
+
+    N 个块的 X0..X3 各为长度 N 的 uint32 数组，每轮对全部块同时计算
+    X0 ^ T0[a>>24] ^ T1[(a>>16)&0xFF] ^ T2[(a>>8)&0xFF] ^ T3[a&0xFF]，
+    T表来自当前S盒与 swap_data_round 设置。
+    """
+
+    MIN_BLOCKS = 64          # 少于该块数时逐块处理更快
+    CHUNK_BLOCKS = 1 << 16   # 每次处理的块数，限制临时数组大小
+
+    def __init__(self, sm4):
+        if np is None:
+            raise RuntimeError("Sm4Batch 需要 NumPy")
+        self.tables = [np.array(t, dtype=np.uint32) for t in sm4._round_tables]
+        self.sk_enc = [np.uint32(k) for k in sm4.sk_enc]
+        self.sk_dec = [np.uint32(k) for k in sm4.sk_dec]
+
+    def _crypt_array(self, words, sk):
+        t0, t1, t2, t3 = self.tables
+        x0, x1, x2, x3 = (words[:, j].copy() for j in range(4))
+        mask = np.uint32(0xFF)
+        for rk in sk:
+            a = x1 ^ x2 ^ x3
+            a ^= rk
+            x0 ^= t0[a >> 24]
+            x0 ^= t1[(a >> 16) & mask]
+            x0 ^= t2[(a >> 8) & mask]
+            x0 ^= t3[a & mask]
+            x0, x1, x2, x3 = x1, x2, x3, x0
+        return np.stack((x3, x2, x1, x0), axis=1)
+
+    def _run(self, data, sk):
+        words = np.frombuffer(bytes(data), dtype='>u4')
+        n = len(words) // 4
+        words = words[:n * 4].reshape(n, 4).astype(np.uint32)
+        out = np.empty((n, 4), dtype='>u4')
+        step = self.CHUNK_BLOCKS
+        for i in range(0, n, step):
+            out[i:i + step] = self._crypt_array(words[i:i + step], sk)
+        return out.tobytes()
+
+    def encrypt_blocks(self, data):
+        """加密 16 字节整数倍的数据 (ECB 语义)"""
+        return self._run(data, self.sk_enc)
+
+    def decrypt_blocks(self, data):
+        """解密 16 字节整数倍的数据 (ECB 语义)"""
+        return self._run(data, self.sk_dec)
 
 
 class SM4Encoders:
@@ -59,6 +169,7 @@ class SM4Encoders:
             self.sbox = sbox
         else:
             self.sbox = self.STANDARD_SBOX
+        self._round_tables = sm4_tables(self.sbox)
 
     @staticmethod
     def _rotl(x, n):
@@ -97,55 +208,92 @@ class SM4Encoders:
         """加密线性变换"""
         return b ^ SM4Encoders._rotl(b, 2) ^ SM4Encoders._rotl(b, 10) ^ SM4Encoders._rotl(b, 18) ^ SM4Encoders._rotl(b, 24)
 
-    def set_key(self, key, mode=0, swap_key_schedule=False, swap_data_round=False):
+    @staticmethod
+    def _resolve_constants(fk=None, ck=None, rounds=None):
+        """校验并返回 (FK, CK) 元组，CK 长度即轮数"""
+        fk = tuple(fk) if fk else tuple(SM4Encoders.SM4_FK)
+        if len(fk) != 4:
+            raise ValueError(f"SM4 FK 必须为4个32位字 (当前: {len(fk)})")
+        if rounds is not None and int(rounds) < 1:
+            raise ValueError("SM4 轮数必须为正整数")
+        if ck:
+            ck = tuple(ck)
+            rounds = int(rounds) if rounds else len(ck)
+            if len(ck) < rounds:
+                raise ValueError(f"SM4 CK 数量 ({len(ck)}) 少于轮数 ({rounds})")
+            ck = ck[:rounds]
+        else:
+            ck = tuple(SM4Encoders.SM4_CK) if not rounds or int(rounds) == 32 else sm4_ck(int(rounds))
+        return tuple(v & 0xFFFFFFFF for v in fk), tuple(v & 0xFFFFFFFF for v in ck)
+
+    def set_key(self, key, mode=0, swap_key_schedule=False, swap_data_round=False,
+                fk=None, ck=None, rounds=None):
         """设置密钥
         mode: 0=Encrypt, 1=Decrypt
         swap_key_schedule: use swapped S-box output for Key Expansion
         swap_data_round: use swapped S-box output for Encryption/Decryption rounds
+        fk / ck / rounds: 自定义系统参数、固定参数与轮数 (默认标准值，32轮)
         """
         self.swap_data_round = swap_data_round
-        
-        MK = [0, 0, 0, 0]
-        try:
-            k = struct.unpack('>4I', key)
-            MK[0], MK[1], MK[2], MK[3] = k
-        except:
-             if len(key) < 16:
-                 key = key + b'\x00' * (16 - len(key))
-             elif len(key) > 16:
-                 key = key[:16]
-             k = struct.unpack('>4I', key)
-             MK[0], MK[1], MK[2], MK[3] = k
-
-        K = [0] * 36
-        K[0] = MK[0] ^ self.SM4_FK[0]
-        K[1] = MK[1] ^ self.SM4_FK[1]
-        K[2] = MK[2] ^ self.SM4_FK[2]
-        K[3] = MK[3] ^ self.SM4_FK[3]
-
-        for i in range(32):
-            rk = K[i+1] ^ K[i+2] ^ K[i+3] ^ self.SM4_CK[i]
-            
-            if swap_key_schedule:
-                rk = self._tau_swapped(rk)
-            else:
-                rk = self._tau(rk)
-                
-            rk = self._l_key(rk)
-            K[i+4] = K[i] ^ rk
-            self.sk[i] = K[i+4]
+        self._round_tables = sm4_tables(self.sbox, swap_data_round)
+        fk, ck = self._resolve_constants(fk, ck, rounds)
+        self._key_args = (bytes(key), mode, bool(swap_key_schedule), bool(swap_data_round), fk, ck)
+        self.rounds = len(ck)
+
+        key = bytes(key)
+        if len(key) < 16:
+            key = key + b'\x00' * (16 - len(key))
+        self.sk = list(_sm4_key_schedule(key[:16], tuple(self.sbox), fk, ck,
+                                         bool(swap_key_schedule)))
+
+        # 同时保留加密/解密两种轮密钥顺序，供工作模式层使用
+        self.sk_enc = list(self.sk)
+        self.sk_dec = self.sk[::-1]
+        self._batch = None  # 轮密钥已变化，向量化对象需重建
 
         # 解密时密钥逆序
         if mode == 1:
             self.sk = self.sk[::-1]
 
+    @staticmethod
+    def _rebuild(sbox, key, mode, swap_key_schedule, swap_data_round, fk, ck):
+        sm4 = SM4Encoders(sbox)
+        sm4.set_key(key, mode, swap_key_schedule, swap_data_round, fk=fk, ck=ck)
+        return sm4
+
+    def worker_spec(self):
+        """可 pickle 的重建参数 (工作进程内重新生成轮密钥)"""
+        return SM4Encoders._rebuild, (list(self.sbox),) + self._key_args, {}
+
     def one_round(self, block):
-        """单轮加/解密"""
+        """单轮加/解密 (按 set_key 的 mode 决定方向)"""
+        return self._crypt_block(block, self.sk)
+
+    def encrypt_block(self, block):
+        """加密单个16字节块"""
+        return self._crypt_block(block, self.sk_enc)
+
+    def decrypt_block(self, block):
+        """解密单个16字节块"""
+        return self._crypt_block(block, self.sk_dec)
+
+    def _crypt_block(self, block, sk):
+        """T表引擎: 每轮一次异或合并 + 4 次查表"""
+        t0, t1, t2, t3 = self._round_tables
+        x0, x1, x2, x3 = _PACK.unpack(block)
+        for rk in sk:
+            a = x1 ^ x2 ^ x3 ^ rk
+            x0, x1, x2, x3 = x1, x2, x3, (x0 ^ t0[a >> 24] ^ t1[(a >> 16) & 0xFF] ^
+                                          t2[(a >> 8) & 0xFF] ^ t3[a & 0xFF])
+        return _PACK.pack(x3, x2, x1, x0)
+
+    def _crypt_block_reference(self, block, sk):
+        """逐步 tau/L 的参考实现 (用于校验 T表引擎)"""
         X = [0, 0, 0, 0]
         X[0], X[1], X[2], X[3] = struct.unpack('>4I', block)
 
-        for i in range(32):
-            temp = X[1] ^ X[2] ^ X[3] ^ self.sk[i]
+        for i in range(len(sk)):
+            temp = X[1] ^ X[2] ^ X[3] ^ sk[i]
             
             # Apply tau (S-box)
             if self.swap_data_round:
@@ -159,6 +307,24 @@ class SM4Encoders:
             X[0], X[1], X[2], X[3] = X[1], X[2], X[3], X[0]
 
         return struct.pack('>4I', X[3], X[2], X[1], X[0])
+
+    def encrypt_blocks(self, data):
+        """批量加密若干完整块 (块间无依赖，可用 NumPy 向量化)"""
+        if np is not None and len(data) >= Sm4Batch.MIN_BLOCKS * 16:
+            return self._get_batch().encrypt_blocks(data)
+        return BlockCipherModes._each_block(self.encrypt_block, data, 16)
+
+    def decrypt_blocks(self, data):
+        """批量解密若干完整块"""
+        if np is not None and len(data) >= Sm4Batch.MIN_BLOCKS * 16:
+            return self._get_batch().decrypt_blocks(data)
+        return BlockCipherModes._each_block(self.decrypt_block, data, 16)
+
+    def _get_batch(self):
+        batch = getattr(self, '_batch', None)
+        if batch is None:
+            batch = self._batch = Sm4Batch(self)
+        return batch
     
     # ----------------------------
     # 辅助与填充
@@ -238,13 +404,133 @@ class SM4Encoders:
              pass
         return None
 
+    @staticmethod
+    def _parse_constants(value):
+        """解析 FK/CK 列表: 整数列表、JSON，或空格/逗号分隔的 Hex 字"""
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                return None
+            if value.startswith('['):
+                value = json.loads(value)
+            else:
+                try:
+                    return [int(v, 16) for v in value.replace(',', ' ').split()]
+                except ValueError:
+                    raise ValueError("SM4 常量不是有效的Hex字")
+        if not value:
+            return None
+        return [int(v, 16) if isinstance(v, str) else int(v) for v in value]
+
+    # ----------------------------
+    # 轮密钥反推
+    # ----------------------------
+
+    @staticmethod
+    def _inverse_constants(round_index, sbox, swap_key_schedule, fk, ck):
+        if round_index < 0:
+            raise ValueError("轮密钥序号不能为负")
+        if ck:
+            ck = tuple(ck)
+        else:
+            ck = tuple(SM4Encoders.SM4_CK) if round_index + 4 <= 32 else sm4_ck(round_index + 4)
+        if len(ck) < round_index + 4:
+            raise ValueError(f"SM4 CK 数量 ({len(ck)}) 不足以覆盖 rk[{round_index}..{round_index + 3}]")
+        fk, _ = SM4Encoders._resolve_constants(fk)
+        sbox = sbox if sbox and len(sbox) == 256 else SM4Encoders.STANDARD_SBOX
+        return sm4_tables(sbox, swap_key_schedule, key_schedule=True), fk, ck
+
+    @staticmethod
+    def invert_key_schedule(round_keys, round_index=0, sbox=None, swap_key_schedule=False,
+                            fk=None, ck=None):
+        """由任意4个连续轮密钥 rk[i..i+3] 反推主密钥 MK
+
+        rk[i] = K[i+4]，按 K[j] = K[j+4] ^ T'(K[j+1] ^ K[j+2] ^ K[j+3] ^ CK[j])
+        从 j = i+3 回推到 j = 0，MK = K[0..3] ^ FK。
+
+        Args:
+            round_keys: 16字节 (4个大端32位字)
+            round_index: 首个轮密钥的序号 i
+        """
+        (k0, k1, k2, k3), fk, ck = SM4Encoders._inverse_constants(
+            round_index, sbox, swap_key_schedule, fk, ck)
+        round_keys = bytes(round_keys)
+        if len(round_keys) != 16:
+            raise ValueError(f"需要4个连续轮密钥 (16字节，当前: {len(round_keys)})")
+        K = list(_PACK.unpack(round_keys))  # K[j+1..j+4]
+        for j in range(round_index + 3, -1, -1):
+            a = K[0] ^ K[1] ^ K[2] ^ ck[j]
+            K = [K[3] ^ k0[a >> 24] ^ k1[(a >> 16) & 0xFF] ^ k2[(a >> 8) & 0xFF] ^ k3[a & 0xFF]] + K[:3]
+        return _PACK.pack(*(K[n] ^ fk[n] for n in range(4)))
+
+    @staticmethod
+    def invert_key_schedule_batch(round_keys, round_index=0, sbox=None, swap_key_schedule=False,
+                                  fk=None, ck=None):
+        """批量反推主密钥
+
+        Args:
+            round_keys: (N, 16) 的 uint8 数组，或 N*16 字节的连续数据
+        Returns:
+            NumPy 可用时为 (N, 16) uint8 数组，否则为主密钥 bytes 列表
+        """
+        if np is None:
+            data = bytes(round_keys)
+            return [SM4Encoders.invert_key_schedule(data[o:o + 16], round_index, sbox,
+                                                    swap_key_schedule, fk, ck)
+                    for o in range(0, len(data) - 15, 16)]
+
+        tables, fk, ck = SM4Encoders._inverse_constants(round_index, sbox, swap_key_schedule, fk, ck)
+        k0, k1, k2, k3 = (np.array(t, dtype=np.uint32) for t in tables)
+        if isinstance(round_keys, (bytes, bytearray, memoryview)):
+            arr = np.frombuffer(round_keys, dtype=np.uint8)
+        else:
+            arr = np.ascontiguousarray(round_keys, dtype=np.uint8)
+        words = arr[:arr.size // 16 * 16].view('>u4').reshape(-1, 4).astype(np.uint32)
+        K = [words[:, n] for n in range(4)]
+        mask = np.uint32(0xFF)
+        for j in range(round_index + 3, -1, -1):
+            a = K[0] ^ K[1] ^ K[2] ^ np.uint32(ck[j])
+            K = [K[3] ^ k0[a >> 24] ^ k1[(a >> 16) & mask] ^ k2[(a >> 8) & mask] ^ k3[a & mask]] + K[:3]
+        out = np.stack([K[n] ^ np.uint32(fk[n]) for n in range(4)], axis=1).astype('>u4')
+        return out.view(np.uint8).reshape(-1, 16)
+
+    @staticmethod
+    def sm4_invert_key(round_keys: str, round_index: int = 0, sbox=None,
+                       swap_key_schedule: bool = False, fk=None, ck=None) -> str:
+        """由4个连续轮密钥 (Hex) 反推主密钥 (Hex)"""
+        try:
+            rk = bytes.fromhex(round_keys.replace(' ', '').replace('\n', ''))
+        except ValueError:
+            raise ValueError("轮密钥不是有效的Hex字符串")
+        return SM4Encoders.invert_key_schedule(rk, int(round_index), SM4Encoders._parse_sbox(sbox),
+                                               swap_key_schedule, SM4Encoders._parse_constants(fk),
+                                               SM4Encoders._parse_constants(ck)).hex()
+
+    @staticmethod
+    def _get_context(key_bytes, sbox, swap_key_schedule, swap_data_round, key_mode,
+                     fk=None, ck=None, rounds=None):
+        """从共享缓存获取已设置密钥的 SM4 对象 (key_mode: 0=加密, 1=解密)"""
+        fk, ck = SM4Encoders._resolve_constants(SM4Encoders._parse_constants(fk),
+                                                SM4Encoders._parse_constants(ck),
+                                                int(rounds) if rounds else None)
+        flags = (bool(swap_key_schedule), bool(swap_data_round), fk, ck)
+        cache_key = CONTEXT_CACHE.make_key('sm4', key_bytes, sbox, flags, key_mode)
+
+        def factory():
+            sm4 = SM4Encoders(SM4Encoders._parse_sbox(sbox))
+            sm4.set_key(key_bytes, key_mode, swap_key_schedule=flags[0], swap_data_round=flags[1],
+                        fk=fk, ck=ck)
+            return sm4
+        return CONTEXT_CACHE.get(cache_key, factory)
+
     @staticmethod
     def sm4_encrypt(data: str, key: str, mode: str = 'ECB', iv: str = '', padding: str = 'pkcs7', sbox=None,
                    key_type: str = 'utf-8', iv_type: str = 'utf-8', 
                    swap_key_schedule: bool = False, swap_data_round: bool = False,
                    swap_endian: bool = False, # Backward compatibility
-                   data_type: str = None) -> str:
-        """SM4加密"""
+                   data_type: str = None, parallel: bool = False,
+                   fk=None, ck=None, rounds=None) -> str:
+        """SM4加密 (fk/ck/rounds: 自定义系统参数、固定参数与轮数)"""
         if not data: return ""
         
         # Backward compatibility: swap_endian implies BOTH if others not specified?
@@ -264,9 +550,6 @@ class SM4Encoders:
         else:
             key_bytes = hashlib.md5(key.encode('utf-8')).digest()
         
-        # Custom S-Box
-        custom_sbox = SM4Encoders._parse_sbox(sbox)
-        
         # IV
         mode = mode.upper()
         if mode in ['CBC', 'CFB', 'OFB', 'CTR']:
@@ -288,8 +571,8 @@ class SM4Encoders:
         else:
              iv_bytes = None
              
-        sm4 = SM4Encoders(custom_sbox)
-        sm4.set_key(key_bytes, 0, swap_key_schedule=swap_key_schedule, swap_data_round=swap_data_round) # 0 for encrypt
+        sm4 = SM4Encoders._get_context(key_bytes, sbox, swap_key_schedule, swap_data_round, 0, # 0 for encrypt
+                                       fk=fk, ck=ck, rounds=rounds)
         
         # Data Handling
         if data_type and data_type.lower() == 'hex':
@@ -320,59 +603,7 @@ class SM4Encoders:
         else:
              padded = SM4Encoders._pad_data(data_bytes, padding)
         
-        encrypted = b''
-        
-        if mode == 'ECB':
-             for i in range(0, len(padded), 16):
-                  block = padded[i:i+16]
-                  if len(block) < 16: break
-                  encrypted += sm4.one_round(block)
-                  
-        elif mode == 'CBC':
-             last_block = iv_bytes
-             for i in range(0, len(padded), 16):
-                  block = padded[i:i+16]
-                  input_block = bytes([a ^ b for a, b in zip(block, last_block)])
-                  output_block = sm4.one_round(input_block)
-                  encrypted += output_block
-                  last_block = output_block
-                  
-        elif mode == 'CTR':
-             ctr = int.from_bytes(iv_bytes, byteorder='big')
-             for i in range(0, len(padded), 16):
-                  block = padded[i:i+16]
-                  ctr_block = ctr.to_bytes(16, byteorder='big')
-                  keystream = sm4.one_round(ctr_block)
-                  chunk_len = len(block)
-                  cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                  encrypted += cipher_chunk
-                  ctr += 1
-                  
-        elif mode == 'OFB':
-             last_iv = iv_bytes
-             for i in range(0, len(padded), 16):
-                  block = padded[i:i+16]
-                  keystream = sm4.one_round(last_iv)
-                  chunk_len = len(block)
-                  cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                  encrypted += cipher_chunk
-                  last_iv = keystream
-                  
-        elif mode == 'CFB':
-             last_block = iv_bytes
-             for i in range(0, len(padded), 16):
-                  block = padded[i:i+16]
-                  keystream = sm4.one_round(last_block)
-                  chunk_len = len(block)
-                  cipher_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                  encrypted += cipher_chunk
-                  if chunk_len == 16:
-                      last_block = cipher_chunk
-                  else:
-                      pass 
-
-        else:
-             raise ValueError("Unsupported mode")
+        encrypted = BlockCipherModes.encrypt(sm4, mode, padded, iv_bytes, 16, parallel=parallel)
 
         if not iv and iv_bytes and mode != 'ECB':
              return base64.b64encode(iv_bytes + encrypted).decode('utf-8')
@@ -383,8 +614,9 @@ class SM4Encoders:
                    key_type: str = 'utf-8', iv_type: str = 'utf-8', 
                    swap_key_schedule: bool = False, swap_data_round: bool = False,
                    swap_endian: bool = False,
-                   data_type: str = None) -> str:
-        """SM4解密"""
+                   data_type: str = None, parallel: bool = False,
+                   fk=None, ck=None, rounds=None) -> str:
+        """SM4解密 (fk/ck/rounds: 自定义系统参数、固定参数与轮数)"""
         if not data: return ""
         
         if swap_endian:
@@ -400,8 +632,6 @@ class SM4Encoders:
         else:
             key_bytes = hashlib.md5(key.encode('utf-8')).digest()
 
-        custom_sbox = SM4Encoders._parse_sbox(sbox)
-        
         # DATA HANDLING
         try:
              if data_type and data_type.lower() == 'hex':
@@ -440,60 +670,12 @@ class SM4Encoders:
                   iv_bytes = encrypted_data[:16]
                   data_content = encrypted_data[16:]
                   
-        sm4 = SM4Encoders(custom_sbox)
-        if mode in ['ECB', 'CBC']:
-             sm4.set_key(key_bytes, 1, swap_key_schedule=swap_key_schedule, swap_data_round=swap_data_round) 
-        else:
-             sm4.set_key(key_bytes, 0, swap_key_schedule=swap_key_schedule, swap_data_round=swap_data_round)
-        
-        decrypted = b''
+        # 上下文同时持有加/解密轮密钥，由工作模式层选择方向
+        sm4 = SM4Encoders._get_context(key_bytes, sbox, swap_key_schedule, swap_data_round, 0,
+                                       fk=fk, ck=ck, rounds=rounds)
         
-        if mode == 'ECB':
-             for i in range(0, len(data_content), 16):
-                  block = data_content[i:i+16]
-                  decrypted += sm4.one_round(block)
-                  
-        elif mode == 'CBC':
-             last_block = iv_bytes
-             for i in range(0, len(data_content), 16):
-                  block = data_content[i:i+16]
-                  output_block = sm4.one_round(block)
-                  plain_block = bytes([a ^ b for a, b in zip(output_block, last_block)])
-                  decrypted += plain_block
-                  last_block = block
-                  
-        elif mode == 'CTR':
-             ctr = int.from_bytes(iv_bytes, byteorder='big')
-             for i in range(0, len(data_content), 16):
-                  block = data_content[i:i+16]
-                  ctr_block = ctr.to_bytes(16, byteorder='big')
-                  keystream = sm4.one_round(ctr_block)
-                  chunk_len = len(block)
-                  plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                  decrypted += plain_chunk
-                  ctr += 1
-                  
-        elif mode == 'OFB':
-             last_iv = iv_bytes
-             for i in range(0, len(data_content), 16):
-                  block = data_content[i:i+16]
-                  keystream = sm4.one_round(last_iv)
-                  chunk_len = len(block)
-                  plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                  decrypted += plain_chunk
-                  last_iv = keystream
-                  
-        elif mode == 'CFB':
-             last_block = iv_bytes
-             for i in range(0, len(data_content), 16):
-                  block = data_content[i:i+16]
-                  keystream = sm4.one_round(last_block)
-                  chunk_len = len(block)
-                  plain_chunk = bytes([a ^ b for a, b in zip(block, keystream[:chunk_len])])
-                  decrypted += plain_chunk
-                  if chunk_len == 16:
-                      last_block = block # Ciphertext
-                  
+        decrypted = BlockCipherModes.decrypt(sm4, mode, data_content, iv_bytes, 16, parallel=parallel)
+
         is_stream = mode in ['CFB', 'OFB', 'CTR']
         
         final_bytes = decrypted
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式加解密
+提供 update(chunk) / finalize() 形式的增量加解密对象，跨调用保存工作模式状态与填充
+内存占用只与单次输入块大小有关，与文件总大小无关
+密钥/IV派生、填充与自动携带IV的行为与各算法一次性接口保持一致
+"""
+
+import hashlib
+
+from core.decoder.modes import BlockCipherModes, xor_bytes
+from core.decoder.aes_pure import AesPureEncoders
+from core.decoder.sm4 import SM4Encoders
+from core.decoder.des import DESEncoders
+from core.decoder.rc4 import RC4Encoders
+
+
+class BlockStreamCipher:
+    """分组密码增量加解密
+
+    update() 只处理已凑满的整块，剩余字节留到下一次调用；
+    ECB/CBC 解密始终保留最后一块，直到 finalize() 时去填充。
+    """
+
+    STREAM_MODES = ('CFB', 'OFB', 'CTR')
+
+    def __init__(self, cipher, mode, direction, iv=None, block_size=16, padding='pkcs7',
+                 pad=None, unpad=None, iv_in_stream=False, parallel=False):
+        """
+        Args:
+            cipher: 提供 encrypt_block / decrypt_block 的已设置密钥对象
+            mode: 工作模式 (ECB/CBC/CFB/OFB/CTR)
+            direction: 'encrypt' 或 'decrypt'
+            iv: 初始化向量 (iv_in_stream 解密时从数据头部读取)
+            block_size: 分组长度
+            padding: 填充方式
+            pad / unpad: 填充函数 pad(data, padding) / unpad(data, padding)
+            iv_in_stream: 加密时在输出前写入IV，解密时从输入前读取IV
+            parallel: 大块数据时使用多进程
+        """
+        self.cipher = cipher
+        self.mode = mode.upper()
+        if self.mode not in BlockCipherModes.SUPPORTED_MODES:
+            raise ValueError(f"不支持的加密模式: {mode}")
+        self.encrypting = direction == 'encrypt'
+        self.block_size = block_size
+        self.padding = padding.lower()
+        self.parallel = parallel
+        self._pad = pad
+        self._unpad = unpad
+        if self.mode == 'ECB':
+            self._iv = None
+        else:
+            self._iv = bytes(iv) if iv else b'\x00' * block_size
+        self._iv_pending = iv_in_stream and self.mode != 'ECB'
+        self._buf = bytearray()
+        self._finished = False
+
+    @property
+    def is_stream_mode(self):
+        return self.mode in self.STREAM_MODES
+
+    def update(self, data):
+        """输入一段数据，返回当前可输出的结果"""
+        if self._finished:
+            raise ValueError("流已结束，不能继续写入")
+        bs = self.block_size
+        self._buf += data
+
+        prefix = b''
+        if self._iv_pending:
+            if self.encrypting:
+                prefix = self._iv
+            elif len(self._buf) < bs:
+                return b''
+            else:
+                self._iv = bytes(self._buf[:bs])
+                del self._buf[:bs]
+            self._iv_pending = False
+
+        n = len(self._buf) // bs * bs
+        if not self.encrypting and not self.is_stream_mode and n == len(self._buf):
+            n -= bs  # 保留最后一块用于去填充
+        if n <= 0:
+            return prefix
+        segment = bytes(self._buf[:n])
+        del self._buf[:n]
+        return prefix + self._process(segment)
+
+    def finalize(self):
+        """处理剩余数据 (加密时填充，解密时去填充)"""
+        if self._finished:
+            raise ValueError("流已结束")
+        self._finished = True
+        tail = bytes(self._buf)
+        self._buf = bytearray()
+
+        prefix = b''
+        if self._iv_pending:
+            if not self.encrypting:
+                return b''  # 数据不足一个IV
+            prefix = self._iv
+
+        if self.encrypting:
+            if not (self.is_stream_mode and self.padding == 'nopadding') and self._pad:
+                tail = self._pad(tail, self.padding)
+            return prefix + self._process(tail)
+
+        out = self._process(tail)
+        if not self.is_stream_mode and out and self._unpad:
+            out = self._unpad(out, self.padding)
+        return out
+
+    def _process(self, segment):
+        bs = self.block_size
+        if not segment:
+            return b''
+        if self.encrypting:
+            out = BlockCipherModes.encrypt(self.cipher, self.mode, segment, self._iv, bs,
+                                           parallel=self.parallel)
+        else:
+            out = BlockCipherModes.decrypt(self.cipher, self.mode, segment, self._iv, bs,
+                                           parallel=self.parallel)
+        self._advance(segment, out)
+        return out
+
+    def _advance(self, segment, out):
+        """更新链接值，使下一段从正确的位置继续"""
+        bs = self.block_size
+        mode = self.mode
+        if mode == 'ECB' or len(segment) < bs:
+            return
+        if mode == 'CTR':
+            ctr = int.from_bytes(self._iv, 'big') + len(segment) // bs
+            self._iv = (ctr & ((1 << (bs * 8)) - 1)).to_bytes(bs, 'big')
+        elif mode == 'OFB':
+            # 最后一块密钥流 = 输入 ^ 输出
+            self._iv = xor_bytes(segment[-bs:], out[-bs:])
+        else:
+            # CBC/CFB: 最后一个密文块
+            self._iv = bytes((out if self.encrypting else segment)[-bs:])
+
+
+class RC4StreamCipher:
+    """RC4 增量加解密 (基于 RC4Stream 保存 S/i/j 状态)"""
+
+    def __init__(self, rc4, key, offset=0):
+        self._stream = rc4.stream(key)
+        if offset:
+            self._stream.seek(offset)
+
+    def update(self, data):
+        return self._stream.update(data)
+
+    def finalize(self):
+        return b''
+
+
+class StreamingCiphers:
+    """按算法名创建流式加解密对象"""
+
+    ALGORITHMS = ('aes', 'sm4', 'des', '3des', 'rc4')
+
+    @staticmethod
+    def _key_bytes(algorithm, key, key_type):
+        """与各算法一次性接口相同的密钥派生"""
+        if key_type.lower() == 'hex':
+            try:
+                key_bytes = bytes.fromhex(key.replace(' ', ''))
+            except ValueError:
+                raise ValueError("密钥不是有效的Hex字符串")
+        elif algorithm == 'aes':
+            key_bytes = hashlib.sha256(key.encode('utf-8')).digest()
+        elif algorithm == 'sm4':
+            key_bytes = hashlib.md5(key.encode('utf-8')).digest()
+        elif algorithm == 'des':
+            key_bytes = hashlib.md5(key.encode('utf-8')).digest()[:8]
+        elif algorithm == '3des':
+            key_bytes = hashlib.sha256(key.encode('utf-8')).digest()[:24]
+        else:
+            key_bytes = key.encode('utf-8')
+
+        if algorithm == 'des':
+            key_bytes = (key_bytes + b'\x00' * 8)[:8]
+        elif algorithm == '3des' and key_bytes:
+            while len(key_bytes) < 24:
+                key_bytes = key_bytes + key_bytes[:24 - len(key_bytes)]
+            key_bytes = key_bytes[:24]
+        if not key_bytes:
+            raise ValueError("密钥不能为空")
+        return key_bytes
+
+    @staticmethod
+    def _iv_bytes(iv, iv_type, block_size):
+        if iv_type.lower() == 'hex':
+            try:
+                iv_bytes = bytes.fromhex(iv.replace(' ', ''))
+            except ValueError:
+                raise ValueError("IV不是有效的Hex字符串")
+            if len(iv_bytes) != block_size:
+                raise ValueError(f"IV Hex长度必须为{block_size}字节 (当前: {len(iv_bytes)})")
+            return iv_bytes
+        return hashlib.md5(iv.encode('utf-8')).digest()[:block_size]
+
+    @staticmethod
+    def create(algorithm: str, direction: str, key: str, mode: str = 'ECB', iv: str = '',
+               padding: str = 'pkcs7', key_type: str = 'utf-8', iv_type: str = 'utf-8',
+               sbox=None, sboxes=None, swap_key_schedule: bool = False,
+               swap_data_round: bool = False, swap_bytes: bool = False,
+               parallel: bool = False, drop: int = 0, offset: int = 0):
+        """创建流式加解密对象
+
+        Args:
+            algorithm: aes/sm4/des/3des/rc4
+            direction: encrypt/decrypt
+            key, key_type, iv, iv_type, padding, mode: 同一次性接口
+            sbox: AES/SM4/RC4 自定义S盒
+            sboxes: DES/3DES 自定义S盒
+            swap_key_schedule / swap_data_round: AES/SM4 魔改开关
+            swap_bytes: RC4 KSA 魔改开关
+            drop / offset: RC4-drop[n] 及输入在密钥流中的起始偏移
+            parallel: 大块数据时使用多进程
+        """
+        algorithm = algorithm.lower()
+        if algorithm not in StreamingCiphers.ALGORITHMS:
+            raise ValueError(f"不支持的流式算法: {algorithm}")
+        if direction not in ('encrypt', 'decrypt'):
+            raise ValueError(f"未知方向: {direction}")
+        key_bytes = StreamingCiphers._key_bytes(algorithm, key, key_type)
+
+        if algorithm == 'rc4':
+            return RC4StreamCipher(RC4Encoders._get_context(key_bytes, sbox, swap_bytes, drop),
+                                   key_bytes, offset)
+
+        mode = mode.upper()
+        if algorithm == 'aes':
+            block_size = 16
+            cipher = AesPureEncoders._get_context(key_bytes, sbox, swap_key_schedule,
+                                                  swap_data_round, direction)
+            pad = AesPureEncoders._pad
+
+            def unpad(data, padding):
+                try:
+                    return AesPureEncoders._unpad(data, padding)
+                except Exception:
+                    return data  # 与一次性接口一致: 填充错误时返回原数据
+        elif algorithm == 'sm4':
+            block_size = 16
+            cipher = SM4Encoders._get_context(key_bytes, sbox, swap_key_schedule, swap_data_round, 0)
+            pad, unpad = SM4Encoders._pad_data, SM4Encoders._unpad_data
+        else:
+            block_size = 8
+            pad, unpad = DESEncoders._pad_data, DESEncoders._unpad_data
+            if algorithm == 'des':
+                cipher = DESEncoders._get_context(key_bytes, sboxes)
+            else:
+                cipher = DESEncoders._get_triple_context(key_bytes, sboxes)
+
+        iv_bytes = None
+        if mode != 'ECB' and iv:
+            iv_bytes = StreamingCiphers._iv_bytes(iv, iv_type, block_size)
+        return BlockStreamCipher(cipher, mode, direction, iv_bytes, block_size, padding,
+                                 pad=pad, unpad=unpad, iv_in_stream=not iv, parallel=parallel)
+
+    @staticmethod
+    def transform(cipher, chunks):
+        """将可迭代的输入块依次送入流式对象，逐块产出结果"""
+        for chunk in chunks:
+            out = cipher.update(chunk)
+            if out:
+                yield out
+        tail = cipher.finalize()
+        if tail:
+            yield tail